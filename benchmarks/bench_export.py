@@ -0,0 +1,71 @@
+"""Export throughput of PNG, SVG and PDF for the same drawings.
+
+    python benchmarks/bench_export.py [--runs N] [--memory] [count ...]
+
+Every drawing is exported whole at scale 1. "mixed" drawings change colour
+from one shape to the next; with --runs N the colour changes every N shapes
+instead, as when a stretch of shapes is drawn with one style, which is what
+SVG path merging is for. With --memory every export runs a second time under
+tracemalloc to report the Python heap's high-water mark, which says whether
+an export keeps memory flat; the timings come from the untraced run.
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from array import array
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from synthetic import make_drawing
+
+from PyQt6.QtCore import QRectF
+from PyQt6.QtGui import QGuiApplication
+
+from drawingtool.pngexport import PngExport
+from drawingtool.vectorexport import PdfExport, SvgExport
+
+SIZES = (10_000, 100_000)
+SIZE = 20_000.0  # Side of the square the shapes are spread over
+EXPORTS = (("png", PngExport), ("svg", SvgExport), ("pdf", PdfExport))
+
+
+def peak_memory(export):
+    tracemalloc.start()
+    export.run()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("sizes", nargs="*", type=int, default=SIZES)
+    parser.add_argument("--runs", type=int, default=0, help="shapes per colour run (default: mixed)")
+    parser.add_argument("--memory", action="store_true", help="also report the peak Python heap")
+    args = parser.parse_args(argv)
+    app = QGuiApplication.instance() or QGuiApplication(["bench_export"])
+    rect = QRectF(0, 0, SIZE, SIZE)
+    header = f"{'shapes':>9} {'format':>6} {'export s':>9} {'shapes/s':>10} {'MiB':>8}"
+    print(header + (f" {'peak MiB':>9}" if args.memory else ""))
+    with tempfile.TemporaryDirectory() as directory:
+        for count in args.sizes:
+            drawing = make_drawing(count, group_every=100, size=SIZE)
+            if args.runs:
+                runs = (drawing.color[index - index % args.runs] for index in range(count))
+                drawing.color = array(drawing.color.typecode, runs)
+            for name, export in EXPORTS:
+                path = os.path.join(directory, "drawing." + name)
+                start = time.perf_counter()
+                export(drawing, path, rect).run()
+                seconds = time.perf_counter() - start
+                line = f"{count:>9} {name:>6} {seconds:>9.3f} {count / seconds:>10.0f} {os.path.getsize(path) / 2**20:>8.1f}"
+                if args.memory:
+                    line += f" {peak_memory(export(drawing, path, rect)) / 2**20:>9.1f}"
+                print(line)
+    return app
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""Save and open times and file sizes for every drawing format.
+
+    python benchmarks/bench_formats.py [count ...]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from synthetic import make_drawing
+
+from drawingtool.fileformats import FORMATS, read_drawing, write_drawing
+
+SIZES = (10_000, 100_000, 1_000_000)
+
+
+def main(sizes):
+    print(f"{'shapes':>9} {'format':>6} {'save s':>8} {'open s':>8} {'MiB':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for count in sizes:
+            drawing = make_drawing(count, group_every=100)
+            for extension in FORMATS:
+                path = os.path.join(directory, "drawing" + extension)
+                start = time.perf_counter()
+                write_drawing(drawing, path)
+                saved = time.perf_counter()
+                read_drawing(path)
+                opened = time.perf_counter()
+                print(f"{count:>9} {extension:>6} {saved - start:>8.3f} {opened - saved:>8.3f} {os.path.getsize(path) / 2**20:>8.1f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or SIZES)
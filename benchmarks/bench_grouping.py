@@ -0,0 +1,138 @@
+"""Group, ungroup-all and their undo on deep, wide hierarchies.
+
+    python benchmarks/bench_grouping.py [--children N] [--depth N] [--legacy]
+
+Builds a hierarchy bottom-up: every level groups --children fresh shapes
+together with the group from the level below, then moves and rotates the new
+group so each level adds a nested transform. The whole thing is then
+flattened with ungroup-all, undone and redone. Every leaf is checked to be
+back on the same spot of the canvas after each step.
+
+--legacy also times Qt's own addToGroup/removeFromGroup loop with the index
+left on, as grouping worked before. removeFromGroup refits the group over
+all remaining children on every call, so keep the sizes small with it.
+"""
+import argparse
+import os
+import random
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import synthetic  # noqa: F401  (puts the repository on sys.path)
+
+from PyQt6.QtWidgets import QApplication, QGraphicsItemGroup
+
+from drawingtool.history import GroupCommand
+from drawingtool.scene import GraphicsScene
+from drawingtool.shapes import items_from_drawing
+
+
+def add_shapes(scene, count, seed):
+    items = items_from_drawing(synthetic.make_drawing(count, seed=seed))
+    with scene.batchUpdate():
+        for item in items:
+            scene.addItem(item)
+            scene.items_to_save.add(item)
+    return items
+
+
+def build(scene, children, depth, group):
+    # group(items) -> the new group. Returns the outermost group and all leaves.
+    rng = random.Random(depth)
+    leaves = []
+    inner = None
+    for level in range(depth):
+        items = add_shapes(scene, children, seed=level)
+        leaves.extend(items)
+        if inner is not None:
+            items.append(inner)
+        inner = group(items)
+        inner.setPos(rng.uniform(-20, 20), rng.uniform(-20, 20))
+        inner.setTransformOriginPoint(2000, 2000)
+        inner.setRotation(rng.uniform(-10, 10))
+    return inner, leaves
+
+
+def geometry(leaves):
+    return [leaf.sceneBoundingRect() for leaf in leaves]
+
+
+def max_error(before, after):
+    return max(max(abs(a.left() - b.left()), abs(a.top() - b.top()),
+                   abs(a.right() - b.right()), abs(a.bottom() - b.bottom()))
+               for a, b in zip(before, after))
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def run_batched(children, depth):
+    scene = GraphicsScene()
+    history = scene.history
+
+    def group(items):
+        command = GroupCommand(scene, items)
+        history.push(command)
+        return command.steps[0][0]
+
+    build_time, (top, leaves) = timed(lambda: build(scene, children, depth, group))
+    scene.items()  # rebuild the index before timing
+    nested = geometry(leaves)
+    flatten_time, _ = timed(lambda: history.push(GroupCommand(scene, [top], ungroup=True, recursive=True)))
+    flat_error = max_error(nested, geometry(leaves))
+    assert not any(isinstance(item, QGraphicsItemGroup) for item in scene.items())
+    undo_time, _ = timed(history.undo)
+    undo_error = max_error(nested, geometry(leaves))
+    redo_time, _ = timed(history.redo)
+    redo_error = max_error(nested, geometry(leaves))
+    print(f"batched  group {build_time:7.2f} s  ungroup-all {flatten_time:7.2f} s  "
+          f"undo {undo_time:7.2f} s  redo {redo_time:7.2f} s  "
+          f"max drift {max(flat_error, undo_error, redo_error):.2e}")
+
+
+def run_legacy(children, depth):
+    scene = GraphicsScene()
+
+    def group(items):
+        group = QGraphicsItemGroup()
+        scene.addItem(group)
+        for item in items:
+            group.addToGroup(item)
+        return group
+
+    def flatten(group):
+        for child in group.childItems():
+            group.removeFromGroup(child)
+            if isinstance(child, QGraphicsItemGroup):
+                flatten(child)
+        scene.removeItem(group)
+
+    build_time, (top, leaves) = timed(lambda: build(scene, children, depth, group))
+    scene.items()
+    nested = geometry(leaves)
+    flatten_time, _ = timed(lambda: flatten(top))
+    print(f"legacy   group {build_time:7.2f} s  ungroup-all {flatten_time:7.2f} s  "
+          f"max drift {max_error(nested, geometry(leaves)):.2e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--children", type=int, default=10_000, help="shapes added at each level")
+    parser.add_argument("--depth", type=int, default=20, help="levels of nesting")
+    parser.add_argument("--legacy", action="store_true", help="also time the unbatched Qt calls")
+    args = parser.parse_args()
+
+    app = QApplication([])
+    print(f"{args.depth} levels x {args.children} children = {args.depth * args.children} shapes")
+    run_batched(args.children, args.depth)
+    if args.legacy:
+        run_legacy(args.children, args.depth)
+    return app
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Cost of one mouse move while dragging out a new shape, by scene size.
+
+    python benchmarks/bench_preview.py [--moves N] [--legacy] [count ...]
+
+Shapes are spread so that the density stays the same whatever their count,
+and a canvas view at zoom 1 shows the middle of them. Every move updates the
+rubber-band preview through GraphicsScene.updateTemporaryShape and then lets
+the view repaint. The time per move should not grow with the scene.
+
+--legacy also times the preview as it used to be: on every move the old
+preview item is taken out of the scene and a new one is built and added,
+which touches the scene's index twice.
+"""
+import argparse
+import math
+import os
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import synthetic
+
+from PyQt6.QtCore import QPointF, Qt
+from PyQt6.QtGui import QPen
+from PyQt6.QtWidgets import QApplication, QGraphicsLineItem, QGraphicsRectItem
+
+from drawingtool.scene import GraphicsScene
+from drawingtool.view import CanvasView
+
+SIZES = (1_000, 10_000, 50_000)
+SPACING = 40.0  # Side of the square of canvas per shape
+SHAPES = ("Line", "Rectangle")
+
+
+def settle(app, view):
+    app.processEvents()
+    while view.refining():
+        app.processEvents()
+
+
+def legacy_update(scene, temporary):
+    # updateTemporaryShape before the preview overlay; returns the new item
+    if temporary is not None:
+        scene.removeItem(temporary)
+    start, end = scene.startPoint, scene.endPoint
+    if scene.drawingShape == "Line":
+        temporary = QGraphicsLineItem(start.x(), start.y(), end.x(), end.y())
+    else:
+        temporary = QGraphicsRectItem(start.x(), start.y(), abs(end.x() - start.x()), abs(end.y() - start.y()))
+    scene.addItem(temporary)
+    temporary.setPen(QPen(Qt.GlobalColor.white, 2, Qt.PenStyle.DashLine))
+    return temporary
+
+
+def drag(app, scene, view, shape, moves, legacy):
+    # Seconds per move of one drag across the view
+    centre = view.mapToScene(view.viewport().rect().center())
+    scene.drawingShape = shape
+    scene.startPoint = scene.endPoint = centre - QPointF(200, 150)
+    scene.preview.begin(shape, scene.startPoint)
+    settle(app, view)
+    temporary = None
+    start = time.perf_counter()
+    for move in range(1, moves + 1):
+        scene.endPoint = scene.startPoint + QPointF(400 * move / moves, 300 * move / moves)
+        if legacy:
+            temporary = legacy_update(scene, temporary)
+        else:
+            scene.updateTemporaryShape()
+        settle(app, view)
+    seconds = (time.perf_counter() - start) / moves
+    if temporary is not None:
+        scene.removeItem(temporary)
+    scene.preview.end()
+    scene.drawingShape = None
+    settle(app, view)
+    return seconds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("sizes", nargs="*", type=int, default=SIZES)
+    parser.add_argument("--moves", type=int, default=200, help="mouse moves per drag")
+    parser.add_argument("--legacy", action="store_true", help="also time re-adding the preview on every move")
+    args = parser.parse_args(argv)
+    app = QApplication.instance() or QApplication(["bench_preview"])
+    modes = ("overlay", "legacy") if args.legacy else ("overlay",)
+    print(f"{'shapes':>9} {'shape':>10} " + " ".join(f"{mode + ' us':>11}" for mode in modes))
+    for count in args.sizes:
+        scene = GraphicsScene()
+        scene.loadDrawing(synthetic.make_drawing(count, size=math.sqrt(count) * SPACING))
+        view = CanvasView(scene)
+        view.resize(1000, 800)
+        view.show()
+        view.centerOn(scene.itemsBoundingRect().center())
+        view.endInteraction()
+        settle(app, view)
+        for shape in SHAPES:
+            times = [drag(app, scene, view, shape, args.moves, mode == "legacy") for mode in modes]
+            print(f"{count:>9} {shape:>10} " + " ".join(f"{seconds * 1e6:>11.0f}" for seconds in times))
+        view.close()
+    return app
+
+
+if __name__ == "__main__":
+    main()
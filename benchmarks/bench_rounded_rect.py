@@ -0,0 +1,78 @@
+"""Hit-testing cost of curved rectangles, cached path versus rebuilt path.
+
+    python benchmarks/bench_rounded_rect.py [count ...]
+
+"rebuilt" reproduces the original RoundedRectItem.shape(), which built a new
+QPainterPath on every call. Point queries and a rubber-band style rect query
+both go through shape() for every candidate item; "contains" calls
+QGraphicsItem.contains(), which is one shape() lookup from C++, on every item.
+"contains" and rect queries are where the cached path pays off; a point query
+in a large scene spends its time walking the BSP index, and the one or two
+shape() calls it makes are lost in the noise.
+"""
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import synthetic  # noqa: F401  (puts the repository on sys.path)
+
+from PyQt6.QtCore import QPointF, QRectF, Qt
+from PyQt6.QtGui import QPainterPath
+from PyQt6.QtWidgets import QApplication, QGraphicsScene
+
+from drawingtool.shapes import RoundedRectItem
+
+SIZES = (1_000, 10_000)
+QUERIES = 2_000
+
+
+class RebuiltPathItem(RoundedRectItem):
+    def shape(self):
+        path = QPainterPath()
+        path.addRoundedRect(self.rect(), 50, 50)
+        return path
+
+
+def build(item_class, count, seed=1):
+    rng = random.Random(seed)
+    scene = QGraphicsScene(0, 0, 4000, 4000)
+    for _ in range(count):
+        scene.addItem(item_class(QRectF(rng.uniform(0, 3900), rng.uniform(0, 3900), 100, 100)))
+    scene.items()  # build the BSP index before timing
+    return scene
+
+
+def time_queries(scene, seed=2):
+    rng = random.Random(seed)
+    points = [QPointF(rng.uniform(0, 4000), rng.uniform(0, 4000)) for _ in range(QUERIES)]
+    start = time.perf_counter()
+    for point in points:
+        scene.items(point, Qt.ItemSelectionMode.IntersectsItemShape)
+    point_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for point in points[:QUERIES // 10]:
+        scene.items(QRectF(point, point + QPointF(300, 300)), Qt.ItemSelectionMode.IntersectsItemShape)
+    rect_time = time.perf_counter() - start
+    items = scene.items()
+    start = time.perf_counter()
+    for item in items:
+        item.contains(QPointF(50, 50))
+    contains_time = time.perf_counter() - start
+    return point_time / QUERIES * 1e6, rect_time / (QUERIES // 10) * 1e6, contains_time / len(items) * 1e6
+
+
+def main(sizes):
+    app = QApplication.instance() or QApplication(sys.argv)
+    print(f"{'items':>7} {'variant':>8} {'point us':>9} {'rect us':>9} {'contains us':>12}")
+    for count in sizes:
+        for name, item_class in (("rebuilt", RebuiltPathItem), ("cached", RoundedRectItem)):
+            point_us, rect_us, contains_us = time_queries(build(item_class, count))
+            print(f"{count:>7} {name:>8} {point_us:>9.1f} {rect_us:>9.1f} {contains_us:>12.2f}")
+    return app
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or SIZES)
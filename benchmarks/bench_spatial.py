@@ -0,0 +1,99 @@
+"""Region and point queries of GraphicsScene on Qt's BspTreeIndex and NoIndex.
+
+    python benchmarks/bench_spatial.py [count ...]
+
+The scene loads the drawing and builds its index, then answers itemsInRect
+and itemsAtPoint, as marquee selection, hit-testing and region export ask
+them. A moving frame moves a slice of the items with one undoable edit, then
+runs a few region queries, as during a drag.
+"""
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import synthetic
+
+from PyQt6.QtCore import QPointF, QRectF
+from PyQt6.QtWidgets import QApplication, QGraphicsScene
+
+from drawingtool.history import PropertyCommand
+from drawingtool.scene import GraphicsScene
+
+SIZES = (10_000, 100_000)
+REGION_QUERIES = 1_000
+POINT_QUERIES = 5_000
+FRAMES = 30
+MOVED_PER_FRAME = 500
+QUERIES_PER_FRAME = 10
+CANVAS = 4000.0
+
+
+def regions(count, seed):
+    rng = random.Random(seed)
+    return [QRectF(rng.uniform(0, CANVAS), rng.uniform(0, CANVAS), rng.uniform(50, 400), rng.uniform(50, 400))
+            for _ in range(count)]
+
+
+def points(count, seed):
+    rng = random.Random(seed)
+    return [QPointF(rng.uniform(0, CANVAS), rng.uniform(0, CANVAS)) for _ in range(count)]
+
+
+INDEXES = {
+    "qt-bsp": QGraphicsScene.ItemIndexMethod.BspTreeIndex,
+    "qt-none": QGraphicsScene.ItemIndexMethod.NoIndex,
+}
+
+
+def run(name, count):
+    drawing = synthetic.make_drawing(count, size=CANVAS)
+    scene = GraphicsScene()
+    scene.setItemIndexMethod(INDEXES[name])
+
+    start = time.perf_counter()
+    scene.loadDrawing(drawing)
+    scene.items(QRectF(0, 0, 1, 1))  # the BSP tree is built on first use
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    hits = sum(len(scene.itemsInRect(rect)) for rect in regions(REGION_QUERIES, 1))
+    region_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for point in points(POINT_QUERIES, 2):
+        scene.itemsAtPoint(point)
+    point_time = time.perf_counter() - start
+
+    rng = random.Random(3)
+    items = list(scene.items_to_save)
+    frame_regions = regions(FRAMES * QUERIES_PER_FRAME, 4)
+    start = time.perf_counter()
+    for frame in range(FRAMES):
+        moving = rng.sample(items, MOVED_PER_FRAME)
+        positions = [item.pos() + QPointF(rng.uniform(-30, 30), rng.uniform(-30, 30)) for item in moving]
+        scene.history.push(PropertyCommand(moving, "setPos", [item.pos() for item in moving], positions))
+        for rect in frame_regions[frame * QUERIES_PER_FRAME:(frame + 1) * QUERIES_PER_FRAME]:
+            scene.itemsInRect(rect)
+    frame_time = (time.perf_counter() - start) / FRAMES
+
+    print(f"{name:8} {count:>8}  build {build_time:6.2f} s  "
+          f"region {region_time / REGION_QUERIES * 1e6:8.1f} us  point {point_time / POINT_QUERIES * 1e6:7.1f} us  "
+          f"moving frame {frame_time * 1e3:7.2f} ms  ({hits} hits)")
+
+
+def main():
+    app = QApplication.instance() or QApplication(sys.argv)
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+    print(f"region queries are 50-400 units square on a {CANVAS:.0f} unit canvas; "
+          f"{MOVED_PER_FRAME} items move per frame, then {QUERIES_PER_FRAME} region queries")
+    for count in sizes:
+        for name in INDEXES:
+            run(name, count)
+    return app
+
+
+if __name__ == "__main__":
+    main()
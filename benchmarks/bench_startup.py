@@ -0,0 +1,98 @@
+"""Startup cost: import time of the GUI modules and time to first paint.
+
+    python benchmarks/bench_startup.py [--runs N] [--json PATH]
+
+Import time comes from ``python -X importtime``; first paint is the time from
+interpreter start until the canvas viewport receives its first paint event,
+on the offscreen platform. Each run uses a fresh interpreter.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FIRST_PAINT = """
+import time
+start = time.perf_counter()
+import sys
+from PyQt6.QtCore import QEvent, QObject
+from PyQt6.QtWidgets import QApplication, QGraphicsView
+from drawingtool.window import MainWindow
+imported = time.perf_counter()
+
+class FirstPaint(QObject):
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Type.Paint:
+            print(imported - start, time.perf_counter() - start)
+            QApplication.quit()
+        return False
+
+app = QApplication(sys.argv)
+window = MainWindow()
+first_paint = FirstPaint()
+window.findChild(QGraphicsView).viewport().installEventFilter(first_paint)
+window.show()
+app.exec()
+"""
+
+
+def environment():
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    env["PYTHONPATH"] = ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+def import_times(module="drawingtool.window"):
+    # Returns {module: cumulative microseconds} for every module imported
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            env=environment(), check=True, capture_output=True, text=True).stderr
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_time, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def first_paint():
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, "-c", FIRST_PAINT], env=environment(), check=True,
+                            capture_output=True, text=True).stdout
+    wall = time.perf_counter() - start
+    imported, painted = (float(value) for value in output.split())
+    return {"import_seconds": imported, "first_paint_seconds": painted, "wall_seconds": wall}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args(argv)
+
+    times = import_times()
+    total = times.get("drawingtool.window", 0)
+    slowest = sorted(times.items(), key=lambda item: item[1], reverse=True)[:10]
+    print(f"import drawingtool.window: {total / 1000:.1f} ms cumulative")
+    for name, cumulative in slowest:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+    for lazy in ("xml.etree.ElementTree", "drawingtool.xmlformat", "drawingtool.pngexport", "drawingtool.dialogs"):
+        print(f"  {lazy}: {'imported' if lazy in times else 'not imported'}")
+
+    runs = [first_paint() for _ in range(args.runs)]
+    result = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+    print(f"first paint (median of {args.runs}): import {result['import_seconds'] * 1000:.0f} ms, "
+          f"painted {result['first_paint_seconds'] * 1000:.0f} ms, wall {result['wall_seconds'] * 1000:.0f} ms")
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump({"import_us": times, "first_paint": result, "runs": runs}, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
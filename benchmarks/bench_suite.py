@@ -0,0 +1,368 @@
+"""Editor benchmark suite: opening, saving, editing and rendering through MainWindow.
+
+    python benchmarks/bench_suite.py [--sizes N ...] [--mix LINES RECTS ROUNDED]
+                                     [--group-every N] [--group-depth N] [--fraction F]
+                                     [--repeat N] [--only OPERATION ...] [--json PATH]
+    python benchmarks/bench_suite.py --compare BASE.json NEW.json [--threshold T]
+
+Each size gets a synthetic drawing (see synthetic.py), written as .txt and
+opened through open_file. Every operation then runs on a shown MainWindow on
+the offscreen platform, the way a user would trigger it. File dialogs answer
+with a path in a temporary directory. Drags are real mouse events sent to the
+canvas viewport. A timing lasts until the event queue is empty and the
+canvas has rendered every part of its frame, so it includes the repaint that
+follows.
+
+Edits act on --fraction of the top-level items. They are undone, untimed,
+after every run, so each run starts from the same drawing. A timing is the
+median of --repeat runs.
+
+The JSON file records the options, the environment and the git commit.
+--compare matches two such files by size and operation and flags every
+operation that became more than --threshold slower. It exits with status 1
+if any did.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import synthetic
+
+from PyQt6.QtCore import PYQT_VERSION_STR, QT_VERSION_STR, QEvent, QPointF, Qt
+from PyQt6.QtGui import QMouseEvent
+from PyQt6.QtWidgets import QApplication, QFileDialog, QGraphicsItemGroup, QGraphicsRectItem
+
+from drawingtool.fileformats import write_drawing
+from drawingtool.window import MainWindow
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+FRAMES = 30  # Mouse moves in a drag, slider steps in a rotation
+DRAG_STEP = 4.0  # Viewport pixels per mouse move
+MIN_SECONDS = 0.005  # --compare ignores differences smaller than this
+
+OPERATIONS = {}
+
+
+def operation(name):
+    def register(function):
+        OPERATIONS[name] = function
+        return function
+    return register
+
+
+@contextmanager
+def dialog_answer(path):
+    # File dialogs return path straight away instead of asking
+    names = ("getOpenFileName", "getSaveFileName")
+    originals = {name: vars(QFileDialog)[name] for name in names}
+    for name in names:
+        setattr(QFileDialog, name, staticmethod(lambda *args, **kwargs: (path, "")))
+    try:
+        yield
+    finally:
+        for name, original in originals.items():
+            setattr(QFileDialog, name, original)
+
+
+class Bench:
+    def __init__(self, window, directory, fraction, seed=1):
+        self.window = window
+        self.scene = window.scene
+        self.directory = directory
+        self.fraction = fraction
+        self.seed = seed
+        self.seconds = None
+        self.outputs = 0
+
+    def path(self, extension):
+        return os.path.join(self.directory, "drawing" + extension)
+
+    def outputPath(self, extension):
+        # A new file for every save, so none of them is incremental
+        self.outputs += 1
+        return self.path(f"-{self.outputs}{extension}")
+
+    def settle(self):
+        QApplication.processEvents()
+        while self.window.view.refining():
+            QApplication.processEvents()
+
+    @contextmanager
+    def timer(self):
+        start = time.perf_counter()
+        yield
+        self.settle()
+        self.seconds = time.perf_counter() - start
+
+    def sample(self, items=None):
+        # The same fraction of items on every run
+        items = list(self.scene.items_to_save) if items is None else items
+        step = max(1, round(1 / self.fraction)) if self.fraction else len(items) + 1
+        return items[self.seed % step::step] or items[:1]
+
+    def select(self, items):
+        self.scene.clearSelection()
+        for item in items:
+            item.setSelected(True)
+        self.settle()
+
+    def undo(self):
+        self.scene.clearSelection()
+        self.window.undo()
+        self.settle()
+
+
+    def finish(self, runner):
+        # Opening, saving and exporting run in the background; they are done
+        # once their runner is, GUI thread steps included
+        while runner is not None and not runner.done():
+            self.settle()
+            time.sleep(0.001)
+
+
+@operation("open_file")
+def open_file(bench):
+    with dialog_answer(bench.path(".txt")), bench.timer():
+        bench.finish(bench.window.open_file())
+
+
+def save(bench, method, extension):
+    with dialog_answer(bench.outputPath(extension)), bench.timer():
+        bench.finish(getattr(bench.window, method)())
+
+
+@operation("save_as_txt")
+def save_as_txt(bench):
+    save(bench, "save_as_txt", ".txt")
+
+
+@operation("save_as_xml")
+def save_as_xml(bench):
+    save(bench, "save_as_xml", ".xml")
+
+
+@operation("save_as_binary")
+def save_as_binary(bench):
+    save(bench, "save_as_binary", ".drwb")
+
+
+@operation("save_as_png")
+def save_as_png(bench):
+    save(bench, "save_as_png", ".png")
+
+
+@operation("save_as_svg")
+def save_as_svg(bench):
+    save(bench, "save_as_svg", ".svg")
+
+
+@operation("save_as_pdf")
+def save_as_pdf(bench):
+    save(bench, "save_as_pdf", ".pdf")
+
+
+@operation("copy")
+def copy(bench):
+    bench.select(bench.sample())
+    with bench.timer():
+        bench.window.copySelectedShape()
+    bench.undo()
+
+
+@operation("delete")
+def delete(bench):
+    bench.select(bench.sample())
+    with bench.timer():
+        bench.window.deleteSelectedShape()
+    bench.undo()
+
+
+@operation("group")
+def group(bench):
+    bench.select(bench.sample())
+    with bench.timer():
+        bench.window.groupSelectedShapes()
+    bench.undo()
+
+
+@operation("ungroup_all")
+def ungroup_all(bench):
+    groups = [item for item in bench.scene.items_to_save if isinstance(item, QGraphicsItemGroup)]
+    if not groups:
+        return False
+    bench.select(bench.sample(groups))
+    with bench.timer():
+        bench.window.ungroupAllSelectedShapes()
+    bench.undo()
+
+
+@operation("rotate")
+def rotate(bench):
+    # A slider drag: every step is applied as the frame timer would
+    window = bench.window
+    slider = window.rotate_slider
+    bench.select(bench.sample())
+    with bench.timer():
+        slider.setSliderDown(True)
+        for step in range(1, FRAMES + 1):
+            slider.setValue(step * 360 // FRAMES)
+            window.rotation_timer.stop()
+            window.applyRotation()
+            bench.settle()
+        slider.setSliderDown(False)
+    bench.undo()
+    slider.setValue(0)
+    window.rotation_timer.stop()
+
+
+@operation("drag")
+def drag(bench):
+    # Presses on a selected rectangle and drags the selection with the mouse
+    selection = bench.sample()
+    view = bench.window.view
+    viewport = view.viewport()
+    visible = view.mapToScene(viewport.rect()).boundingRect()
+    anchors = [item for item in selection if isinstance(item, QGraphicsRectItem)]
+    anchors = [item for item in anchors if visible.contains(item.sceneBoundingRect().center())] or anchors
+    if not anchors:
+        return False
+    view.centerOn(anchors[0])
+    bench.select(selection)
+    position = QPointF(view.mapFromScene(anchors[0].sceneBoundingRect().center()))
+
+    def send(event_type, position, button, buttons):
+        event = QMouseEvent(event_type, position, QPointF(viewport.mapToGlobal(position.toPoint())), button, buttons,
+                            Qt.KeyboardModifier.NoModifier)
+        QApplication.sendEvent(viewport, event)
+
+    left = Qt.MouseButton.LeftButton
+    with bench.timer():
+        send(QEvent.Type.MouseButtonPress, position, left, left)
+        for _ in range(FRAMES):
+            position += QPointF(DRAG_STEP, DRAG_STEP)
+            send(QEvent.Type.MouseMove, position, Qt.MouseButton.NoButton, left)
+            bench.settle()
+        send(QEvent.Type.MouseButtonRelease, position, left, Qt.MouseButton.NoButton)
+    bench.undo()
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, check=True, capture_output=True,
+                              text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment(args):
+    return {
+        "commit": git_commit(),
+        "date": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "qt": QT_VERSION_STR,
+        "pyqt": PYQT_VERSION_STR,
+        "platform": platform.platform(),
+        "qpa": os.environ.get("QT_QPA_PLATFORM"),
+        "options": {key: value for key, value in vars(args).items() if key not in ("compare", "json")},
+    }
+
+
+def run(args):
+    operations = args.only or list(OPERATIONS)
+    results = []
+    print(f"{'shapes':>9} {'operation':<15} {'median s':>9} {'min s':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for count in args.sizes:
+            drawing = synthetic.make_drawing(count, group_every=args.group_every, mix=tuple(args.mix),
+                                             group_depth=args.group_depth)
+            write_drawing(drawing, os.path.join(directory, "drawing.txt"))
+            window = MainWindow()
+            window.resize(1200, 800)
+            window.show()
+            bench = Bench(window, directory, args.fraction)
+            open_file(bench)  # Every other operation needs the drawing loaded
+            for name in operations:
+                runs = []
+                for _ in range(args.repeat):
+                    if OPERATIONS[name](bench) is False:
+                        break  # Nothing in this drawing to run it on
+                    runs.append(bench.seconds)
+                if not runs:
+                    continue
+                result = {"shapes": count, "operation": name, "seconds": statistics.median(runs), "runs": runs}
+                results.append(result)
+                print(f"{count:>9} {name:<15} {result['seconds']:>9.4f} {min(runs):>9.4f}", flush=True)
+            window.unsaved_changes = False
+            window.close()
+            window.deleteLater()
+            QApplication.processEvents()
+    return results
+
+
+def compare(base_path, new_path, threshold):
+    with open(base_path) as file:
+        base = json.load(file)
+    with open(new_path) as file:
+        new = json.load(file)
+    print(f"base {base['environment']['commit']}  new {new['environment']['commit']}")
+    print(f"{'shapes':>9} {'operation':<15} {'base s':>9} {'new s':>9} {'change':>8}")
+    before = {(result["shapes"], result["operation"]): result["seconds"] for result in base["results"]}
+    regressions = 0
+    for result in new["results"]:
+        key = (result["shapes"], result["operation"])
+        if key not in before:
+            continue
+        old_seconds, new_seconds = before[key], result["seconds"]
+        change = new_seconds / old_seconds - 1 if old_seconds else 0.0
+        note = ""
+        if abs(new_seconds - old_seconds) >= MIN_SECONDS:
+            if change > threshold:
+                note = "slower"
+                regressions += 1
+            elif change < -threshold / (1 + threshold):
+                note = "faster"
+        print(f"{key[0]:>9} {key[1]:<15} {old_seconds:>9.4f} {new_seconds:>9.4f} {change:>+8.1%}  {note}")
+    print(f"{regressions} regression(s) beyond {threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="shapes per drawing")
+    parser.add_argument("--mix", type=int, nargs=3, default=[1, 1, 1], metavar=("LINES", "RECTS", "ROUNDED"),
+                        help="relative numbers of lines, sharp and rounded rectangles")
+    parser.add_argument("--group-every", type=int, default=100, help="open a group every N records, 0 for none")
+    parser.add_argument("--group-depth", type=int, default=2, help="groups nested in each group")
+    parser.add_argument("--fraction", type=float, default=0.1, help="share of top-level items an edit acts on")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", nargs="+", choices=list(OPERATIONS), help="run just these operations")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="compare two result files")
+    parser.add_argument("--threshold", type=float, default=0.15, help="slowdown that counts as a regression")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return compare(*args.compare, args.threshold)
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    results = run(args)
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump({"environment": environment(args), "results": results}, file, indent=2)
+    del app
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
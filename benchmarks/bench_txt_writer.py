@@ -0,0 +1,85 @@
+"""Compares the buffered .txt writer with the original per-item writer.
+
+    python benchmarks/bench_txt_writer.py [count ...]
+
+The original writer walked QGraphicsItems, calling file.write and
+item.pen().color().name() once per shape; it is reproduced below on plain
+Qt items so both writers produce the same file.
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from synthetic import make_drawing
+
+from drawingtool.txtformat import write_txt
+
+SIZES = (10_000, 100_000, 1_000_000)
+
+
+def legacy_items(drawing):
+    from PyQt6.QtCore import QRectF, QPointF
+    from PyQt6.QtGui import QPen, QColor
+    from PyQt6.QtWidgets import QGraphicsLineItem, QGraphicsRectItem
+
+    items = []
+    for shape in drawing:
+        (x1, y1), (x2, y2) = shape.start_point, shape.end_point
+        if shape.shape_type == "Line":
+            item = QGraphicsLineItem(x1, y1, x2, y2)
+        else:
+            item = QGraphicsRectItem(QRectF(QPointF(x1, y1), QPointF(x2, y2)))
+            item.rounded = shape.corner_style == "Curved"
+        item.setPen(QPen(QColor(shape.color)))
+        items.append(item)
+    return items
+
+
+def legacy_write(items, file):
+    from PyQt6.QtWidgets import QGraphicsLineItem
+
+    for item in items:
+        if isinstance(item, QGraphicsLineItem):
+            line = item.line()
+            file.write(f"line {line.x1()} {line.y1()} {line.x2()} {line.y2()} {item.pen().color().name()}\n")
+        else:
+            rect = item.rect()
+            top_left = rect.topLeft()
+            bottom_right = rect.bottomRight()
+            corner = "r" if item.rounded else "s"
+            file.write(f"rect {top_left.x()} {top_left.y()} {bottom_right.x()} {bottom_right.y()} {item.pen().color().name()} {corner}\n")
+
+
+def main(sizes):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "drawing.txt")
+        print(f"{'shapes':>9} {'legacy s':>9} {'buffered s':>11} {'speedup':>8} {'writer peak KiB':>16}")
+        for count in sizes:
+            drawing = make_drawing(count)
+
+            items = legacy_items(drawing)
+            start = time.perf_counter()
+            with open(path, "w") as file:
+                legacy_write(items, file)
+            legacy = time.perf_counter() - start
+            del items
+
+            start = time.perf_counter()
+            with open(path, "w", buffering=1 << 20) as file:
+                write_txt(drawing, file)
+            buffered = time.perf_counter() - start
+
+            # Measured in a second pass, tracemalloc slows allocation down a lot
+            tracemalloc.start()
+            with open(path, "w", buffering=1 << 20) as file:
+                write_txt(drawing, file)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            print(f"{count:>9} {legacy:>9.3f} {buffered:>11.3f} {legacy / buffered:>7.1f}x {peak / 1024:>16.0f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or SIZES)
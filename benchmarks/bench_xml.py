@@ -0,0 +1,95 @@
+"""Peak memory of XML export and import.
+
+    python benchmarks/bench_xml.py [count ...]
+
+Each measurement runs in a fresh interpreter and reports how far peak RSS
+rose above the baseline taken once the synthetic drawing was built. "tree"
+is the original export, which built a full ElementTree before writing.
+"""
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+
+from synthetic import make_drawing
+
+from drawingtool.document import LINE, CURVED
+from drawingtool.xmlformat import read_xml, write_xml
+
+SIZES = (10_000, 100_000, 1_000_000)
+MODES = ("tree", "stream", "iterparse")
+
+
+def write_tree(drawing, path):
+    root = ET.Element("drawing")
+    parents = [root]
+    for event, index in drawing.walk():
+        if event == "begin":
+            parents.append(ET.SubElement(parents[-1], "group"))
+        elif event == "end":
+            parents.pop()
+        elif drawing.kind[index] == LINE:
+            line_element = ET.SubElement(parents[-1], "line")
+            begin_element = ET.SubElement(line_element, "begin")
+            ET.SubElement(begin_element, "x").text = str(drawing.x1[index])
+            ET.SubElement(begin_element, "y").text = str(drawing.y1[index])
+            end_element = ET.SubElement(line_element, "end")
+            ET.SubElement(end_element, "x").text = str(drawing.x2[index])
+            ET.SubElement(end_element, "y").text = str(drawing.y2[index])
+            ET.SubElement(line_element, "color").text = drawing.palette[drawing.color[index]]
+        else:
+            rect_element = ET.SubElement(parents[-1], "rectangle")
+            upper_left_element = ET.SubElement(rect_element, "upper-left")
+            ET.SubElement(upper_left_element, "x").text = str(drawing.x1[index])
+            ET.SubElement(upper_left_element, "y").text = str(drawing.y1[index])
+            lower_right_element = ET.SubElement(rect_element, "lower-right")
+            ET.SubElement(lower_right_element, "x").text = str(drawing.x2[index])
+            ET.SubElement(lower_right_element, "y").text = str(drawing.y2[index])
+            ET.SubElement(rect_element, "color").text = drawing.palette[drawing.color[index]]
+            ET.SubElement(rect_element, "corner").text = "rounded" if drawing.corner[index] == CURVED else "square"
+    ET.ElementTree(root).write(path, encoding="utf-8", xml_declaration=True)
+
+
+def peak_rss():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def child(mode, count, path):
+    drawing = make_drawing(count, group_every=100)
+    if mode == "iterparse":
+        with open(path, "w", encoding="utf-8") as file:
+            write_xml(drawing, file)
+        del drawing
+    baseline = peak_rss()
+    start = time.perf_counter()
+    if mode == "tree":
+        write_tree(drawing, path)
+    elif mode == "stream":
+        with open(path, "w", encoding="utf-8", buffering=1 << 20) as file:
+            write_xml(drawing, file)
+    else:
+        with open(path, "rb") as file:
+            read_xml(file)
+    print(time.perf_counter() - start, peak_rss() - baseline, os.path.getsize(path))
+
+
+def main(sizes):
+    print(f"{'shapes':>9} {'mode':>10} {'seconds':>8} {'file MiB':>9} {'peak RSS +MiB':>14}")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "drawing.xml")
+        for count in sizes:
+            for mode in MODES:
+                output = subprocess.run([sys.executable, __file__, "--child", mode, str(count), path],
+                                        check=True, capture_output=True, text=True).stdout
+                seconds, rss, size = output.split()
+                print(f"{count:>9} {mode:>10} {float(seconds):>8.2f} {int(size) / 2**20:>9.1f} {int(rss) / 2**20:>14.1f}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        child(sys.argv[2], int(sys.argv[3]), sys.argv[4])
+    else:
+        main([int(arg) for arg in sys.argv[1:]] or SIZES)
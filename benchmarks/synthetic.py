@@ -0,0 +1,41 @@
+"""Synthetic drawings for the benchmarks."""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from drawingtool.document import Drawing, SHARP, CURVED
+
+COLORS = ("#ffffff", "#ff0000", "#00ff00", "#0000ff", "#ffff00", "#00ffff")
+
+
+def make_drawing(count, group_every=0, size=4000.0, seed=1, mix=(1, 1, 1), group_depth=1):
+    # Lines, sharp rectangles and curved rectangles, interleaved in the
+    # proportions given by mix. With group_every set, every group_every-th
+    # record opens group_depth nested groups holding the next few shapes.
+    rng = random.Random(seed)
+    kinds = [kind for kind, weight in enumerate(mix) for _ in range(weight)]
+    drawing = Drawing()
+    parent = -1
+    left_in_group = 0
+    for index in range(count):
+        if group_every and index % group_every == 0:
+            parent = -1
+            for _ in range(group_depth):
+                parent = drawing.add_group(parent=parent)
+            left_in_group = group_every // 2
+            continue
+        x, y = rng.uniform(0, size), rng.uniform(0, size)
+        color = COLORS[index % len(COLORS)]
+        kind = kinds[index % len(kinds)]
+        if kind == 0:
+            drawing.add_line(x, y, x + rng.uniform(-50, 50), y + rng.uniform(-50, 50), color, parent=parent)
+        else:
+            corner = CURVED if kind == 2 else SHARP
+            drawing.add_rect(x, y, x + rng.uniform(1, 80), y + rng.uniform(1, 80), color, corner, parent=parent)
+        if left_in_group:
+            left_in_group -= 1
+            if not left_in_group:
+                parent = -1
+    return drawing
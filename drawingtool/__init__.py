@@ -0,0 +1,5 @@
+"""Drawing tool: a small vector drawing editor built on Qt's graphics view.
+
+Importing the package has no side effects. The GUI starts from main() in
+drawingtool.app, ``python -m drawingtool``, or rotate.py.
+"""
@@ -0,0 +1,23 @@
+"""Application entry point."""
+import os
+import sys
+
+from PyQt6.QtCore import QStandardPaths
+from PyQt6.QtWidgets import QApplication
+
+from .profiling import configure_from_environment, profiler
+from .window import MainWindow
+
+
+def main(argv=None):
+    app = QApplication(sys.argv if argv is None else argv)
+    app.setApplicationName("DrawingTool")
+    data_dir = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppLocalDataLocation)
+    window = MainWindow(autosave_dir=os.path.join(data_dir, "autosave"))
+    window.show()
+    window.recoverAutosave()
+    profile_path = configure_from_environment(window)
+    status = app.exec()
+    if profile_path:
+        profiler.dump(profile_path)
+    return status
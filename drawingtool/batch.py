@@ -0,0 +1,140 @@
+"""Headless batch converter and renderer.
+
+    python -m drawingtool.batch --to png [--out DIR] [--jobs N] [--scale S] [--dpi D] DRAWING...
+    python -m drawingtool.batch --to svg DRAWING...
+    python -m drawingtool.batch --to drwb DRAWING...
+
+Converts .txt, .xml and .drwb drawings to another drawing format or renders
+them to PNG, SVG or PDF. Files are spread over a multiprocessing pool; every
+worker runs its own QGuiApplication on the offscreen platform, so no window
+is ever shown. A file that fails is reported and skipped without stopping
+the batch.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+from .fileformats import read_drawing, write_drawing
+
+TARGETS = ("png", "svg", "pdf", "txt", "xml", "drwb")
+PNG_MARGIN = 10
+
+_app = None
+
+
+def _init_worker():
+    global _app
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt6.QtGui import QGuiApplication
+    _app = QGuiApplication.instance() or QGuiApplication(["batch"])
+
+
+def output_paths(paths, target, out_dir=None):
+    # drawing.txt becomes drawing.png. An output that would land on another
+    # output of the batch, or on an input, keeps its input's extension
+    # (drawing.txt.png); one that still clashes, as when --out gathers
+    # drawings of the same name from several folders, is numbered
+    # (drawing.txt-2.png). No two outputs, and no output and input, are ever
+    # the same file.
+    def key(path):
+        return os.path.normcase(os.path.abspath(path))
+
+    stems = [os.path.join(out_dir or os.path.dirname(path), os.path.splitext(os.path.basename(path))[0])
+             for path in paths]
+    counts = {}
+    for stem in stems:
+        counts[key(stem)] = counts.get(key(stem), 0) + 1
+    inputs = {key(path) for path in paths}
+    taken = set()
+    outputs = []
+    for stem, path in zip(stems, paths):
+        if counts[key(stem)] > 1 or key(stem + "." + target) in inputs:
+            stem = os.path.join(os.path.dirname(stem), os.path.basename(path))
+        output = stem + "." + target
+        number = 1
+        while key(output) in taken or key(output) in inputs:
+            number += 1
+            output = f"{stem}-{number}.{target}"
+        taken.add(key(output))
+        outputs.append(output)
+    return outputs
+
+
+def process_file(job):
+    path, output, target, scale, dpi = job
+    start = time.perf_counter()
+    result = {"path": path, "output": output, "shapes": 0, "error": None}
+    try:
+        drawing = read_drawing(path)
+        result["shapes"] = len(drawing)
+        if target == "png":
+            render_png(drawing, result["output"], scale, dpi)
+        elif target in ("svg", "pdf"):
+            render_vector(drawing, result["output"], target, scale)
+        else:
+            write_drawing(drawing, result["output"])
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def render_rect(drawing):
+    from PyQt6.QtCore import QRectF
+
+    left, top, right, bottom = drawing.bounds() or (0, 0, 0, 0)
+    return QRectF(left, top, right - left, bottom - top).adjusted(-PNG_MARGIN, -PNG_MARGIN, PNG_MARGIN, PNG_MARGIN)
+
+
+def render_png(drawing, path, scale=1.0, dpi=96):
+    from .pngexport import PngExport
+
+    # The process pool already uses every core, one painting thread per file is enough
+    PngExport(drawing, path, render_rect(drawing), scale=scale, dpi=dpi, workers=1).run()
+
+
+def render_vector(drawing, path, target, scale=1.0):
+    from .vectorexport import PdfExport, SvgExport
+
+    export = SvgExport if target == "svg" else PdfExport
+    export(drawing, path, render_rect(drawing), scale=scale).run()
+
+
+def run(paths, target, out_dir=None, jobs=None, scale=1.0, dpi=96, report=print):
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    jobs_list = [(path, output, target, scale, dpi) for path, output in zip(paths, output_paths(paths, target, out_dir))]
+    results = []
+    start = time.perf_counter()
+    with multiprocessing.Pool(jobs, initializer=_init_worker) as pool:
+        for result in pool.imap_unordered(process_file, jobs_list):
+            results.append(result)
+            if result["error"]:
+                report(f"FAILED {result['path']}: {result['error']}")
+            else:
+                report(f"{result['path']} -> {result['output']} ({result['shapes']} shapes, {result['seconds']:.2f} s)")
+    elapsed = time.perf_counter() - start
+    converted = [result for result in results if not result["error"]]
+    shapes = sum(result["shapes"] for result in converted)
+    report(f"{len(converted)}/{len(results)} files, {shapes} shapes in {elapsed:.2f} s "
+           f"({len(converted) / elapsed:.1f} files/s, {shapes / elapsed:.0f} shapes/s)")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert or render drawings without opening a window.")
+    parser.add_argument("drawings", nargs="+", help=".txt, .xml or .drwb files")
+    parser.add_argument("--to", choices=TARGETS, required=True, help="output format")
+    parser.add_argument("--out", help="output directory (default: next to each input)")
+    parser.add_argument("--jobs", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--scale", type=float, default=1.0, help="output pixels per scene unit")
+    parser.add_argument("--dpi", type=int, default=96, help="PNG resolution")
+    args = parser.parse_args(argv)
+    results = run(args.drawings, args.to, args.out, args.jobs, args.scale, args.dpi)
+    return 1 if any(result["error"] for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
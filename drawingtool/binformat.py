@@ -0,0 +1,251 @@
+"""Compact binary drawing format (.drwb).
+
+Layout, little-endian::
+
+    header      magic "DRWB", version u16, flags u16, shape count u64,
+                palette count u32, palette size in bytes u32
+    palette     per colour: name length u16, utf-8 name
+    styles      only with the STYLES flag: style count u32, size in bytes
+                u32, then per style: name and colour name (each length u16,
+                utf-8), width f32, dash u8, corner radius f64
+    transforms  only with the TRANSFORMS flag: transform count u64, then
+                per transform m11, m12, m21, m22, dx, dy (f64)
+    columns     x1, y1, x2, y2, z (f64), width (f32), colour index (u32),
+                parent index (i32), kind (i8), corner (i8), with the
+                STYLES flag style index (i32, -1 for none) and with the
+                TRANSFORMS flag transform index (i32, -1 for none)
+
+Each section starts on an 8-byte boundary. The parent column is the group
+structure: every record points at the group that holds it, or -1. Columns
+are the raw contents of the Drawing's arrays, so loading maps the file and
+copies each column in one go without parsing individual records.
+
+A version 2 file is a version 1 file followed by delta records (see
+delta.py), appended by incremental saves. The columns give top-level shapes
+the ids 1, 2, ... in order, and loading replays the records over them.
+"""
+import io
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from .document import MATRIX_SIZE, NO_STYLE, NO_TRANSFORM, Drawing, Style
+
+MAGIC = b"DRWB"
+VERSION = 2
+RECORDS_VERSION = 2  # Files with delta records after the columns
+VERSION_FIELD = struct.Struct("<H")
+VERSION_OFFSET = 4
+HEADER = struct.Struct("<4sHHQII")
+NAME_LENGTH = struct.Struct("<H")
+STYLES_HEADER = struct.Struct("<II")
+STYLE_FIELDS = struct.Struct("<fBd")
+TRANSFORMS_HEADER = struct.Struct("<Q")
+STYLES = 1  # Flag: the file has a style table and a style column
+TRANSFORMS = 2  # Flag: the file has a transform table and a transform column
+ALIGNMENT = 8
+COLUMNS = ("x1", "y1", "x2", "y2", "z", "width", "color", "parent", "kind", "corner")
+ITEM_SIZES = {name: getattr(Drawing(), name).itemsize for name in COLUMNS + ("style", "transform")}
+
+
+def _padding(offset):
+    return -offset % ALIGNMENT
+
+
+def _name(name):
+    name = name.encode()
+    return NAME_LENGTH.pack(len(name)) + name
+
+
+def _columns(flags):
+    return COLUMNS + (("style",) if flags & STYLES else ()) + (("transform",) if flags & TRANSFORMS else ())
+
+
+def _raw(column):
+    if sys.byteorder == "big":
+        column = column[:]
+        column.byteswap()
+    return column.tobytes()
+
+
+def write_binary(drawing, file, progress=None):
+    # The style and transform tables and columns are only written for
+    # drawings that have any. progress, if given, is called as
+    # progress(columns_written, columns) after every column.
+    palette = b"".join(map(_name, drawing.palette))
+    flags = (STYLES if drawing.styles else 0) | (TRANSFORMS if drawing.transforms else 0)
+    file.write(HEADER.pack(MAGIC, 1, flags, len(drawing), len(drawing.palette), len(palette)))
+    file.write(palette + bytes(_padding(HEADER.size + len(palette))))
+    if flags & STYLES:
+        styles = b"".join(_name(style.name) + _name(style.color) + STYLE_FIELDS.pack(style.width, style.dash, style.radius)
+                          for style in drawing.styles)
+        file.write(STYLES_HEADER.pack(len(drawing.styles), len(styles)) + styles)
+        file.write(bytes(_padding(STYLES_HEADER.size + len(styles))))
+    if flags & TRANSFORMS:
+        file.write(TRANSFORMS_HEADER.pack(len(drawing.transforms) // MATRIX_SIZE) + _raw(drawing.transforms))
+    names = _columns(flags)
+    for done, name in enumerate(names, 1):
+        data = _raw(getattr(drawing, name))
+        file.write(data)
+        file.write(bytes(_padding(len(data))))
+        if progress:
+            progress(done, len(names))
+
+
+def read_binary(file, progress=None):
+    # progress, if given, is called once as progress(total_bytes, total_bytes);
+    # there is nothing to report in between.
+    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        view = memoryview(mapped)
+        try:
+            drawing = _read_view(view)
+        finally:
+            view.release()
+        if progress:
+            progress(len(mapped), len(mapped))
+        return drawing
+
+
+def to_bytes(drawing):
+    buffer = io.BytesIO()
+    write_binary(drawing, buffer)
+    return buffer.getvalue()
+
+
+def from_bytes(data):
+    view = memoryview(data)
+    try:
+        return _read_view(view)
+    finally:
+        view.release()
+
+
+def _read_name(view, offset):
+    (length,) = NAME_LENGTH.unpack_from(view, offset)
+    offset += NAME_LENGTH.size
+    return bytes(view[offset:offset + length]).decode(), offset + length
+
+
+def _layout(view):
+    # Checks the header and returns (version, shape count, palette names,
+    # styles, transform table, {column name: offset}, offset after the
+    # columns)
+    if len(view) < HEADER.size:
+        raise ValueError("not a binary drawing")
+    magic, version, flags, count, palette_count, palette_size = HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError("not a binary drawing")
+    if version > VERSION:
+        raise ValueError(f"unsupported binary drawing version {version}")
+
+    palette = []
+    offset = HEADER.size
+    for _ in range(palette_count):
+        name, offset = _read_name(view, offset)
+        palette.append(name)
+    offset = HEADER.size + palette_size
+    offset += _padding(offset)
+
+    styles = []
+    if flags & STYLES:
+        style_count, styles_size = STYLES_HEADER.unpack_from(view, offset)
+        end = offset + STYLES_HEADER.size + styles_size
+        offset += STYLES_HEADER.size
+        for _ in range(style_count):
+            name, offset = _read_name(view, offset)
+            color, offset = _read_name(view, offset)
+            width, dash, radius = STYLE_FIELDS.unpack_from(view, offset)
+            offset += STYLE_FIELDS.size
+            styles.append(Style(name, color, width, dash, radius))
+        offset = end + _padding(end)
+
+    transforms = array("d")
+    if flags & TRANSFORMS:
+        (transform_count,) = TRANSFORMS_HEADER.unpack_from(view, offset)
+        offset += TRANSFORMS_HEADER.size
+        size = transform_count * MATRIX_SIZE * transforms.itemsize
+        if offset + size > len(view):
+            raise ValueError("truncated binary drawing")
+        transforms.frombytes(view[offset:offset + size])
+        if sys.byteorder == "big":
+            transforms.byteswap()
+        offset += size
+
+    offsets = {}
+    for name in _columns(flags):
+        size = count * ITEM_SIZES[name]
+        if offset + size > len(view):
+            raise ValueError("truncated binary drawing")
+        offsets[name] = offset
+        offset += size + _padding(size)
+    return version, count, palette, styles, transforms, offsets, offset
+
+
+def _read_view(view):
+    version, count, palette, styles, transforms, offsets, end = _layout(view)
+    drawing = Drawing()
+    for name in palette:
+        drawing.color_id(name)
+    for style in styles:
+        drawing.style_id(style)
+    drawing.transforms = transforms
+    for name in offsets:
+        column = getattr(drawing, name)
+        column.frombytes(view[offsets[name]:offsets[name] + count * column.itemsize])
+        if sys.byteorder == "big":
+            column.byteswap()
+    if "style" not in offsets:
+        drawing.style = array("i", [NO_STYLE]) * count
+    if "transform" not in offsets:
+        drawing.transform = array("i", [NO_TRANSFORM]) * count
+    if version >= RECORDS_VERSION:
+        from .delta import DeltaState, iter_records
+
+        state = DeltaState()
+        state.add(drawing, range(1, len(drawing.roots()) + 1))
+        for payload, _end in iter_records(view, end):
+            state.apply(payload)
+        drawing = state.drawing()
+    return drawing
+
+
+def read_ids(file):
+    # For incremental saves: the ids of a .drwb file's top-level shapes in
+    # save order, where its columns end and where its last intact record
+    # ends. Only the parent column and the records' id lists are read.
+    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        view = memoryview(mapped)
+        try:
+            version, count, _palette, _styles, _transforms, offsets, columns_end = _layout(view)
+            parent = array("i")
+            parent.frombytes(view[offsets["parent"]:offsets["parent"] + count * parent.itemsize])
+            ids = range(1, parent.count(-1) + 1)
+            end = columns_end
+            if version >= RECORDS_VERSION:
+                from .delta import iter_records, replay_ids
+
+                records = list(iter_records(view, columns_end))
+                ids = replay_ids(ids, [payload for payload, _end in records])
+                if records:
+                    end = records[-1][1]
+                records = None
+        finally:
+            view.release()
+    return list(ids), columns_end, end
+
+
+def append_records(file, end, records):
+    # Writes delta records into a .drwb file opened "r+b", replacing anything
+    # after end, and marks the file as holding records. Returns the new end.
+    file.seek(end)
+    for record in records:
+        file.write(record)
+    end = file.tell()
+    file.truncate()
+    file.seek(VERSION_OFFSET)
+    file.write(VERSION_FIELD.pack(RECORDS_VERSION))
+    file.flush()
+    os.fsync(file.fileno())
+    return end
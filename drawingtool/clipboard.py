@@ -0,0 +1,41 @@
+"""Copy and paste of shapes as serialized drawings.
+
+The selection is written once into the .drwb binary layout. The same bytes
+go on the system clipboard, so pasting into another running instance costs
+no more than duplicating in place.
+"""
+from PyQt6.QtCore import QMimeData
+from PyQt6.QtGui import QGuiApplication
+
+from .binformat import from_bytes, to_bytes
+from .shapes import drawing_from_items, items_from_drawing
+
+MIME_TYPE = "application/x-drawingtool-drwb"
+PASTE_OFFSET = 20.0
+
+
+def serialize(items):
+    return to_bytes(drawing_from_items(items))
+
+
+def materialize(data, dx=PASTE_OFFSET, dy=PASTE_OFFSET, styles=None):
+    # Returns the top-level items for a serialized selection, every coordinate
+    # shifted by (dx, dy). With a StyleTable given, pasted shapes use its
+    # styles of the same names.
+    drawing = from_bytes(data)
+    drawing.translate(dx, dy)
+    return items_from_drawing(drawing, styles)
+
+
+def set_clipboard(data):
+    mime_data = QMimeData()
+    mime_data.setData(MIME_TYPE, data)
+    QGuiApplication.clipboard().setMimeData(mime_data)
+
+
+def clipboard_data():
+    # The serialized selection on the clipboard, or None
+    mime_data = QGuiApplication.clipboard().mimeData()
+    if mime_data is None or not mime_data.hasFormat(MIME_TYPE):
+        return None
+    return bytes(mime_data.data(MIME_TYPE))
@@ -0,0 +1,291 @@
+"""Delta records: the top-level items an edit added, changed, replaced or removed.
+
+The autosave journal and incremental .drwb saves both write these. Every
+top-level item has an id. Added and changed items go in as .drwb bytes, and
+removals only need their ids. A restyle is one STYLES record holding the
+new definitions, however many shapes use them.
+
+Record layout, little-endian::
+
+    record      payload length u32, crc32 of payload u32, payload
+
+    payload     op u8, id count u32, ids u64[id count], then for UPSERT and
+                REPLACE a .drwb drawing whose top-level shapes belong, in
+                order, to the ids (for REPLACE, to the new id of each pair);
+                for STYLES no ids and a .drwb drawing with only a style table
+
+A torn last record, as left by a crash, fails its checksum and ends the
+sequence.
+"""
+import struct
+import sys
+import zlib
+from array import array
+from itertools import repeat
+
+from .binformat import from_bytes, to_bytes
+from .document import Drawing
+from .shapes import drawing_from_items
+
+RECORD = struct.Struct("<II")
+OP = struct.Struct("<BI")
+
+UPSERT = 1
+REMOVE = 2
+REPLACE = 3  # ids are (old, new) pairs; the new item takes the old one's place
+STYLES = 4  # Style definitions; every shape using them takes them on
+
+
+def encode_record(op, ids, drawing=None):
+    ids = array("Q", ids)
+    if sys.byteorder == "big":
+        ids.byteswap()
+    payload = OP.pack(op, len(ids)) + ids.tobytes()
+    if drawing is not None:
+        payload += to_bytes(drawing)
+    return RECORD.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def decode_ids(payload):
+    op, count = OP.unpack_from(payload)
+    ids = array("Q")
+    ids.frombytes(payload[OP.size:OP.size + 8 * count])
+    if sys.byteorder == "big":
+        ids.byteswap()
+    return op, ids
+
+
+def decode_record(payload):
+    op, ids = decode_ids(payload)
+    drawing = from_bytes(payload[OP.size + 8 * len(ids):]) if op != REMOVE else None
+    return op, ids, drawing
+
+
+def iter_records(data, offset=0):
+    # Yields (payload, end offset) for every intact record from offset on
+    while offset + RECORD.size <= len(data):
+        length, crc = RECORD.unpack_from(data, offset)
+        payload = data[offset + RECORD.size:offset + RECORD.size + length]
+        if len(payload) < length or zlib.crc32(payload) != crc:
+            break
+        offset += RECORD.size + length
+        yield payload, offset
+
+
+class DeltaState:
+    # The drawing a sequence of records describes, kept as slots that point
+    # into the record drawings rather than copied out of them. Slots keep
+    # save order: new ids are appended and a replaced id keeps its place.
+    # Style definitions are taken in record order, so the newest wins.
+    def __init__(self):
+        self._slots = []  # (drawing, start, stop) or None
+        self._slot_of = {}  # id -> slot
+        self._styles = {}  # name -> Style
+
+    def __len__(self):
+        return len(self._slot_of)
+
+    def add(self, drawing, ids):
+        # Sets the top-level shapes of drawing, in order, to ids
+        self._takeStyles(drawing)
+        self._apply(UPSERT, ids, _entries(drawing))
+
+    def apply(self, payload):
+        op, ids, drawing = decode_record(payload)
+        if drawing is not None:
+            self._takeStyles(drawing)
+        self._apply(op, ids, _entries(drawing) if drawing is not None else ())
+
+    def _takeStyles(self, drawing):
+        for style in drawing.styles:
+            self._styles[style.name] = style
+
+    def applyIds(self, payload):
+        # Like apply, but only the ids are followed and no drawing is read
+        op, ids = decode_ids(payload)
+        self._apply(op, ids, repeat(True))
+
+    def _apply(self, op, ids, entries):
+        if op == REMOVE:
+            for item_id in ids:
+                slot = self._slot_of.pop(item_id, None)
+                if slot is not None:
+                    self._slots[slot] = None
+        elif op == REPLACE:
+            for old_id, new_id, entry in zip(ids[::2], ids[1::2], entries):
+                self._put(old_id, new_id, entry)
+        else:
+            for item_id, entry in zip(ids, entries):
+                self._put(item_id, item_id, entry)
+
+    def _put(self, old_id, new_id, entry):
+        slot = self._slot_of.pop(old_id, None)
+        if slot is None:
+            slot = self._slot_of.get(new_id)
+        if slot is None:
+            slot = len(self._slots)
+            self._slots.append(None)
+        self._slots[slot] = entry
+        self._slot_of[new_id] = slot
+
+    def drawing(self):
+        # The whole drawing in save order. Neighbouring slots that come from
+        # one record are copied as a single run of every column.
+        drawing = Drawing()
+        run = None
+        for entry in self._slots:
+            if entry is None:
+                continue
+            if run is not None and run[0] is entry[0] and run[2] == entry[1]:
+                run = (run[0], run[1], entry[2])
+                continue
+            if run is not None:
+                drawing.extend(run[0], start=run[1], stop=run[2])
+            run = entry
+        if run is not None:
+            drawing.extend(run[0], start=run[1], stop=run[2])
+        drawing.restyle(self._styles)
+        return drawing
+
+    def ids(self):
+        ids_by_slot = sorted((slot, item_id) for item_id, slot in self._slot_of.items())
+        return [item_id for _slot, item_id in ids_by_slot]
+
+
+def replay_ids(ids, payloads):
+    # The ids left, in save order, once payloads are applied over ids. Only
+    # the id lists are read, none of the drawings.
+    state = DeltaState()
+    state._apply(UPSERT, ids, repeat(True))
+    for payload in payloads:
+        state.applyIds(payload)
+    return state.ids()
+
+
+def _entries(drawing):
+    roots = [index for index, parent in enumerate(drawing.parent) if parent == -1]
+    return ((drawing, start, stop) for start, stop in zip(roots, roots[1:] + [len(drawing)]))
+
+
+class EditLog:
+    # Collects, in order, the top-level items that edits added, removed,
+    # replaced or changed, and turns them into records on request. The scene's
+    # item registry reports adds, removes and replaces; the scene reports the
+    # items each edit changed and calls commit() once the edit is done.
+    #
+    # In a paged scene (see paging.py) shapes leave and re-enter the scene as
+    # different items. Their record ids are parked under their paging keys in
+    # the meantime.
+    def __init__(self):
+        self._ids = {}  # id(item) -> (record id, item)
+        self._parked = array("Q")  # paging key -> record id, 0 for none
+        self._next_id = 1
+        self._events = []  # (op, items) in the order they happened
+        self._encoded = []  # Records encoded ahead of records()
+
+    def _id(self, item):
+        entry = self._ids.get(id(item))
+        if entry is None:
+            entry = self._ids[id(item)] = (self._next_id, item)
+            self._next_id += 1
+        return entry[0]
+
+    def _event(self, op, item):
+        if self._events and self._events[-1][0] == op:
+            self._events[-1][1].append(item)
+        else:
+            self._events.append((op, [item]))
+
+    def itemAdded(self, item):
+        self._event(UPSERT, item)
+
+    def itemRemoved(self, item):
+        self._event(REMOVE, item)
+
+    def itemReplaced(self, old_item, new_item):
+        self._event(REPLACE, (old_item, new_item))
+
+    def itemsChanged(self, items):
+        for item in items:
+            if id(item) in self._ids:
+                self._event(UPSERT, item)
+
+    def stylesChanged(self, styles):
+        for style in styles:
+            self._event(STYLES, style)
+
+    def itemsLoaded(self, items, keys):
+        for item, key in zip(items, keys):
+            if key < len(self._parked) and self._parked[key]:
+                self._ids[id(item)] = (self._parked[key], item)
+                self._parked[key] = 0
+
+    def itemsUnloaded(self, items, keys):
+        # The items are about to go, so events naming them are encoded now
+        self._encoded.extend(self._encode())
+        for item, key in zip(items, keys):
+            entry = self._ids.pop(id(item), None)
+            if entry is not None:
+                if key >= len(self._parked):
+                    self._parked.extend(repeat(0, key + 1 - len(self._parked)))
+                self._parked[key] = entry[0]
+
+    def commit(self):
+        pass
+
+    def pending(self):
+        return bool(self._events or self._encoded)
+
+    def reset(self, entries, ids=None):
+        # Forgets every event and names the top-level entries by ids (1, 2,
+        # ... by default), as the records already written know them. Entries
+        # are items, or the paging keys of shapes not in the scene.
+        self._events = []
+        self._encoded = []
+        self._ids = {}
+        ids = list(range(1, len(entries) + 1) if ids is None else ids)
+        parked = []
+        for entry, item_id in zip(entries, ids):
+            if isinstance(entry, int):
+                parked.append((entry, item_id))
+            else:
+                self._ids[id(entry)] = (item_id, entry)
+        self._parked = array("Q", bytes(8 * (max((key for key, _id in parked), default=-1) + 1)))
+        for key, item_id in parked:
+            self._parked[key] = item_id
+        self._next_id = max(ids, default=0) + 1
+        return ids
+
+    def records(self):
+        # Encodes and forgets the events so far. An item changed several
+        # times in a row is written once, as it is now.
+        records, self._encoded = self._encoded, []
+        records.extend(self._encode())
+        return records
+
+    def _encode(self):
+        events, self._events = self._events, []
+        records = []
+        for op, items in events:
+            if op == UPSERT:
+                unique = list({id(item): item for item in items}.values())
+                ids = [self._id(item) for item in unique]
+                records.append(encode_record(UPSERT, ids, drawing_from_items(unique)))
+            elif op == STYLES:
+                drawing = Drawing()
+                for style in items:
+                    drawing.style_id(style)
+                records.append(encode_record(STYLES, [], drawing))
+            elif op == REMOVE:
+                ids = [self._id(item) for item in items]
+                for item in items:
+                    del self._ids[id(item)]
+                records.append(encode_record(REMOVE, ids))
+            else:
+                ids = []
+                for old_item, new_item in items:
+                    ids.append(self._id(old_item))
+                    del self._ids[id(old_item)]
+                    ids.append(self._id(new_item))
+                records.append(encode_record(REPLACE, ids, drawing_from_items([new for _old, new in items])))
+        return records
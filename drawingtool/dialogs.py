@@ -0,0 +1,153 @@
+"""Dialogs opened from the main window. Imported on first use."""
+from PyQt6.QtGui import QColor
+from PyQt6.QtWidgets import (QColorDialog, QComboBox, QDialog, QDoubleSpinBox, QFormLayout, QGraphicsRectItem,
+                             QHBoxLayout, QInputDialog, QPushButton, QVBoxLayout)
+
+from .document import CORNER_RADIUS, DASH_STYLES
+from .shapes import RoundedRectItem
+
+
+class EditDialog(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout()
+
+        self.color_button = QPushButton("Change Color")
+        self.corner_style = "Sharp"
+        self.color_button.clicked.connect(self.chooseColor)
+        layout.addWidget(self.color_button)
+
+        self.corner_button = None
+        for item in parent.scene.selectedItems():
+            if isinstance(item, QGraphicsRectItem):
+                self.corner_combo = QComboBox()
+                self.corner_combo.addItems(["Select Corner Style", "Sharp", "Curved"])
+                self.corner_combo.currentIndexChanged.connect(self.handleCornerStyleChange)
+                layout.addWidget(self.corner_combo)
+                break
+
+        self.setLayout(layout)
+
+    def chooseColor(self):
+        # Recoloured items leave their style. Items whose pens differed only
+        # in colour share one new pen. A shape can only be saved with a dash
+        # or a corner radius of its own through a style, so an item with
+        # either takes a recoloured copy of its style instead (see
+        # MainWindow.edit).
+        color = QColorDialog.getColor()
+        if color.isValid():
+            styles = self.parent().scene.styles
+            pens = {}
+            for item in self.parent().scene.selectedItems():
+                style = styles.styleOf(item)
+                if style is not None and (style.dash or isinstance(item, RoundedRectItem)
+                                          and style.radius != CORNER_RADIUS):
+                    styles.assign(item, styles.recolored(style, color.name()))
+                    continue
+                pen = item.pen()
+                key = (pen.widthF(), pen.style())
+                if key not in pens:
+                    pen.setColor(color)
+                    pens[key] = pen
+                styles.assign(item, None, pens[key])
+
+    def handleCornerStyleChange(self, index):
+        if index == 1:
+            self.corner_style = "Sharp"
+        elif index == 2:
+            self.corner_style = "Curved"
+        else:
+            self.corner_style = None
+
+
+class StyleDialog(QDialog):
+    # Edits the scene's named styles. Every change redefines the style for
+    # all shapes using it, through the window so it can be undone.
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.setWindowTitle("Styles")
+        self.main_window = parent
+        self.styles = parent.scene.styles
+        layout = QVBoxLayout()
+
+        row = QHBoxLayout()
+        self.style_combo = QComboBox()
+        self.style_combo.currentTextChanged.connect(self.showStyle)
+        row.addWidget(self.style_combo)
+        new_button = QPushButton("New Style")
+        new_button.clicked.connect(self.newStyle)
+        row.addWidget(new_button)
+        layout.addLayout(row)
+
+        form = QFormLayout()
+        self.color_button = QPushButton()
+        self.color_button.clicked.connect(self.chooseColor)
+        form.addRow("Color", self.color_button)
+        self.width_spin = QDoubleSpinBox()
+        self.width_spin.setRange(0.0, 100.0)
+        self.width_spin.valueChanged.connect(lambda value: self.restyle(mergeable=True, width=value))
+        form.addRow("Width", self.width_spin)
+        self.dash_combo = QComboBox()
+        self.dash_combo.addItems(DASH_STYLES)
+        self.dash_combo.currentIndexChanged.connect(lambda index: self.restyle(dash=index))
+        form.addRow("Line", self.dash_combo)
+        self.radius_spin = QDoubleSpinBox()
+        self.radius_spin.setRange(0.0, 1000.0)
+        self.radius_spin.valueChanged.connect(lambda value: self.restyle(mergeable=True, radius=value))
+        form.addRow("Corner radius", self.radius_spin)
+        layout.addLayout(form)
+
+        apply_button = QPushButton("Apply To Selection")
+        apply_button.clicked.connect(lambda: self.main_window.applyStyle(self.style_combo.currentText()))
+        layout.addWidget(apply_button)
+        current_button = QPushButton("Draw New Shapes With It")
+        current_button.clicked.connect(self.makeCurrent)
+        layout.addWidget(current_button)
+
+        self.setLayout(layout)
+        self.loading = False
+        self.fillCombo(self.styles.current)
+
+    def fillCombo(self, name):
+        self.style_combo.blockSignals(True)
+        self.style_combo.clear()
+        self.style_combo.addItems([style.name for style in self.styles])
+        self.style_combo.blockSignals(False)
+        self.style_combo.setCurrentText(name)
+        self.showStyle(name)
+
+    def showStyle(self, name):
+        style = self.styles.get(name)
+        if style is None:
+            return
+        self.loading = True
+        self.color_button.setText(style.color)
+        self.width_spin.setValue(style.width)
+        self.dash_combo.setCurrentIndex(style.dash)
+        self.radius_spin.setValue(style.radius)
+        self.loading = False
+
+    def restyle(self, mergeable=False, **changes):
+        style = self.styles.get(self.style_combo.currentText())
+        if style is not None and not self.loading:
+            self.main_window.restyle(style.replace(**changes), mergeable)
+
+    def chooseColor(self):
+        style = self.styles.get(self.style_combo.currentText())
+        if style is None:
+            return
+        color = QColorDialog.getColor(QColor(style.color), self)
+        if color.isValid():
+            self.restyle(color=color.name())
+            self.color_button.setText(color.name())
+
+    def newStyle(self):
+        # A new style starts as a copy of the one shown
+        name, ok = QInputDialog.getText(self, "New Style", "Name:")
+        style = self.styles.get(self.style_combo.currentText())
+        if ok and name and name not in self.styles and style is not None:
+            self.main_window.defineStyle(style.replace(name=name))
+            self.fillCombo(name)
+
+    def makeCurrent(self):
+        self.styles.current = self.style_combo.currentText()
@@ -0,0 +1,350 @@
+"""Headless document model for drawings.
+
+A Drawing stores every shape column-wise in typed arrays, so a drawing with
+millions of shapes can be loaded, edited and written out without creating a
+single Qt object. Records are kept in pre-order: a group comes before its
+children, and every child points back at its group through ``parent``.
+
+Shapes may share a named Style. A styled record points at it through
+``style``, an index into the drawing's style table; its colour and width
+columns hold the style's, so readers that know nothing of styles still see
+every shape as it looks.
+
+A record can have a transform: its coordinates are then in its own frame,
+and the transform, six numbers (m11, m12, m21, m22, dx, dy) in the order
+QTransform takes them, maps them onto the canvas. Records without one hold
+canvas coordinates. Only shapes turned, scaled or sheared need one, so the
+table grows with them rather than with the drawing.
+"""
+from array import array
+from itertools import compress, repeat
+
+LINE = 0
+RECTANGLE = 1
+GROUP = 2
+
+SHARP = 0
+CURVED = 1
+
+CORNER_RADIUS = 50  # of curved rectangles, in scene units
+
+NO_STYLE = -1
+NO_TRANSFORM = -1
+MATRIX_SIZE = 6  # Numbers per transform
+
+SHAPE_TYPES = ("Line", "Rectangle", "Group")
+CORNER_STYLES = ("Sharp", "Curved")
+DASH_STYLES = ("Solid", "Dash", "Dot", "DashDot")
+
+
+class Shape:
+    # A single record detached from its Drawing. Coordinates are plain
+    # (x, y) tuples; for rectangles they are the top-left and bottom-right
+    # corners. matrix is the record's transform, or None.
+    __slots__ = ("shape_type", "start_point", "end_point", "color", "z", "corner_style", "parent", "width", "matrix")
+
+    def __init__(self, shape_type, start_point, end_point, color, z=0.0, corner_style="Sharp", parent=-1, width=1.0,
+                 matrix=None):
+        self.shape_type = shape_type
+        self.start_point = start_point
+        self.end_point = end_point
+        self.color = color
+        self.z = z
+        self.corner_style = corner_style
+        self.parent = parent
+        self.width = width
+        self.matrix = matrix
+
+    def __repr__(self):
+        return f"Shape({self.shape_type!r}, {self.start_point!r}, {self.end_point!r}, {self.color!r})"
+
+
+class Style:
+    # A named look shared by many shapes: colour name, pen width, dash (an
+    # index into DASH_STYLES) and the corner radius of curved rectangles.
+    # Styles are values; changing one means defining a new Style of the
+    # same name.
+    __slots__ = ("name", "color", "width", "dash", "radius")
+
+    def __init__(self, name, color, width=1.0, dash=0, radius=CORNER_RADIUS):
+        self.name = name
+        self.color = color
+        self.width = width
+        self.dash = dash
+        self.radius = radius
+
+    def _key(self):
+        return (self.name, self.color, self.width, self.dash, self.radius)
+
+    def __eq__(self, other):
+        return isinstance(other, Style) and self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __repr__(self):
+        return f"Style({self.name!r}, {self.color!r}, {self.width!r}, {self.dash!r}, {self.radius!r})"
+
+    def replace(self, **changes):
+        fields = {name: getattr(self, name) for name in self.__slots__}
+        fields.update(changes)
+        return Style(**fields)
+
+
+class Drawing:
+    def __init__(self):
+        self.kind = array("b")
+        self.x1 = array("d")
+        self.y1 = array("d")
+        self.x2 = array("d")
+        self.y2 = array("d")
+        self.color = array("I")
+        self.width = array("f")
+        self.z = array("d")
+        self.corner = array("b")
+        self.parent = array("i")
+        self.style = array("i")
+        self.transform = array("i")
+        self.palette = []  # colour names, indexed by the values in self.color
+        self._palette_ids = {}
+        self.styles = []  # Styles, indexed by the values in self.style
+        self._style_ids = {}
+        self.transforms = array("d")  # MATRIX_SIZE numbers per transform, indexed by self.transform
+
+    def __len__(self):
+        return len(self.kind)
+
+    def __getitem__(self, index):
+        return Shape(SHAPE_TYPES[self.kind[index]],
+                     (self.x1[index], self.y1[index]),
+                     (self.x2[index], self.y2[index]),
+                     self.palette[self.color[index]] if self.kind[index] != GROUP else None,
+                     self.z[index],
+                     CORNER_STYLES[self.corner[index]],
+                     self.parent[index],
+                     self.width[index],
+                     self.matrix(index))
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def color_id(self, name):
+        # Colours are interned, so each distinct colour is stored once.
+        color_id = self._palette_ids.get(name)
+        if color_id is None:
+            color_id = len(self.palette)
+            self.palette.append(name)
+            self._palette_ids[name] = color_id
+        return color_id
+
+    def style_id(self, style):
+        # Styles are interned by name. A later definition of a name replaces
+        # the earlier one, so the table always holds the newest.
+        style_id = self._style_ids.get(style.name)
+        if style_id is None:
+            style_id = len(self.styles)
+            self.styles.append(style)
+            self._style_ids[style.name] = style_id
+        else:
+            self.styles[style_id] = style
+        return style_id
+
+    def transform_id(self, matrix):
+        # Transforms are not interned; turned shapes rarely share one
+        self.transforms.extend(matrix)
+        return len(self.transforms) // MATRIX_SIZE - 1
+
+    def matrix(self, index):
+        # The transform of record index, or None
+        transform_id = self.transform[index]
+        if transform_id == NO_TRANSFORM:
+            return None
+        start = transform_id * MATRIX_SIZE
+        return tuple(self.transforms[start:start + MATRIX_SIZE])
+
+    def restyle(self, styles):
+        # Takes the definitions in styles (name -> Style) over the table's and
+        # brings the colour and width of every styled record in line with its
+        # style
+        for style_id, style in enumerate(self.styles):
+            self.styles[style_id] = styles.get(style.name, style)
+        if not self.styles:
+            return
+        colors = [self.color_id(style.color) for style in self.styles]
+        widths = [style.width for style in self.styles]
+        for index, style_id in enumerate(self.style):
+            if style_id != NO_STYLE:
+                self.color[index] = colors[style_id]
+                self.width[index] = widths[style_id]
+
+    def append_record(self, kind, x1, y1, x2, y2, color_id, width, z, corner, parent, style=NO_STYLE,
+                      transform=NO_TRANSFORM):
+        self.kind.append(kind)
+        self.x1.append(x1)
+        self.y1.append(y1)
+        self.x2.append(x2)
+        self.y2.append(y2)
+        self.color.append(color_id)
+        self.width.append(width)
+        self.z.append(z)
+        self.corner.append(corner)
+        self.parent.append(parent)
+        self.style.append(style)
+        self.transform.append(transform)
+        return len(self.kind) - 1
+
+    def _transform_id(self, matrix):
+        return self.transform_id(matrix) if matrix is not None else NO_TRANSFORM
+
+    def add_line(self, x1, y1, x2, y2, color, z=0.0, parent=-1, width=1.0, matrix=None):
+        return self.append_record(LINE, x1, y1, x2, y2, self.color_id(color), width, z, SHARP, parent, NO_STYLE,
+                                  self._transform_id(matrix))
+
+    def add_rect(self, x1, y1, x2, y2, color, corner=SHARP, z=0.0, parent=-1, width=1.0, matrix=None):
+        return self.append_record(RECTANGLE, x1, y1, x2, y2, self.color_id(color), width, z, corner, parent, NO_STYLE,
+                                  self._transform_id(matrix))
+
+    def add_group(self, z=0.0, parent=-1, matrix=None):
+        return self.append_record(GROUP, 0.0, 0.0, 0.0, 0.0, 0, 0.0, z, SHARP, parent, NO_STYLE,
+                                  self._transform_id(matrix))
+
+    def append(self, shape, parent=-1):
+        kind = SHAPE_TYPES.index(shape.shape_type)
+        if kind == GROUP:
+            return self.add_group(shape.z, parent, shape.matrix)
+        (x1, y1), (x2, y2) = shape.start_point, shape.end_point
+        return self.append_record(kind, x1, y1, x2, y2, self.color_id(shape.color), shape.width, shape.z,
+                            CORNER_STYLES.index(shape.corner_style), parent, NO_STYLE,
+                            self._transform_id(shape.matrix))
+
+    def walk(self):
+        # Yields ("shape", i), ("begin", i) and ("end", i) events in file order,
+        # which is what the nested begin/end and <group> formats need.
+        open_groups = []
+        parent = self.parent
+        for index in range(len(self)):
+            while open_groups and parent[index] != open_groups[-1]:
+                yield "end", open_groups.pop()
+            if self.kind[index] == GROUP:
+                yield "begin", index
+                open_groups.append(index)
+            else:
+                yield "shape", index
+        while open_groups:
+            yield "end", open_groups.pop()
+
+    def extent(self, index):
+        # (left, top, right, bottom) of record index on the canvas
+        x1, y1, x2, y2 = self.x1[index], self.y1[index], self.x2[index], self.y2[index]
+        matrix = self.matrix(index)
+        if matrix is None:
+            return min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)
+        m11, m12, m21, m22, dx, dy = matrix
+        corners = ((x1, y1), (x2, y2)) if self.kind[index] == LINE else ((x1, y1), (x2, y1), (x2, y2), (x1, y2))
+        xs = [m11 * x + m21 * y + dx for x, y in corners]
+        ys = [m12 * x + m22 * y + dy for x, y in corners]
+        return min(xs), min(ys), max(xs), max(ys)
+
+    def bounds(self):
+        # (left, top, right, bottom) of every shape, or None for an empty drawing
+        if self.transforms:
+            shapes = [kind != GROUP and transform == NO_TRANSFORM for kind, transform in zip(self.kind, self.transform)]
+        else:
+            shapes = [kind != GROUP for kind in self.kind]
+        bounds = None
+        if any(shapes):
+            bounds = (min(min(compress(self.x1, shapes)), min(compress(self.x2, shapes))),
+                      min(min(compress(self.y1, shapes)), min(compress(self.y2, shapes))),
+                      max(max(compress(self.x1, shapes)), max(compress(self.x2, shapes))),
+                      max(max(compress(self.y1, shapes)), max(compress(self.y2, shapes))))
+        if self.transforms:
+            for index, (kind, transform) in enumerate(zip(self.kind, self.transform)):
+                if kind != GROUP and transform != NO_TRANSFORM:
+                    left, top, right, bottom = self.extent(index)
+                    if bounds is not None:
+                        left, top = min(left, bounds[0]), min(top, bounds[1])
+                        right, bottom = max(right, bounds[2]), max(bottom, bounds[3])
+                    bounds = (left, top, right, bottom)
+        return bounds
+
+    def roots(self):
+        return [index for index in range(len(self)) if self.parent[index] == -1]
+
+    def extend(self, other, dx=0.0, dy=0.0, parent=-1, start=0, stop=None):
+        # Appends records start..stop of other (all of them by default), shifted
+        # by (dx, dy). The range must hold whole subtrees. Parent indices are
+        # rebased so groups keep pointing at their own copies.
+        stop = len(other) if stop is None else stop
+        base = len(self)
+        offset = base - start
+        color_map = [self.color_id(name) for name in other.palette]
+        style_map = [self.style_id(style) for style in other.styles]
+        self.kind.extend(other.kind[start:stop])
+        if other.transforms:
+            # Transformed records move by their transform, not their coordinates
+            for index in range(start, stop):
+                matrix = other.matrix(index)
+                if matrix is None:
+                    self.x1.append(other.x1[index] + dx)
+                    self.y1.append(other.y1[index] + dy)
+                    self.x2.append(other.x2[index] + dx)
+                    self.y2.append(other.y2[index] + dy)
+                    self.transform.append(NO_TRANSFORM)
+                else:
+                    self.x1.append(other.x1[index])
+                    self.y1.append(other.y1[index])
+                    self.x2.append(other.x2[index])
+                    self.y2.append(other.y2[index])
+                    self.transform.append(self.transform_id(matrix[:4] + (matrix[4] + dx, matrix[5] + dy)))
+        else:
+            self._extend_coordinates(other, dx, dy, start, stop)
+            self.transform.extend(repeat(NO_TRANSFORM, stop - start))
+        self.color.extend(color_map[c] if color_map else 0 for c in other.color[start:stop])
+        self.width.extend(other.width[start:stop])
+        self.z.extend(other.z[start:stop])
+        self.corner.extend(other.corner[start:stop])
+        self.parent.extend(p + offset if p != -1 else parent for p in other.parent[start:stop])
+        if style_map:
+            self.style.extend(style_map[s] if s != NO_STYLE else NO_STYLE for s in other.style[start:stop])
+        else:
+            self.style.extend(other.style[start:stop])
+        return range(base, len(self))
+
+    def _extend_coordinates(self, other, dx, dy, start, stop):
+        if dx:
+            self.x1.extend(x + dx for x in other.x1[start:stop])
+            self.x2.extend(x + dx for x in other.x2[start:stop])
+        else:
+            self.x1.extend(other.x1[start:stop])
+            self.x2.extend(other.x2[start:stop])
+        if dy:
+            self.y1.extend(y + dy for y in other.y1[start:stop])
+            self.y2.extend(y + dy for y in other.y2[start:stop])
+        else:
+            self.y1.extend(other.y1[start:stop])
+            self.y2.extend(other.y2[start:stop])
+
+    def translate(self, dx, dy):
+        # Shifts every record in place, one whole column at a time
+        if self.transforms:
+            moved = self.copy(dx, dy)
+            self.x1, self.y1, self.x2, self.y2 = moved.x1, moved.y1, moved.x2, moved.y2
+            self.transform, self.transforms = moved.transform, moved.transforms
+            return
+        if dx:
+            self.x1 = array("d", [x + dx for x in self.x1])
+            self.x2 = array("d", [x + dx for x in self.x2])
+        if dy:
+            self.y1 = array("d", [y + dy for y in self.y1])
+            self.y2 = array("d", [y + dy for y in self.y2])
+
+    def copy(self, dx=0.0, dy=0.0):
+        drawing = Drawing()
+        drawing.extend(self, dx, dy)
+        return drawing
+
+    def nbytes(self):
+        columns = (self.kind, self.x1, self.y1, self.x2, self.y2, self.color, self.width, self.z, self.corner, self.parent,
+                   self.style, self.transform, self.transforms)
+        return sum(column.itemsize * len(column) for column in columns)
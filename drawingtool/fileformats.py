@@ -0,0 +1,81 @@
+"""Reading, writing and converting drawings by file extension.
+
+    python -m drawingtool.fileformats SOURCE TARGET
+
+converts between .txt, .xml and .drwb. The binary format keeps everything the
+Drawing holds; .txt and .xml do not store pen width, z or styles, so those
+come back as their defaults and styled shapes as plain ones.
+"""
+import importlib
+import os
+import shutil
+import sys
+from contextlib import contextmanager
+
+WRITE_BUFFER_SIZE = 1 << 20
+
+# extension: (module, reader, writer, read mode, write mode). Format modules
+# are imported on first use, so xml.etree only loads when XML is touched.
+FORMATS = {
+    ".txt": ("txtformat", "read_txt", "write_txt", "r", "w"),
+    ".xml": ("xmlformat", "read_xml", "write_xml", "rb", "w"),
+    ".drwb": ("binformat", "read_binary", "write_binary", "rb", "wb"),
+}
+
+
+def _format(path, extension=None):
+    extension = extension or os.path.splitext(path)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"unknown drawing format: {path}")
+    module_name, reader, writer, read_mode, write_mode = FORMATS[extension]
+    module = importlib.import_module("." + module_name, __package__)
+    return getattr(module, reader), getattr(module, writer), read_mode, write_mode
+
+
+def read_drawing(path, progress=None):
+    reader, _writer, mode, _write_mode = _format(path)
+    with open(path, mode) as file:
+        return reader(file, progress)
+
+
+@contextmanager
+def replacing(path):
+    # Yields a temporary path beside path to write to. Once the block is done
+    # the temporary file replaces path; if it fails or is cancelled, the
+    # temporary file goes and any earlier file at path is left as it was.
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        yield temp_path
+        if os.path.exists(path):
+            shutil.copymode(path, temp_path)
+        os.replace(temp_path, path)
+    except BaseException as e:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        if isinstance(e, OSError) and e.filename == temp_path:
+            e.filename = path
+        raise
+
+
+def write_drawing(drawing, path, extension=None, progress=None):
+    # extension picks the format when path does not end in one. The drawing
+    # is written through replacing(path). progress is passed on to the writer.
+    _reader, writer, _read_mode, mode = _format(path, extension)
+    encoding = None if "b" in mode else "utf-8"
+    with replacing(path) as temp_path:
+        with open(temp_path, mode, encoding=encoding, buffering=WRITE_BUFFER_SIZE) as file:
+            writer(drawing, file, progress=progress)
+            file.flush()
+            os.fsync(file.fileno())
+
+
+def convert(source_path, target_path):
+    drawing = read_drawing(source_path)
+    write_drawing(drawing, target_path)
+    return drawing
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit(f"usage: {sys.argv[0]} SOURCE TARGET")
+    convert(sys.argv[1], sys.argv[2])
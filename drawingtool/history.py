@@ -0,0 +1,404 @@
+"""Undo/redo history built from small operation deltas.
+
+Commands never snapshot the scene. Each one records only what its operation
+touched: the affected items and, for property changes, their old and new
+values. Undoing therefore costs time proportional to the change, and a whole
+selection is always a single command.
+"""
+from abc import ABC, abstractmethod
+from array import array
+from collections import deque
+from itertools import chain
+
+DEFAULT_MEMORY_LIMIT = 64 << 20  # bytes
+
+# Rough per-item memory held by a command. A removed item stays alive while
+# its command can bring it back; a property delta is two values and a reference.
+ITEM_COST = 1024
+DELTA_COST = 64
+_NEVER_CLEAN = object()  # Clean mark of a document modified outside the history
+
+
+class Command(ABC):
+    cost = 0
+
+    @abstractmethod
+    def redo(self):
+        pass
+
+    @abstractmethod
+    def undo(self):
+        pass
+
+    def merge(self, other):
+        # Returns True if other was folded into this command
+        return False
+
+    def changedItems(self):
+        # Items still in the scene whose geometry this command may have changed
+        return []
+
+    def changedStyles(self):
+        # Styles this command redefined, as they are now
+        return []
+
+    def heldItems(self):
+        # Every item the command keeps a reference to
+        return []
+
+
+class AddItemsCommand(Command):
+    # Draw, copy and paste: the items are created before the command runs
+    def __init__(self, scene, items):
+        self.scene = scene
+        self.items = list(items)
+        self.cost = len(self.items) * ITEM_COST
+
+    def heldItems(self):
+        return self.items
+
+    def redo(self):
+        for item in self.items:
+            self.scene.addItem(item)
+            self.scene.items_to_save.add(item)
+
+    def undo(self):
+        # Newest first: Qt finds the scene's newest top-level item without
+        # searching for it
+        for item in reversed(self.items):
+            self.scene.removeItem(item)
+            self.scene.items_to_save.remove(item)
+
+
+class RemoveItemsCommand(AddItemsCommand):
+    def redo(self):
+        AddItemsCommand.undo(self)
+
+    def undo(self):
+        AddItemsCommand.redo(self)
+
+
+class ReplaceItemsCommand(Command):
+    # Swaps each old item for its new item, keeping its place in the save order
+    def __init__(self, scene, old_items, new_items):
+        self.scene = scene
+        self.old_items = list(old_items)
+        self.new_items = list(new_items)
+        self.cost = 2 * len(self.old_items) * ITEM_COST
+
+    def heldItems(self):
+        return self.old_items + self.new_items
+
+    def _swap(self, old_items, new_items):
+        for old_item, new_item in zip(old_items, new_items):
+            self.scene.removeItem(old_item)
+            self.scene.addItem(new_item)
+            self.scene.items_to_save.replace(old_item, new_item)
+
+    def redo(self):
+        self._swap(self.old_items, self.new_items)
+
+    def undo(self):
+        self._swap(self.new_items, self.old_items)
+
+
+class PropertyCommand(Command):
+    # Sets one property (z value, rotation, pen, position ...) on many items.
+    # Float properties are stored in arrays, eight bytes per value.
+    def __init__(self, items, setter, old_values, new_values, mergeable=False):
+        self.items = list(items)
+        self.setter = setter
+        self.old_values = _compact(old_values)
+        self.new_values = _compact(new_values)
+        self.mergeable = mergeable
+        self.cost = len(self.items) * DELTA_COST
+
+    def _apply(self, values):
+        for item, value in zip(self.items, values):
+            getattr(item, self.setter)(value)
+
+    def redo(self):
+        self._apply(self.new_values)
+
+    def undo(self):
+        self._apply(self.old_values)
+
+    def changedItems(self):
+        return self.items
+
+    def heldItems(self):
+        return self.items
+
+    def merge(self, other):
+        # Consecutive changes of the same property on the same items, such as
+        # the ticks of one slider drag, collapse into one step.
+        if (self.mergeable and isinstance(other, PropertyCommand) and other.mergeable
+                and other.setter == self.setter and len(other.items) == len(self.items)
+                and all(a is b for a, b in zip(self.items, other.items))):
+            self.new_values = other.new_values
+            return True
+        return False
+
+
+class StyleCommand(Command):
+    # Sets the look of many items. A look is a (style, pen) pair: the item
+    # uses the style, or with style None has pen to itself.
+    def __init__(self, styles, items, old_looks, new_looks):
+        self.styles = styles
+        self.items = list(items)
+        self.old_looks = list(old_looks)
+        self.new_looks = list(new_looks)
+        self.cost = len(self.items) * DELTA_COST
+
+    def _apply(self, looks):
+        for item, (style, pen) in zip(self.items, looks):
+            self.styles.assign(item, style, pen)
+
+    def redo(self):
+        self._apply(self.new_looks)
+
+    def undo(self):
+        self._apply(self.old_looks)
+
+    def changedItems(self):
+        return self.items
+
+    def heldItems(self):
+        return self.items
+
+
+class RestyleCommand(Command):
+    # Redefines a style, and with it every item that uses the style. Edit
+    # listeners get the new definition rather than every item.
+    def __init__(self, styles, old_style, new_style, mergeable=False):
+        self.styles = styles
+        self.old_style = old_style
+        self.new_style = new_style
+        self.mergeable = mergeable
+        self.style = old_style  # The definition in force
+        self.users = []
+        self.cost = DELTA_COST
+
+    def _define(self, style):
+        self.style = style
+        self.users = self.styles.define(style)
+
+    def redo(self):
+        self._define(self.new_style)
+
+    def undo(self):
+        self._define(self.old_style)
+
+    def changedItems(self):
+        # A new width or corner radius moves the users' bounds
+        if (self.old_style.width, self.old_style.radius) == (self.new_style.width, self.new_style.radius):
+            return []
+        top_level = {}
+        for item in self.users:
+            item = item.topLevelItem()
+            top_level[id(item)] = item
+        return list(top_level.values())
+
+    def changedStyles(self):
+        return [self.style]
+
+    def merge(self, other):
+        # The steps of one adjustment, such as a spin box held down, are
+        # undone together
+        if (self.mergeable and isinstance(other, RestyleCommand) and other.mergeable
+                and other.new_style.name == self.new_style.name):
+            self.new_style = other.new_style
+            self.style = other.style
+            self.users = other.users
+            return True
+        return False
+
+
+class DefineStyleCommand(Command):
+    # Adds a new named style. By the time it is undone no item uses the
+    # style any more, since every step that gave it to items came later.
+    def __init__(self, styles, style):
+        self.styles = styles
+        self.style = style
+        self.cost = DELTA_COST
+
+    def redo(self):
+        self.styles.define(self.style)
+
+    def undo(self):
+        self.styles.remove(self.style.name)
+
+    def changedStyles(self):
+        return [self.style]
+
+
+class GroupCommand(Command):
+    # Groups items, or with ungroup=True takes the groups apart. Undo replays
+    # the recorded steps backwards, reusing the same group objects, inside one
+    # scene batch so the index is rebuilt once rather than once per group.
+    def __init__(self, scene, items, ungroup=False, recursive=False):
+        self.scene = scene
+        self.items = list(items)
+        self.ungroup = ungroup
+        self.recursive = recursive
+        self.steps = None  # [(group, children)] in the order they were applied
+        self.count = len(self.items)
+        self.cost = self.count * DELTA_COST
+
+    def heldItems(self):
+        items = list(self.items)
+        for group, children in self.steps or ():
+            items.append(group)
+            items.extend(children)
+        return items
+
+    def redo(self):
+        if self.steps is None:
+            if self.ungroup:
+                self.steps = self.scene.ungroupItems(self.items, self.recursive)
+            else:
+                group = self.scene.groupItems(self.items)
+                self.steps = [(group, self.items)]
+            self.count = sum(len(children) for _group, children in self.steps)
+            self.cost = self.count * DELTA_COST
+            return
+        with self.scene.batchUpdate(self.count):
+            for group, children in self.steps:
+                if self.ungroup:
+                    self.scene.ungroupItems([group])
+                else:
+                    self.scene.groupItems(children, group)
+
+    def undo(self):
+        with self.scene.batchUpdate(self.count):
+            for group, children in reversed(self.steps):
+                if self.ungroup:
+                    self.scene.groupItems(children, group)
+                else:
+                    self.scene.ungroupItems([group])
+
+
+class MacroCommand(Command):
+    # Several commands undone and redone as one step
+    def __init__(self, commands):
+        self.commands = list(commands)
+        self.cost = sum(command.cost for command in self.commands)
+
+    def redo(self):
+        for command in self.commands:
+            command.redo()
+
+    def undo(self):
+        for command in reversed(self.commands):
+            command.undo()
+
+    def changedItems(self):
+        return [item for command in self.commands for item in command.changedItems()]
+
+    def changedStyles(self):
+        return [style for command in self.commands for style in command.changedStyles()]
+
+    def heldItems(self):
+        return [item for command in self.commands for item in command.heldItems()]
+
+
+class History:
+    # Undo and redo stacks. When the commands held exceed memory_limit bytes
+    # (by their cost estimate) the oldest undo steps are dropped. on_change,
+    # if given, is called with each command after it is applied or undone.
+    #
+    # The clean mark is the newest undo step at the last save (None for an
+    # empty stack). The document is unmodified whenever that step is on top
+    # again, however it got there.
+    def __init__(self, memory_limit=DEFAULT_MEMORY_LIMIT, on_change=None):
+        self.memory_limit = memory_limit
+        self.on_change = on_change
+        self._done = deque()
+        self._undone = []
+        self._cost = 0
+        self._clean = None
+
+    def __len__(self):
+        return len(self._done)
+
+    def push(self, command, apply=True):
+        # apply=False records a change that has already been made, such as an
+        # item dragged by the mouse.
+        if apply:
+            command.redo()
+        for undone in self._undone:
+            self._cost -= undone.cost
+        self._undone.clear()
+        if not (self._done and self._done[-1] is not self._clean and self._done[-1].merge(command)):
+            self._done.append(command)
+            self._cost += command.cost
+            self._trim()
+        if self.on_change:
+            self.on_change(command)
+
+    def heldItems(self):
+        # Every item some undo or redo step refers to
+        for command in chain(self._done, self._undone):
+            yield from command.heldItems()
+
+    def canUndo(self):
+        return bool(self._done)
+
+    def canRedo(self):
+        return bool(self._undone)
+
+    def undo(self):
+        if self._done:
+            command = self._done.pop()
+            command.undo()
+            self._undone.append(command)
+            if self.on_change:
+                self.on_change(command)
+
+    def redo(self):
+        if self._undone:
+            command = self._undone.pop()
+            command.redo()
+            self._done.append(command)
+            if self.on_change:
+                self.on_change(command)
+
+    def clear(self):
+        self._done.clear()
+        self._undone.clear()
+        self._cost = 0
+        self._clean = None
+
+    def isClean(self):
+        return (self._done[-1] if self._done else None) is self._clean
+
+    def setClean(self, clean=True):
+        # Marks the current state as saved, or with clean=False as modified
+        # until the next save whatever is undone
+        if clean:
+            self._clean = self._done[-1] if self._done else None
+        else:
+            self._clean = _NEVER_CLEAN
+
+    def memoryUsage(self):
+        return self._cost
+
+    def setMemoryLimit(self, memory_limit):
+        self.memory_limit = memory_limit
+        self._trim()
+
+    def _trim(self):
+        # The newest step is always kept, however large. Once the saved state
+        # is dropped, undoing can no longer get back to it.
+        while self._cost > self.memory_limit and len(self._done) > 1:
+            dropped = self._done.popleft()
+            self._cost -= dropped.cost
+            if self._clean is None or self._clean is dropped:
+                self._clean = _NEVER_CLEAN
+
+
+def _compact(values):
+    values = list(values)
+    if values and all(isinstance(value, float) for value in values):
+        return array("d", values)
+    return values
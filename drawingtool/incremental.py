@@ -0,0 +1,98 @@
+"""Saving a drawing back to its own file, writing only what changed.
+
+A DrawingFile follows the file a drawing was opened from or last saved to,
+together with an EditLog of the edits made since. Saving a .drwb file again
+appends those edits as delta records, which costs time in proportion to the
+edits rather than the drawing. Once the records outgrow the columns, or the
+file has been changed by someone else, the whole drawing is written afresh.
+Other formats are always written whole.
+"""
+import os
+
+from .binformat import append_records, read_ids
+from .delta import EditLog
+from .fileformats import write_drawing
+
+INCREMENTAL_EXTENSION = ".drwb"
+
+
+class DrawingFile:
+    def __init__(self):
+        self.path = None
+        self.extension = None
+        self.log = EditLog()  # Attach to the scene to follow its edits
+        self._columns_end = 0  # Where the columns of a .drwb file stop
+        self._end = 0  # Where its last delta record stops
+        self._stamp = None  # (size, mtime) as last written, to spot outside changes
+
+    def opened(self, path, entries):
+        # The scene now holds the drawing read from path, entries being its
+        # top-level entries in order (see GraphicsScene.topLevelEntries)
+        self.path = path
+        self.extension = os.path.splitext(path)[1].lower()
+        ids = None
+        if self.extension == INCREMENTAL_EXTENSION:
+            with open(path, "rb") as file:
+                ids, self._columns_end, self._end = read_ids(file)
+        self.log.reset(entries, ids)
+        self._stamp = self._currentStamp()
+
+    def save(self, scene, path=None, extension=None, progress=None):
+        # Saves the drawing in scene to path (the current file by default).
+        # Returns True if only the edits since the last save were written.
+        return self.prepareSave(scene, path, extension)(progress)
+
+    def prepareSave(self, scene, path=None, extension=None):
+        # The part of save() that reads the scene, for the GUI thread. Returns
+        # write(progress=None), which does the rest on any thread. Edits made
+        # after this returns are left for the next save; if write fails or is
+        # cancelled, the next save writes the whole drawing.
+        path = path or self.path
+        extension = extension or os.path.splitext(path)[1].lower()
+        if path == self.path and extension == self.extension and self._canAppend():
+            records = self.log.records()
+            if sum(map(len, records)) + self._end - self._columns_end <= self._columns_end:
+                def append(progress=None):
+                    try:
+                        with open(path, "r+b") as file:
+                            self._end = append_records(file, self._end, records)
+                    except BaseException:
+                        self._stamp = None
+                        raise
+                    self._stamp = self._currentStamp()
+                    return True
+                return append
+        drawing = scene.drawing()
+        self.log.reset(scene.topLevelEntries())
+
+        def write(progress=None):
+            try:
+                write_drawing(drawing, path, extension, progress)
+            except BaseException:
+                self._stamp = None
+                raise
+            self.path = path
+            self.extension = extension
+            self._columns_end = self._end = os.path.getsize(path)
+            self._stamp = self._currentStamp()
+            return False
+        return write
+
+    def forget(self):
+        # The scene no longer holds the drawing of any file
+        self.path = None
+        self.extension = None
+        self.log.reset([])
+        self._columns_end = self._end = 0
+        self._stamp = None
+
+    def _canAppend(self):
+        return self.extension == INCREMENTAL_EXTENSION and self._stamp is not None \
+            and self._stamp == self._currentStamp()
+
+    def _currentStamp(self):
+        try:
+            status = os.stat(self.path)
+        except OSError:
+            return None
+        return status.st_size, status.st_mtime_ns
@@ -0,0 +1,176 @@
+"""Autosave journal: an append-only log of scene edits, written off the GUI thread.
+
+After each edit, the top-level items it added, changed, replaced or removed
+are written as one delta record (see delta.py). A writer thread appends the
+records and fsyncs them. It also replays them into a compact in-memory copy
+of the drawing, which it writes out as a fresh snapshot once the log
+outgrows it. Recovery reads the snapshot and the few records after it, so
+its cost stays within a small multiple of the drawing's size.
+
+File layout: a header (magic "DRWJ", version u16, reserved u16) and then
+records. A snapshot is simply the first record, an UPSERT of every item.
+"""
+import os
+import queue
+import struct
+import threading
+
+from PyQt6.QtCore import QLockFile
+
+from .delta import RECORD, UPSERT, DeltaState, EditLog, encode_record, iter_records
+from .document import Drawing
+
+MAGIC = b"DRWJ"
+VERSION = 1
+HEADER = struct.Struct("<4sHH")
+
+COMPACT_MIN_BYTES = 1 << 20  # Never compact a journal smaller than this
+JOURNAL_SUFFIX = ".drwj"
+
+
+def iter_journal(data):
+    # Yields the payload of every intact record after the header
+    if len(data) < HEADER.size:
+        raise ValueError("not a journal")
+    magic, version, _reserved = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("not a journal")
+    if version > VERSION:
+        raise ValueError(f"unsupported journal version {version}")
+    for payload, _end in iter_records(data, HEADER.size):
+        yield payload
+
+
+def read_journal(path):
+    # Recovers the drawing a journal left behind
+    with open(path, "rb") as file:
+        data = file.read()
+    state = DeltaState()
+    for payload in iter_journal(memoryview(data)):
+        state.apply(payload)
+    return state.drawing()
+
+
+def orphan_journals(directory):
+    # Journals in directory whose editor is no longer running, newest first.
+    # Each comes with its lock, now held by the caller. QLockFile treats the
+    # lock of a process that has exited as stale and takes it over.
+    found = []
+    for name in os.listdir(directory):
+        if name.endswith(JOURNAL_SUFFIX):
+            path = os.path.join(directory, name)
+            lock = QLockFile(path + ".lock")
+            if lock.tryLock(0):
+                found.append((os.path.getmtime(path), path, lock))
+    found.sort(key=lambda entry: entry[0], reverse=True)
+    return [(path, lock) for _mtime, path, lock in found]
+
+
+class Journal(EditLog):
+    # Records the edits made to one scene. The GUI thread only turns each
+    # edit into record bytes, in time proportional to the edit; file writes,
+    # fsync and compaction all happen on the writer thread. on_error, if
+    # given, is called from that thread with the first error autosave meets.
+    def __init__(self, path, compact_min_bytes=COMPACT_MIN_BYTES, on_error=None):
+        super().__init__()
+        self.path = path
+        self.compact_min_bytes = compact_min_bytes
+        self.on_error = on_error
+        self.error = None
+        self._queue = queue.Queue()
+        self._file = None
+        self._state = DeltaState()
+        self._journal_bytes = 0
+        self._snapshot_bytes = 0
+        self._thread = threading.Thread(target=self._run, name="journal writer", daemon=True)
+        self._thread.start()
+        self.reset(Drawing(), [])
+
+    def commit(self):
+        for record in self.records():
+            self._queue.put(("record", record))
+
+    def reset(self, drawing, items):
+        # Starts the journal over from a snapshot: drawing is the whole scene
+        # and items its top-level items, one per top-level shape, in order.
+        # Called after a load or a save, when the drawing is at hand anyway.
+        ids = super().reset(items)
+        self._queue.put(("reset", encode_record(UPSERT, ids, drawing)))
+
+    def sync(self):
+        # Blocks until everything queued so far is on disk
+        done = threading.Event()
+        self._queue.put(("sync", done))
+        done.wait()
+
+    def close(self, discard=True):
+        # Stops the writer. A journal that is discarded is deleted, since the
+        # drawing was saved or the user chose to throw the edits away.
+        self._queue.put(("close", discard))
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            task, payload = self._queue.get()
+            try:
+                if task == "record":
+                    self._append(payload)
+                elif task == "reset":
+                    self._snapshot(payload)
+                elif task == "sync":
+                    self._flush()
+                elif task == "close":
+                    self._finish(payload)
+                if self._queue.empty():
+                    self._flush()
+                if self._journal_bytes > max(self.compact_min_bytes, 2 * self._snapshot_bytes):
+                    self._compact()
+            except Exception as e:
+                # Autosave must never take the editor down with it
+                if self.error is None and self.on_error is not None:
+                    self.on_error(e)
+                self.error = e
+            if task == "sync":
+                payload.set()
+            elif task == "close":
+                return
+
+    def _append(self, record):
+        if self._file is None:
+            return
+        self._file.write(record)
+        self._journal_bytes += len(record)
+        self._state.apply(memoryview(record)[RECORD.size:])
+
+    def _snapshot(self, record):
+        # Replaces the file with a header and one snapshot record, atomically
+        temporary_path = self.path + ".tmp"
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        with open(temporary_path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, VERSION, 0))
+            file.write(record)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, self.path)
+        self._file = open(self.path, "ab")
+        self._state = DeltaState()
+        self._state.apply(memoryview(record)[RECORD.size:])
+        self._snapshot_bytes = len(record)
+        self._journal_bytes = 0
+
+    def _compact(self):
+        self._snapshot(encode_record(UPSERT, self._state.ids(), self._state.drawing()))
+
+    def _flush(self):
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def _finish(self, discard):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if discard and os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,486 @@
+"""Paging of drawings too large to keep as scene items.
+
+A drawing over the memory budget is cut into square chunks of the canvas.
+Each chunk holds the top-level shapes whose first shape lies in it, and is
+kept in an unnamed temporary file as a delta record (see delta.py). The
+scene then only has items for the chunks that reach into or near its views.
+As the views pan and zoom, chunks coming into range are read back as items.
+Once the resident shapes exceed the budget, the least recently used chunks
+out of range are written back, if they were edited, and their items
+dropped. Chunks in range that do not fit the budget are drawn as outlines.
+
+Every top-level shape has a key, and keys give the save order. They follow
+the drawing's order when it is cut up. New shapes get ever larger ones, and
+a replacement takes over the key of the item it replaces. A chunk is never
+evicted while one of its items is selected, grabbed or referenced by the
+undo history, so commands only ever act on items that are in the scene.
+"""
+import tempfile
+from array import array
+from itertools import chain, repeat
+from math import floor, sqrt
+from operator import itemgetter
+
+from PyQt6.QtCore import QPointF, QRectF, QTimer, Qt
+from PyQt6.QtGui import QPen
+
+from .delta import RECORD, UPSERT, decode_record, encode_record
+from .document import GROUP, NO_STYLE, NO_TRANSFORM, Drawing
+from .shapes import drawing_from_items, items_from_drawing
+
+DEFAULT_MEMORY_BUDGET = 256 << 20  # bytes of resident scene items
+ITEM_BYTES = 1280  # Rough memory of one shape's scene item and index entries
+CHUNK_SHAPES = 4096  # Shapes per chunk aimed for when a drawing is cut up
+MIN_CELL_SIZE = 256.0
+PREFETCH = 0.5  # Chunks within this many view sizes of a view are paged in
+PAGE_DELAY_MS = 50  # Paging waits until the views have rested this long
+COMPACT_MIN_BYTES = 16 << 20  # The store is never compacted below this
+
+COLUMNS = ("kind", "x1", "y1", "x2", "y2", "color", "width", "z", "corner", "parent", "style", "transform")
+
+
+class Chunk:
+    __slots__ = ("cell", "cell_rect", "bounds", "shapes", "keys", "location", "items", "dirty", "used")
+
+    def __init__(self, cell, size):
+        column, row = cell
+        self.cell = cell
+        self.cell_rect = (column * size, row * size, (column + 1) * size, (row + 1) * size)
+        self.bounds = None  # (left, top, right, bottom) of its shapes
+        self.shapes = 0  # Records, groups included
+        self.keys = array("Q")  # Keys of its top-level shapes as last written
+        self.location = None  # (offset, length) in the store
+        self.items = None  # key -> top-level item, while paged in
+        self.dirty = False  # Edited since it was last written
+        self.used = 0  # When it was last in range of a view
+
+    def grow(self, rect):
+        left, top, right, bottom = rect.left(), rect.top(), rect.right(), rect.bottom()
+        if self.bounds is not None:
+            left, top = min(left, self.bounds[0]), min(top, self.bounds[1])
+            right, bottom = max(right, self.bounds[2]), max(bottom, self.bounds[3])
+        self.bounds = (left, top, right, bottom)
+
+    def intersects(self, left, top, right, bottom):
+        # Whether the chunk's cell or any of its shapes reach into the rect
+        return any(rect[0] <= right and left <= rect[2] and rect[1] <= bottom and top <= rect[3]
+                   for rect in (self.cell_rect, self.bounds) if rect is not None)
+
+
+class ChunkStore:
+    # Chunks as UPSERT records in an unnamed temporary file, which the system
+    # removes once it is closed. Chunks written back are appended, and the
+    # file is compacted once most of it is stale.
+    def __init__(self):
+        self._file = tempfile.TemporaryFile(prefix="drawingtool-chunks-")
+        self._end = 0
+        self._stale = 0
+
+    def write(self, drawing, keys):
+        record = encode_record(UPSERT, keys, drawing)
+        self._file.seek(self._end)
+        self._file.write(record)
+        location = (self._end, len(record))
+        self._end += len(record)
+        return location
+
+    def read(self, location):
+        # Returns the chunk's drawing and the keys of its top-level shapes
+        offset, length = location
+        self._file.seek(offset)
+        _op, keys, drawing = decode_record(memoryview(self._file.read(length))[RECORD.size:])
+        return drawing, keys
+
+    def release(self, location):
+        if location is not None:
+            self._stale += location[1]
+
+    def compact(self, chunks):
+        # Copies the records chunks still point at into a fresh file
+        if self._stale < max(COMPACT_MIN_BYTES, self._end - self._stale):
+            return
+        compacted = tempfile.TemporaryFile(prefix="drawingtool-chunks-")
+        end = 0
+        for chunk in chunks:
+            if chunk.location is not None:
+                offset, length = chunk.location
+                self._file.seek(offset)
+                compacted.write(self._file.read(length))
+                chunk.location = (end, length)
+                end += length
+        self._file.close()
+        self._file, self._end, self._stale = compacted, end, 0
+
+    def close(self):
+        self._file.close()
+
+
+class Pager:
+    # Pages the chunks of one drawing in and out of a GraphicsScene. It is
+    # also an edit listener of the scene (see EditLog), which is how it keeps
+    # track of the chunks edits change.
+    def __init__(self, scene, budget=DEFAULT_MEMORY_BUDGET):
+        self.scene = scene
+        self.budget = budget
+        self.store = ChunkStore()
+        self.cell_size = MIN_CELL_SIZE
+        self._chunks = {}  # cell -> Chunk
+        self._resident = {}  # id(item) -> (key, chunk, shapes) of every paged-in top-level item
+        self._shapes = 0  # Records paged in
+        self._next_key = 0
+        self._clock = 0
+        self._timer = QTimer(scene)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(PAGE_DELAY_MS)
+        self._timer.timeout.connect(self.update)
+
+    def loadSteps(self, drawing):
+        # Cuts drawing into chunks and writes them to the store, for update()
+        # to page in. A generator of (done, total) steps, one per chunk, that
+        # returns the keys of the top-level shapes, in order.
+        count = len(drawing)
+        bounds = drawing.bounds()
+        if bounds is not None:
+            area = (bounds[2] - bounds[0]) * (bounds[3] - bounds[1])
+            self.cell_size = max(MIN_CELL_SIZE, sqrt(area * CHUNK_SHAPES / count))
+        size = self.cell_size
+        kind = drawing.kind
+        # Every top-level subtree goes whole to the cell of its first shape
+        members = {}  # cell -> (record indices, keys)
+        local = array("i", bytes(4 * count))  # Index of each record in its chunk
+        roots = drawing.roots()
+        for key, (start, stop) in enumerate(zip(roots, roots[1:] + [count])):
+            first = start
+            while first < stop and kind[first] == GROUP:
+                first += 1
+            cell = (0, 0)
+            if first < stop:
+                left, top, right, bottom = drawing.extent(first)
+                cell = (floor((left + right) / (2 * size)), floor((top + bottom) / (2 * size)))
+            member = members.get(cell)
+            if member is None:
+                member = members[cell] = (array("i"), array("Q"))
+            indices, keys = member
+            for index in range(start, stop):
+                local[index] = len(indices) + index - start
+            indices.extend(range(start, stop))
+            keys.append(key)
+        done = 0
+        for cell, (indices, keys) in members.items():
+            part = _take(drawing, indices, local)
+            chunk = self._chunks[cell] = Chunk(cell, size)
+            chunk.location = self.store.write(part, keys)
+            chunk.keys = keys
+            chunk.bounds = part.bounds()
+            chunk.shapes = len(part)
+            done += len(part)
+            yield done, count
+        self._next_key = len(roots)
+        return range(len(roots))
+
+    def close(self):
+        self._timer.stop()
+        self.store.close()
+        self._chunks.clear()
+        self._resident.clear()
+        self._shapes = 0
+
+    def residentShapes(self):
+        return self._shapes
+
+    def contentRect(self):
+        # Bounds of every shape, paged in or not
+        rect = QRectF()
+        for chunk in self._chunks.values():
+            if chunk.bounds is not None:
+                left, top, right, bottom = chunk.bounds
+                rect = rect.united(QRectF(QPointF(left, top), QPointF(right, bottom)))
+        return rect
+
+    def schedule(self):
+        self._timer.start()
+
+    def update(self):
+        # Pages in the chunks in range of the views, nearest first, making
+        # room by evicting the least recently used chunks out of range
+        self._clock += 1
+        areas = []
+        centre = None
+        for view in self.scene.views():
+            rect = view.mapToScene(view.viewport().rect()).boundingRect()
+            margin_x, margin_y = rect.width() * PREFETCH, rect.height() * PREFETCH
+            areas.append((rect.left() - margin_x, rect.top() - margin_y,
+                          rect.right() + margin_x, rect.bottom() + margin_y))
+            centre = centre or rect.center()
+        wanted = [chunk for chunk in self._chunks.values() if any(chunk.intersects(*area) for area in areas)]
+        for chunk in wanted:
+            chunk.used = self._clock
+        if centre is not None:
+            half = self.cell_size / 2
+            wanted.sort(key=lambda chunk: abs(chunk.cell_rect[0] + half - centre.x())
+                        + abs(chunk.cell_rect[1] + half - centre.y()))
+        limit = self.budget // ITEM_BYTES
+        for chunk in wanted:
+            if chunk.items is not None:
+                continue
+            if self._shapes + chunk.shapes > limit:
+                self._evict(self._shapes + chunk.shapes - limit)
+                if self._shapes + chunk.shapes > limit and self._shapes:
+                    break  # The rest stay outlines
+            self.pageIn(chunk)
+        self._evict(self._shapes - limit)
+        self.store.compact(self._chunks.values())
+        self.scene.update()
+
+    def pageIn(self, chunk):
+        drawing, keys = self.store.read(chunk.location)
+        items = items_from_drawing(drawing, self.scene.styles)
+        keys = list(keys)
+        for item in items:
+            self.scene.addItem(item)
+        chunk.items = dict(zip(keys, items))
+        for key, item in chunk.items.items():
+            self._resident[id(item)] = (key, chunk, _count(item))
+        self._shapes += chunk.shapes
+        self.scene.items_to_save.load(items, keys)
+
+    def pageOut(self, chunk):
+        # Takes the chunk's items out of the scene, writing them back first
+        # if they were edited. A chunk left empty goes altogether.
+        keys = sorted(chunk.items)
+        items = [chunk.items[key] for key in keys]
+        self._shapes -= chunk.shapes
+        if chunk.dirty:
+            drawing = drawing_from_items(items)
+            self.store.release(chunk.location)
+            chunk.location = self.store.write(drawing, keys)
+            chunk.keys = array("Q", keys)
+            chunk.bounds = drawing.bounds()
+            chunk.shapes = len(drawing)
+            chunk.dirty = False
+        self.scene.items_to_save.unload(items, keys)
+        for item in items:
+            self.scene.removeItem(item)
+            del self._resident[id(item)]
+        chunk.items = None
+        if not keys:
+            self.store.release(chunk.location)
+            del self._chunks[chunk.cell]
+
+    def _evict(self, excess):
+        if excess <= 0:
+            return
+        pinned = self._pinned()
+        candidates = [chunk for chunk in self._chunks.values()
+                      if chunk.items is not None and chunk.used < self._clock and id(chunk) not in pinned
+                      and all(item.parentItem() is None for item in chunk.items.values())]
+        candidates.sort(key=lambda chunk: chunk.used)
+        for chunk in candidates:
+            if excess <= 0:
+                break
+            excess -= chunk.shapes
+            self.pageOut(chunk)
+
+    def _pinned(self):
+        # Chunks with an item that is selected, grabbed or held by a command
+        grabber = self.scene.mouseGrabberItem()
+        pinned = set()
+        for item in chain(self.scene.selectedItems(), self.scene.history.heldItems(), [grabber] if grabber else ()):
+            entry = self._resident.get(id(item.topLevelItem()))
+            if entry is not None:
+                pinned.add(id(entry[1]))
+        return pinned
+
+    def drawing(self, rect=None):
+        # The whole drawing in save order, or with rect just the top-level
+        # shapes reaching into it, and the keys of its top-level shapes
+        parts = []  # (key, drawing, start, stop) of every top-level shape
+        area = (rect.left(), rect.top(), rect.right(), rect.bottom()) if rect is not None else None
+        for chunk in list(self._chunks.values()):
+            if area is not None and not chunk.intersects(*area):
+                continue
+            if chunk.items is not None:
+                entries = sorted(chunk.items.items(), key=itemgetter(0))
+                if rect is not None:
+                    entries = [(key, item) for key, item in entries if item.sceneBoundingRect().intersects(rect)]
+                keys = [key for key, _item in entries]
+                drawing = drawing_from_items([item for _key, item in entries])
+            else:
+                drawing, keys = self.store.read(chunk.location)
+            roots = drawing.roots()
+            for key, start, stop in zip(keys, roots, roots[1:] + [len(drawing)]):
+                if area is None or chunk.items is not None or _reaches(drawing, start, stop, area):
+                    parts.append((key, drawing, start, stop))
+        parts.sort(key=itemgetter(0))
+        return _assemble(parts), [key for key, _drawing, _start, _stop in parts]
+
+    def saveOrder(self):
+        # The top-level shapes in save order: the items of those paged in,
+        # the keys of the others
+        entries = []
+        for chunk in self._chunks.values():
+            if chunk.items is not None:
+                entries.extend(chunk.items.items())
+            else:
+                entries.extend(zip(chunk.keys, chunk.keys))
+        entries.sort(key=itemgetter(0))
+        return [entry for _key, entry in entries]
+
+    def paintPlaceholders(self, painter, rect):
+        # Outlines the chunks in rect that are not paged in
+        area = (rect.left(), rect.top(), rect.right(), rect.bottom())
+        painter.save()
+        painter.setPen(QPen(Qt.GlobalColor.darkGray, 0, Qt.PenStyle.DotLine))
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+        for chunk in self._chunks.values():
+            if chunk.items is None and chunk.bounds is not None and chunk.intersects(*area):
+                left, top, right, bottom = chunk.bounds
+                painter.drawRect(QRectF(QPointF(left, top), QPointF(right, bottom)))
+        painter.restore()
+
+    # Edit listener
+
+    def itemAdded(self, item):
+        # A new shape goes to the chunk its centre lies in, paged in if need be
+        centre = item.sceneBoundingRect().center()
+        cell = (floor(centre.x() / self.cell_size), floor(centre.y() / self.cell_size))
+        chunk = self._chunks.get(cell)
+        if chunk is None:
+            chunk = self._chunks[cell] = Chunk(cell, self.cell_size)
+            chunk.items = {}
+            chunk.used = self._clock
+        elif chunk.items is None:
+            self.pageIn(chunk)
+        key = self._next_key
+        self._next_key += 1
+        chunk.items[key] = item
+        shapes = _count(item)
+        self._resident[id(item)] = (key, chunk, shapes)
+        self._changed(chunk, item, shapes)
+
+    def itemRemoved(self, item):
+        # Takes off the shapes counted when the item came in: a group being
+        # ungrouped has already given up its children by now
+        entry = self._resident.pop(id(item), None)
+        if entry is not None:
+            key, chunk, shapes = entry
+            del chunk.items[key]
+            self._changed(chunk, None, -shapes)
+
+    def itemReplaced(self, old_item, new_item):
+        entry = self._resident.pop(id(old_item), None)
+        if entry is not None:
+            key, chunk, shapes = entry
+            chunk.items[key] = new_item
+            new_shapes = _count(new_item)
+            self._resident[id(new_item)] = (key, chunk, new_shapes)
+            self._changed(chunk, new_item, new_shapes - shapes)
+
+    def itemsChanged(self, items):
+        for item in items:
+            entry = self._resident.get(id(item))
+            if entry is not None:
+                self._changed(entry[1], item, 0)
+
+    def stylesChanged(self, styles):
+        # Chunks paged out keep the old definitions; they take the scene's
+        # when paged in or saved
+        pass
+
+    def itemsLoaded(self, items, keys):
+        pass
+
+    def itemsUnloaded(self, items, keys):
+        pass
+
+    def commit(self):
+        pass
+
+    def _changed(self, chunk, item, shapes):
+        chunk.dirty = True
+        chunk.shapes += shapes
+        self._shapes += shapes
+        if item is not None:
+            chunk.grow(item.sceneBoundingRect())
+
+
+def _count(item):
+    # Records item stands for, its group's children included
+    return 1 + sum(_count(child) for child in item.childItems())
+
+
+def _reaches(drawing, start, stop, area):
+    # Whether any shape among records start..stop reaches into area
+    left, top, right, bottom = area
+    for index in range(start, stop):
+        if drawing.kind[index] != GROUP:
+            x1, y1, x2, y2 = drawing.extent(index)
+            if x1 <= right and left <= x2 and y1 <= bottom and top <= y2:
+                return True
+    return False
+
+
+def _take(drawing, indices, local):
+    # The records at indices, whole subtrees in order, as a drawing of their
+    # own; local gives each record's new index, for the parent column
+    part = Drawing()
+    for name in drawing.palette:
+        part.color_id(name)
+    for style in drawing.styles:
+        part.style_id(style)
+    for name in COLUMNS:
+        column = getattr(drawing, name)
+        setattr(part, name, array(column.typecode, map(column.__getitem__, indices)))
+    part.parent = array("i", [local[parent] if parent != -1 else -1 for parent in part.parent])
+    if drawing.transforms:
+        part.transform = array("i", [part.transform_id(drawing.matrix(index)) if transform != NO_TRANSFORM
+                                     else NO_TRANSFORM for index, transform in zip(indices, part.transform)])
+    return part
+
+
+def _assemble(parts):
+    # Joins the (key, drawing, start, stop) record ranges, in order, into one
+    # drawing. Every column is gathered in a single pass over all records,
+    # since neighbouring ranges rarely come from the same chunk.
+    drawing = Drawing()
+    sources = []
+    offsets = {}  # id(source) -> offset of its records once all are joined
+    total = 0
+    for _key, source, _start, _stop in parts:
+        if id(source) not in offsets:
+            offsets[id(source)] = total
+            sources.append(source)
+            total += len(source)
+    order = array("i")  # Joined index of every record of the result
+    for _key, source, start, stop in parts:
+        base = offsets[id(source)]
+        order.extend(range(base + start, base + stop))
+    for name in COLUMNS[:5] + ("width", "z", "corner"):
+        joined = array(getattr(drawing, name).typecode)
+        for source in sources:
+            joined.extend(getattr(source, name))
+        setattr(drawing, name, array(joined.typecode, map(joined.__getitem__, order)))
+    colors = array("I")
+    styles = array("i")
+    transforms = array("i")
+    parents = array("i")
+    for source in sources:
+        color_map = [drawing.color_id(name) for name in source.palette] or [0]
+        colors.extend(map(color_map.__getitem__, source.color))
+        style_map = [drawing.style_id(style) for style in source.styles]
+        styles.extend(style_map[style] if style != NO_STYLE else NO_STYLE for style in source.style)
+        if source.transforms:
+            transforms.extend(drawing.transform_id(source.matrix(index)) if transform != NO_TRANSFORM
+                              else NO_TRANSFORM for index, transform in enumerate(source.transform))
+        else:
+            transforms.extend(repeat(NO_TRANSFORM, len(source)))
+        base = offsets[id(source)]
+        parents.extend(parent + base if parent != -1 else -1 for parent in source.parent)
+    drawing.color = array("I", map(colors.__getitem__, order))
+    drawing.style = array("i", map(styles.__getitem__, order))
+    drawing.transform = array("i", map(transforms.__getitem__, order))
+    position = array("i", repeat(-1, total))
+    for index, joined_index in enumerate(order):
+        position[joined_index] = index
+    drawing.parent = array("i", [position[parent] if parent != -1 else -1 for parent in map(parents.__getitem__, order)])
+    return drawing
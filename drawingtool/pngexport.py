@@ -0,0 +1,269 @@
+"""Tiled PNG export that does not need the whole image in memory.
+
+The drawing is cut into horizontal bands of tiles. Each tile is painted from
+the document model into its own QImage on a thread pool, and finished bands
+are compressed straight into the PNG's IDAT stream. At most two bands exist
+at any time, so memory depends on the output width and the tile size but not
+on the output height or on the number of shapes per tile.
+
+Painting works from a Drawing rather than from scene items: QGraphicsItems
+belong to the GUI thread, while QImage and QPainter may be used from any
+thread.
+"""
+import math
+import os
+import struct
+import threading
+import zlib
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt6.QtCore import QLineF, QPointF, QRectF, Qt
+from PyQt6.QtGui import QColor, QImage, QPainter, QPen, QTransform
+
+from .document import LINE, RECTANGLE, CURVED, CORNER_RADIUS, NO_STYLE, NO_TRANSFORM
+from .fileformats import replacing
+from .profiling import profiled
+from .shapes import style_pen
+
+TILE_SIZE = 512
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+IDAT_SIZE = 1 << 20
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+class PngWriter:
+    # Minimal streaming PNG encoder for 8-bit RGB scanlines.
+    def __init__(self, file, width, height, dpi=96, compress_level=6):
+        self.file = file
+        self.compressor = zlib.compressobj(compress_level)
+        self.pending = []
+        self.pending_size = 0
+        file.write(PNG_SIGNATURE)
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        pixels_per_metre = round(dpi / 0.0254)
+        self._chunk(b"pHYs", struct.pack(">IIB", pixels_per_metre, pixels_per_metre, 1))
+
+    def _chunk(self, kind, data):
+        self.file.write(struct.pack(">I", len(data)))
+        self.file.write(kind)
+        self.file.write(data)
+        self.file.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(kind))))
+
+    def _emit(self, data):
+        if data:
+            self.pending.append(data)
+            self.pending_size += len(data)
+        if self.pending_size >= IDAT_SIZE:
+            self._flush()
+
+    def _flush(self):
+        if self.pending:
+            self._chunk(b"IDAT", b"".join(self.pending))
+            self.pending = []
+            self.pending_size = 0
+
+    def write_rows(self, rows):
+        # Each row is the raw RGB bytes of one scanline
+        compress = self.compressor.compress
+        for row in rows:
+            self._emit(compress(b"\x00"))  # filter type None
+            self._emit(compress(row))
+
+    def close(self):
+        self._emit(self.compressor.flush())
+        self._flush()
+        self._chunk(b"IEND", b"")
+
+
+class PngExport:
+    # Exports source_rect (scene coordinates) of a drawing to path. run() does
+    # the work and may be called from any thread; cancel() and progress may be
+    # used from another thread while it runs.
+    def __init__(self, drawing, path, source_rect, scale=1.0, dpi=96, background=Qt.GlobalColor.black,
+                 tile_size=TILE_SIZE, workers=None):
+        self.drawing = drawing
+        self.path = path
+        self.source_rect = QRectF(source_rect)
+        self.scale = scale
+        self.dpi = dpi
+        self.background = QColor(background)
+        self.tile_size = tile_size
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        self.width = max(1, math.ceil(self.source_rect.width() * scale))
+        self.height = max(1, math.ceil(self.source_rect.height() * scale))
+        self.columns = math.ceil(self.width / tile_size)
+        self.rows = math.ceil(self.height / tile_size)
+        self.progress = 0.0
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    @profiled(items=lambda export: len(export.drawing))
+    def run(self):
+        # Returns True when the file was written and False when the export was
+        # cancelled. The image is written beside path and only replaces it
+        # once complete, so a cancelled or failed export leaves path as it was.
+        buckets = self._bucket_shapes()
+        try:
+            with replacing(self.path) as temp_path:
+                with open(temp_path, "wb") as file, ThreadPoolExecutor(self.workers) as pool:
+                    writer = PngWriter(file, self.width, self.height, self.dpi)
+                    band = self._submit_band(pool, buckets, 0)
+                    for row in range(self.rows):
+                        next_band = self._submit_band(pool, buckets, row + 1) if row + 1 < self.rows else None
+                        images = [future.result() for future in band]
+                        if self.cancelled():
+                            raise ExportCancelled()
+                        writer.write_rows(self._band_rows(images))
+                        band = next_band
+                        self.progress = (row + 1) / self.rows
+                    writer.close()
+                    file.flush()
+                    os.fsync(file.fileno())
+        except ExportCancelled:
+            return False
+        return True
+
+    def _bucket_shapes(self):
+        return bucket_shapes(self.drawing, self.source_rect, self.scale, self.width, self.height,
+                             self.tile_size, self.tile_size)
+
+    def _submit_band(self, pool, buckets, row):
+        return [pool.submit(self._paint_tile, buckets.get((row, column), ()), row, column)
+                for column in range(self.columns)]
+
+    def _paint_tile(self, indices, row, column):
+        if self.cancelled():
+            return None
+        x = column * self.tile_size
+        y = row * self.tile_size
+        image = QImage(min(self.tile_size, self.width - x), min(self.tile_size, self.height - y),
+                       QImage.Format.Format_RGB888)
+        image.fill(self.background)
+        if indices:
+            painter = QPainter(image)
+            painter.translate(-x, -y)
+            painter.scale(self.scale, self.scale)
+            painter.translate(-self.source_rect.left(), -self.source_rect.top())
+            paint_shapes(painter, self.drawing, indices)
+            painter.end()
+        return image
+
+    def _band_rows(self, images):
+        # Cuts each tile into scanlines, drops QImage's row padding and joins
+        # the tiles of a band side by side.
+        scanlines = []
+        for image in images:
+            data = image.constBits().asstring(image.sizeInBytes())
+            stride = image.bytesPerLine()
+            used = image.width() * 3
+            scanlines.append([data[offset:offset + used] for offset in range(0, stride * image.height(), stride)])
+        for parts in zip(*scanlines):
+            yield b"".join(parts)
+
+
+def bucket_shapes(drawing, source_rect, scale, width, height, tile_width, tile_height):
+    # Maps (row, column) to the indices of the shapes that touch that tile of
+    # a width x height output, in paint order
+    left, top = source_rect.left(), source_rect.top()
+    rows, columns = math.ceil(height / tile_height), math.ceil(width / tile_width)
+    transform = drawing.transform
+    buckets = {}
+    for index in paint_order(drawing):
+        kind = drawing.kind[index]
+        if kind != LINE and kind != RECTANGLE:
+            continue
+        margin = drawing.width[index] / 2 + 1
+        if transform[index] != NO_TRANSFORM:
+            x1, y1, x2, y2 = drawing.extent(index)
+        else:
+            x1, x2 = min(drawing.x1[index], drawing.x2[index]), max(drawing.x1[index], drawing.x2[index])
+            y1, y2 = min(drawing.y1[index], drawing.y2[index]), max(drawing.y1[index], drawing.y2[index])
+        x1 = (x1 - margin - left) * scale
+        x2 = (x2 + margin - left) * scale
+        y1 = (y1 - margin - top) * scale
+        y2 = (y2 + margin - top) * scale
+        if x2 < 0 or y2 < 0 or x1 >= width or y1 >= height:
+            continue
+        for row in range(max(0, int(y1 // tile_height)), min(rows - 1, int(y2 // tile_height)) + 1):
+            for column in range(max(0, int(x1 // tile_width)), min(columns - 1, int(x2 // tile_width)) + 1):
+                bucket = buckets.get((row, column))
+                if bucket is None:
+                    bucket = buckets[row, column] = array("i")
+                bucket.append(index)
+    return buckets
+
+
+def paint_order(drawing):
+    # Indices of drawing's records in paint order: top-level items by z value,
+    # children right after their group
+    if not len(drawing):
+        return []
+    root_z = array("d", drawing.z)
+    for index in range(len(drawing)):
+        parent = drawing.parent[index]
+        if parent != -1:
+            root_z[index] = root_z[parent]
+    if min(root_z) == max(root_z):
+        return range(len(drawing))
+    return sorted(range(len(drawing)), key=root_z.__getitem__)
+
+
+def shape_pens(drawing):
+    # pen(index) gives the pen record index is painted with
+    palette, color, width, style = drawing.palette, drawing.color, drawing.width, drawing.style
+    style_pens = [style_pen(entry) for entry in drawing.styles]
+    pens = {}
+
+    def pen(index):
+        style_id = style[index]
+        if style_id != NO_STYLE:
+            return style_pens[style_id]
+        key = (color[index], width[index])
+        found = pens.get(key)
+        if found is None:
+            found = pens[key] = QPen(QColor(palette[key[0]]), key[1])
+        return found
+    return pen
+
+
+def shape_radius(drawing, index):
+    style_id = drawing.style[index]
+    return drawing.styles[style_id].radius if style_id != NO_STYLE else CORNER_RADIUS
+
+
+def paint_shapes(painter, drawing, indices):
+    # Paints records in scene coordinates, each turned by its transform the
+    # way its scene item is
+    pen = shape_pens(drawing)
+    transform = drawing.transform
+    painter.setBrush(Qt.BrushStyle.NoBrush)
+    for index in indices:
+        painter.setPen(pen(index))
+        transformed = transform[index] != NO_TRANSFORM
+        if transformed:
+            painter.save()
+            painter.setTransform(QTransform(*drawing.matrix(index)), True)
+        if drawing.kind[index] == LINE:
+            painter.drawLine(QLineF(drawing.x1[index], drawing.y1[index], drawing.x2[index], drawing.y2[index]))
+        else:
+            rect = QRectF(QPointF(drawing.x1[index], drawing.y1[index]), QPointF(drawing.x2[index], drawing.y2[index]))
+            if drawing.corner[index] == CURVED:
+                radius = shape_radius(drawing, index)
+                painter.drawRoundedRect(rect, radius, radius)
+            else:
+                painter.drawRect(rect)
+        if transformed:
+            painter.restore()
+
+
+def export_png(drawing, path, source_rect, **options):
+    return PngExport(drawing, path, source_rect, **options).run()
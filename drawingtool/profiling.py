@@ -0,0 +1,196 @@
+"""Opt-in profiling of the editor's hot paths.
+
+Scene mouse handlers, window actions, and the open, save and export paths
+are marked with @profiled. That costs one flag test per call while profiling
+is off. Every name gets a call count, p50/p99/max latency and the number of
+items the calls touched. Item paint() calls are far too frequent to pay even
+a flag test, and most of them are Qt's own, so the canvas view counts the
+items each of its painting passes reaches instead, along with frame times
+and repaint regions (see CanvasView).
+
+Profiling is switched on from the window (F12), or for a whole session by
+setting DRAWINGTOOL_PROFILE before start:
+
+    DRAWINGTOOL_PROFILE=1               profile, show the overlay
+    DRAWINGTOOL_PROFILE=out.json        ... and dump the figures on exit
+    DRAWINGTOOL_PROFILE=out.prof        ... and run cProfile, dumping its stats
+"""
+import cProfile
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from collections import Counter, deque
+
+PROFILE_ENV = "DRAWINGTOOL_PROFILE"
+MAX_SAMPLES = 4096  # Latest samples kept per name for the percentiles
+
+
+def _percentile(ordered, fraction):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class Stat:
+    __slots__ = ("count", "total", "items", "samples")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.items = 0
+        self.samples = deque(maxlen=MAX_SAMPLES)
+
+    def add(self, seconds, items):
+        self.count += 1
+        self.total += seconds
+        self.items += items
+        self.samples.append(seconds)
+
+    def summary(self):
+        ordered = sorted(self.samples)
+        return {
+            "count": self.count,
+            "total_ms": self.total * 1e3,
+            "p50_ms": _percentile(ordered, 0.5) * 1e3,
+            "p99_ms": _percentile(ordered, 0.99) * 1e3,
+            "max_ms": ordered[-1] * 1e3 if ordered else 0.0,
+            "items": self.items,
+        }
+
+
+class Profiler:
+    def __init__(self):
+        self.active = False
+        self.stats = {}
+        self.frames = deque(maxlen=MAX_SAMPLES)  # (seconds, region rects, pixels of its bounds)
+        self.painted = 0  # Items painted since start
+        self.painted_classes = Counter()  # Class name -> items of it painted
+        self._lock = threading.Lock()  # Exports record from their worker thread
+        self._cprofile = None
+
+    def start(self):
+        self.active = True
+
+    def stop(self):
+        self.active = False
+
+    def reset(self):
+        with self._lock:
+            self.stats = {}
+            self.frames.clear()
+            self.painted = 0
+            self.painted_classes.clear()
+
+    def recordPaint(self, seconds, items):
+        # One painting pass of a view, which painted items
+        self.painted += len(items)
+        self.painted_classes.update(type(item).__name__ for item in items)
+        self.record("paint", seconds, len(items))
+
+    def record(self, name, seconds, items=0):
+        with self._lock:
+            stat = self.stats.get(name)
+            if stat is None:
+                stat = self.stats[name] = Stat()
+            stat.add(seconds, items)
+
+    def recordFrame(self, seconds, rects, pixels):
+        self.frames.append((seconds, rects, pixels))
+
+    def frameSummary(self):
+        ordered = sorted(seconds for seconds, _rects, _pixels in self.frames)
+        return {
+            "count": len(ordered),
+            "p50_ms": _percentile(ordered, 0.5) * 1e3,
+            "p99_ms": _percentile(ordered, 0.99) * 1e3,
+            "max_ms": ordered[-1] * 1e3 if ordered else 0.0,
+            "mean_pixels": sum(pixels for _seconds, _rects, pixels in self.frames) / len(ordered) if ordered else 0,
+        }
+
+    def report(self):
+        with self._lock:
+            stats = {name: stat.summary() for name, stat in sorted(self.stats.items())}
+        return {"stats": stats, "frames": self.frameSummary(), "painted": self.painted,
+                "painted_classes": dict(self.painted_classes)}
+
+    def startCProfile(self):
+        if self._cprofile is None:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def stopCProfile(self):
+        # Returns the stopped cProfile.Profile, or None if none was running
+        cprofile, self._cprofile = self._cprofile, None
+        if cprofile is not None:
+            cprofile.disable()
+        return cprofile
+
+    def cProfiling(self):
+        return self._cprofile is not None
+
+    def dump(self, path):
+        # A .prof path gets the cProfile stats, any other path the JSON report
+        if path.endswith(".prof"):
+            if self._cprofile is None:
+                raise ValueError("cProfile is not running")
+            self._cprofile.disable()
+            self._cprofile.dump_stats(path)
+            self._cprofile.enable()
+        else:
+            with open(path, "w") as file:
+                json.dump(self.report(), file, indent=2)
+
+
+profiler = Profiler()
+
+
+def profiled(items=None, after=False, name=None):
+    # Times every call of the decorated function, under its qualified name,
+    # while the profiler runs. items(*args), or items(result) with
+    # after=True, gives the number of items the call touched.
+    def decorate(function):
+        label = name or function.__qualname__
+        # Qt signals pass all their arguments and leave it to the slot to
+        # ignore the ones it does not take; the wrapper does the same.
+        code = function.__code__
+        count = None if code.co_flags & inspect.CO_VARARGS else code.co_argcount
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            args = args[:count]
+            if not profiler.active:
+                return function(*args, **kwargs)
+            touched = items(*args) if items and not after else 0
+            start = time.perf_counter()
+            result = function(*args, **kwargs)
+            seconds = time.perf_counter() - start
+            if items and after:
+                touched = items(result)
+            profiler.record(label, seconds, touched)
+            return result
+        return wrapper
+    return decorate
+
+
+def selected_items(owner, *args):
+    # Items touched by an action on the selection, for @profiled
+    scene = getattr(owner, "scene", owner)
+    return len(scene.selectedItems())
+
+
+def all_items(owner, *args):
+    return len(owner.scene.items_to_save)
+
+
+def configure_from_environment(window):
+    # Applies DRAWINGTOOL_PROFILE; returns the path to dump to on exit, if any
+    value = os.environ.get(PROFILE_ENV)
+    if not value or value == "0":
+        return None
+    window.setProfiling(True)
+    if value.endswith(".prof"):
+        profiler.startCProfile()
+    return value if value != "1" else None
@@ -0,0 +1,105 @@
+"""Interactive rotation of the selection from the rotate slider."""
+from PyQt6.QtCore import QPointF
+from PyQt6.QtGui import QTransform
+from PyQt6.QtWidgets import QGraphicsItemGroup
+
+from .history import MacroCommand, PropertyCommand
+
+
+class RotationDrag:
+    # One slider drag. The selection is captured once when the drag starts.
+    # Whenever the result is a single rigid rotation of the whole selection,
+    # the items are moved into a temporary group and each frame only rotates
+    # that group. The items' own rotation and position are set once, in
+    # commit().
+    #
+    # By default every item is set to the slider angle about its own transform
+    # origin, as the slider always did. With around_centre the selection turns
+    # as one piece about the centre of its bounding rect, by however far the
+    # slider has moved since the drag started.
+    def __init__(self, scene, items, value, around_centre=False):
+        self.scene = scene
+        self.items = list(items)
+        self.start_value = value
+        self.around_centre = around_centre
+        self.value = value
+        self.rotations = [item.rotation() for item in self.items]
+        self.positions = [item.pos() for item in self.items]
+        self.group = None
+        if around_centre:
+            bounds = self.items[0].sceneBoundingRect()
+            for item in self.items[1:]:
+                bounds = bounds.united(item.sceneBoundingRect())
+            self.pivot = bounds.center()
+            self._makeGroup(0.0)
+        else:
+            # Items share a pivot and a starting angle only if they were never
+            # moved apart, such as shapes drawn straight onto the canvas
+            pivots = {(pivot.x(), pivot.y()) for pivot in map(_pivot, self.items)}
+            if len(pivots) == 1 and len(set(self.rotations)) == 1:
+                self.pivot = QPointF(*pivots.pop())
+                self._makeGroup(self.rotations[0])
+
+    def _makeGroup(self, base_rotation):
+        self.base_rotation = base_rotation
+        self.group = QGraphicsItemGroup()
+        self.group.setTransformOriginPoint(self.pivot)
+        self.scene.addItem(self.group)
+        for item in self.items:
+            self.group.addToGroup(item)
+
+    def setValue(self, value):
+        self.value = value
+        if self.group is not None:
+            if self.around_centre:
+                self.group.setRotation(value - self.start_value)
+            else:
+                self.group.setRotation(value - self.base_rotation)
+        else:
+            for item in self.items:
+                item.setRotation(value)
+
+    def commit(self):
+        # Ends the drag and returns the undo command for it, or None if nothing
+        # turned. The command has already been applied.
+        if self.group is not None:
+            # With the group back at rest its children are exactly where they
+            # were, so they can be handed back to the scene directly. That skips
+            # removeFromGroup(), which refits the group's bounds on every call.
+            self.group.setRotation(0)
+            for item in reversed(self.items):
+                item.setParentItem(None)
+                # Grouping took the item out of the scene's selection but left
+                # its selected flag set; select it afresh so the scene sees it
+                item.setSelected(False)
+                item.setSelected(True)
+            self.scene.removeItem(self.group)
+            self.group = None
+        if self.around_centre:
+            angle = self.value - self.start_value
+            if not angle:
+                return None
+            turn = QTransform().rotate(angle)
+            new_rotations = [rotation + angle for rotation in self.rotations]
+            new_positions = []
+            for item, pos in zip(self.items, self.positions):
+                # Turn the item's pivot about the common centre and keep it on
+                # the item's own transform origin
+                origin = item.transformOriginPoint()
+                pivot = turn.map(pos + origin - self.pivot) + self.pivot
+                new_positions.append(pivot - origin)
+            command = MacroCommand([
+                PropertyCommand(self.items, "setRotation", self.rotations, new_rotations),
+                PropertyCommand(self.items, "setPos", self.positions, new_positions),
+            ])
+        else:
+            if all(rotation == self.value for rotation in self.rotations):
+                return None
+            command = PropertyCommand(self.items, "setRotation", self.rotations,
+                                      [float(self.value)] * len(self.items))
+        command.redo()
+        return command
+
+
+def _pivot(item):
+    return item.pos() + item.transformOriginPoint()
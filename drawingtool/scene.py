@@ -0,0 +1,488 @@
+"""The drawing canvas."""
+from collections import deque
+from contextlib import contextmanager
+
+from PyQt6.QtCore import QPointF, QRectF, Qt, pyqtSignal
+from PyQt6.QtGui import QPen, QTransform
+from PyQt6.QtWidgets import QGraphicsItem, QGraphicsItemGroup, QGraphicsLineItem, QGraphicsRectItem, QGraphicsScene
+
+from .history import AddItemsCommand, History, PropertyCommand
+from .paging import DEFAULT_MEMORY_BUDGET, ITEM_BYTES, Pager
+from .profiling import profiled, selected_items
+from .shapes import RoundedRectItem, ShapeFactory, drawing_from_items, item_batches
+from .styles import StyleTable
+from .tasks import run_steps
+
+BATCH_SIZE = 256  # Edits touching at least this many items suspend the index
+CANVAS_RECT = QRectF(0, 0, 400, 400)  # The canvas a new scene starts from, part of every export
+
+
+class ItemRegistry:
+    # Insertion-ordered set of the top-level items that get saved, keyed by item
+    # identity. Removing an item leaves a hole that iteration skips; holes are
+    # compacted once they outnumber live entries. Add, remove and replace are
+    # O(1) amortized, and replace keeps the item's place in the save order.
+    # Every listener is told of each item added, removed or replaced.
+    def __init__(self):
+        self._items = []
+        self._slots = {}
+        self.listeners = []
+
+    def __len__(self):
+        return len(self._slots)
+
+    def __contains__(self, item):
+        return id(item) in self._slots
+
+    def __iter__(self):
+        for item in self._items:
+            if item is not None:
+                yield item
+
+    def add(self, item):
+        if id(item) not in self._slots:
+            self._slots[id(item)] = len(self._items)
+            self._items.append(item)
+            for listener in self.listeners:
+                listener.itemAdded(item)
+
+    def remove(self, item):
+        slot = self._slots.pop(id(item), None)
+        if slot is None:
+            raise ValueError("item is not registered")
+        self._items[slot] = None
+        for listener in self.listeners:
+            listener.itemRemoved(item)
+        if len(self._items) > 32 and len(self._items) > 2 * len(self._slots):
+            self._compact()
+
+    def discard(self, item):
+        if id(item) in self._slots:
+            self.remove(item)
+
+    def replace(self, old_item, new_item):
+        if id(old_item) not in self._slots:
+            raise ValueError("item is not registered")
+        # Discarding new_item may compact, which moves old_item's slot
+        self.discard(new_item)
+        slot = self._slots.pop(id(old_item))
+        self._items[slot] = new_item
+        self._slots[id(new_item)] = slot
+        for listener in self.listeners:
+            listener.itemReplaced(old_item, new_item)
+
+    def load(self, items, keys):
+        # Registers items a pager brought into the scene. That is no edit, so
+        # listeners only learn which paging keys the items stand for.
+        for item in items:
+            self._slots[id(item)] = len(self._items)
+            self._items.append(item)
+        for listener in self.listeners:
+            listener.itemsLoaded(items, keys)
+
+    def unload(self, items, keys):
+        # Unregisters items a pager is taking out of the scene
+        for listener in self.listeners:
+            listener.itemsUnloaded(items, keys)
+        for item in items:
+            self._items[self._slots.pop(id(item))] = None
+        if len(self._items) > 32 and len(self._items) > 2 * len(self._slots):
+            self._compact()
+
+    def ordered(self, items):
+        # The registered items among items, in save order
+        return sorted((item for item in items if id(item) in self._slots), key=lambda item: self._slots[id(item)])
+
+    def clear(self):
+        self._items.clear()
+        self._slots.clear()
+
+    def _compact(self):
+        self._items = [item for item in self._items if item is not None]
+        self._slots = {id(item): slot for slot, item in enumerate(self._items)}
+
+class PreviewOverlay:
+    # Rubber-band preview for the active tool. One item is created when the drag
+    # starts and mutated in place on every move; it is painted from the scene's
+    # foreground and never added to the scene, so it stays out of the BSP index.
+    def __init__(self, scene):
+        self.scene = scene
+        self.item = None
+
+    def begin(self, shape_type, point):
+        if shape_type == "Line":
+            self.item = QGraphicsLineItem()
+        elif shape_type == "Rectangle":
+            self.item = QGraphicsRectItem()
+        else:
+            self.item = None
+            return
+        self.item.setPen(QPen(Qt.GlobalColor.white, 2, Qt.PenStyle.DashLine))
+        self.update(point, point)
+
+    def update(self, startPoint, endPoint):
+        if self.item is None:
+            return
+        old_bounds = self.item.boundingRect()
+        if isinstance(self.item, QGraphicsLineItem):
+            self.item.setLine(startPoint.x(), startPoint.y(), endPoint.x(), endPoint.y())
+        else:
+            self.item.setRect(startPoint.x(), startPoint.y(), abs(endPoint.x() - startPoint.x()), abs(endPoint.y() - startPoint.y()))
+        self.repaint(old_bounds.united(self.item.boundingRect()))
+
+    def end(self):
+        if self.item is not None:
+            self.repaint(self.item.boundingRect())
+            self.item = None
+
+    def repaint(self, rect):
+        # Asks the views to repaint rect without marking the scene changed,
+        # which would make a CanvasView render the items under it again
+        for view in self.scene.views():
+            view.updateScene([rect])
+
+    def paint(self, painter):
+        if self.item is None:
+            return
+        painter.save()
+        painter.setPen(self.item.pen())
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+        if isinstance(self.item, QGraphicsLineItem):
+            painter.drawLine(self.item.line())
+        else:
+            painter.drawRect(self.item.rect())
+        painter.restore()
+
+class GraphicsScene(QGraphicsScene):
+    edited = pyqtSignal()  # After every edit, undo and redo
+
+    def __init__(self, memory_budget=DEFAULT_MEMORY_BUDGET):
+        # The canvas is unbounded: views grow their own scene rects as they
+        # pan and zoom (see CanvasView)
+        super().__init__(CANVAS_RECT)
+        self.setBackgroundBrush(Qt.GlobalColor.black)
+        self.startPoint = None
+        self.endPoint = None
+        self.drawingShape = None
+        self.preview = PreviewOverlay(self)  # Rubber-band preview while drawing
+        self.items_to_save = ItemRegistry()  # Top-level items, in save order
+        self.history = History(on_change=self.commandApplied)  # Undo/redo of every edit
+        self.moveStart = None  # Positions of the selection when a drag starts
+        self.marqueeStart = None  # Where a rubber-band selection started
+        self.marqueeItems = []  # Items selected by the rubber band so far
+        self.memory_budget = memory_budget  # For the items of a loaded drawing
+        self.pager = None  # Pages a drawing over the memory budget in and out
+        self.styles = StyleTable()  # Named styles and the pens their items share
+
+    @profiled(items=selected_items)
+    def mousePressEvent(self, event):
+        if event.buttons() & Qt.MouseButton.LeftButton:
+            if self.drawingShape:
+                self.startPoint = event.scenePos()
+                self.endPoint = self.startPoint
+                self.preview.begin(self.drawingShape, self.startPoint)
+            elif not self.itemsAtPoint(event.scenePos()):
+                self.beginMarquee(event.scenePos(), event.modifiers() & Qt.KeyboardModifier.ControlModifier)
+            else:
+                super().mousePressEvent(event)
+                self.moveStart = [(item, item.pos()) for item in self.selectedItems()]
+
+    @profiled(items=selected_items)
+    def mouseMoveEvent(self, event):
+        if event.buttons() & Qt.MouseButton.LeftButton:
+            if self.drawingShape:
+                self.endPoint = event.scenePos()
+                self.updateTemporaryShape()  # Call this method to update the temporary shape
+            elif self.marqueeStart is not None:
+                self.updateMarquee(event.scenePos())
+            else:
+                super().mouseMoveEvent(event)
+
+    @profiled(items=selected_items)
+    def mouseReleaseEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton:
+            if self.drawingShape:
+                self.endPoint = event.scenePos()
+                self.drawShape()
+                self.startPoint = None
+                self.endPoint = None
+                self.preview.end()  # Remove the temporary shape after drawing
+            elif self.marqueeStart is not None:
+                self.updateMarquee(event.scenePos())
+                self.endMarquee()
+            else:
+                super().mouseReleaseEvent(event)
+                self.recordMove()
+
+    def recordMove(self):
+        # Items dragged with the mouse have already moved, so the move is
+        # recorded without being applied again.
+        moved = [(item, pos) for item, pos in self.moveStart or () if item.pos() != pos]
+        self.moveStart = None
+        if moved:
+            items = [item for item, _pos in moved]
+            self.history.push(PropertyCommand(items, "setPos", [pos for _item, pos in moved],
+                                              [item.pos() for item in items]), apply=False)
+
+    def beginMarquee(self, point, extend=False):
+        # Rubber-band selection, answered by Qt's item index. With extend the
+        # current selection is kept and added to.
+        if not extend:
+            self.clearSelection()
+        self.marqueeStart = point
+        self.marqueeItems = []
+        self.preview.begin("Rectangle", point)
+
+    def updateMarquee(self, point):
+        rect = QRectF(self.marqueeStart, point).normalized()
+        self.preview.update(rect.topLeft(), rect.bottomRight())
+        items = self.itemsInRect(rect, Qt.ItemSelectionMode.IntersectsItemShape)
+        inside = {id(item) for item in items}
+        for item in self.marqueeItems:
+            if id(item) not in inside:
+                item.setSelected(False)
+        added = [item for item in items if not item.isSelected()]
+        for item in added:
+            item.setSelected(True)
+        self.marqueeItems = [item for item in self.marqueeItems if id(item) in inside] + added
+
+    def endMarquee(self):
+        self.marqueeStart = None
+        self.marqueeItems = []
+        self.preview.end()
+
+    def itemsInRect(self, rect, mode=Qt.ItemSelectionMode.IntersectsItemBoundingRect):
+        # Top-level items in rect, in save order. Qt's BSP index, which also
+        # culls painting, finds them; grouped items it finds are left out.
+        return self.items_to_save.ordered(self.items(rect, mode))
+
+    def itemsAtPoint(self, point):
+        registry = self.items_to_save
+        return [item for item in self.items(point) if item in registry]
+
+    def drawingInRect(self, rect):
+        # The document model of just the items that reach into rect, for
+        # exporting a region without converting the rest of the canvas
+        if self.pager is not None:
+            return self._restyled(self.pager.drawing(rect)[0])
+        return drawing_from_items(self.itemsInRect(rect))
+
+    def drawing(self):
+        # The document model of the whole drawing, in save order
+        if self.pager is not None:
+            return self._restyled(self.pager.drawing()[0])
+        return drawing_from_items(list(self.items_to_save))
+
+    def _restyled(self, drawing):
+        # Chunks paged out may hold styles since redefined
+        drawing.restyle(self.styles.definitions())
+        return drawing
+
+    def topLevelEntries(self):
+        # The top-level shapes in save order, as items, or as paging keys for
+        # those that are not in the scene (see EditLog.reset)
+        if self.pager is not None:
+            return self.pager.saveOrder()
+        return list(self.items_to_save)
+
+    def contentRect(self):
+        # The starting canvas and every shape, paged in or not
+        if self.pager is not None:
+            return CANVAS_RECT.united(self.pager.contentRect())
+        return CANVAS_RECT.united(self.itemsBoundingRect())
+
+    def viewChanged(self):
+        # A view has come to rest somewhere new
+        if self.pager is not None:
+            self.pager.schedule()
+
+    def commandApplied(self, command):
+        # Tells edit listeners which items an edit changed
+        changed = [item for item in command.changedItems() if item in self.items_to_save]
+        styles = command.changedStyles()
+        for listener in self.items_to_save.listeners:
+            if styles:
+                listener.stylesChanged(styles)
+            listener.itemsChanged(changed)
+            listener.commit()
+        self.edited.emit()
+
+    def addEditListener(self, listener):
+        # listener is told of every top-level item added, removed, replaced
+        # or changed (see EditLog)
+        self.items_to_save.listeners.append(listener)
+
+    def removeEditListener(self, listener):
+        self.items_to_save.listeners.remove(listener)
+
+    @profiled()
+    def updateTemporaryShape(self):
+        self.preview.update(self.startPoint, self.endPoint)
+
+    def loadDrawing(self, drawing, progress=None):
+        # Puts a drawing into the emptied scene: as items, or paged by chunks
+        # if its items would not fit the memory budget. Returns the top-level
+        # entries (see topLevelEntries). The drawing's styles replace any of
+        # the same name.
+        return run_steps(self.loadSteps(drawing), progress)
+
+    def loadSteps(self, drawing):
+        # loadDrawing a batch at a time, as a generator of (done, total) steps
+        # that returns the entries
+        for style in drawing.styles:
+            self.styles.define(style)
+        bounds = drawing.bounds()
+        if bounds is not None:
+            left, top, right, bottom = bounds
+            self.setSceneRect(self.sceneRect().united(QRectF(QPointF(left, top), QPointF(right, bottom))))
+        if len(drawing) * ITEM_BYTES <= self.memory_budget:
+            return (yield from self.addSteps(drawing))
+        self.pager = Pager(self, self.memory_budget)
+        keys = yield from self.pager.loadSteps(drawing)
+        self.items_to_save.listeners.insert(0, self.pager)
+        self.pager.schedule()
+        return list(keys)
+
+    def addDrawing(self, drawing, progress=None):
+        # Adds every item of a drawing in one batch
+        return run_steps(self.addSteps(drawing), progress)
+
+    def addSteps(self, drawing):
+        # addDrawing as a generator of (done, total) steps, counted in
+        # top-level items, that returns the items added. The index and the
+        # views stay suspended from the first step to the last.
+        added = []
+        total = drawing.parent.count(-1)
+        with self.batchUpdate():
+            for items in item_batches(drawing, self.styles):
+                for item in items:
+                    self.addItem(item)
+                    self.items_to_save.add(item)
+                added.extend(items)
+                yield len(added), total
+        return added
+
+    @contextmanager
+    def batchUpdate(self, count=None):
+        # The BSP index is switched off while many items change and rebuilt once
+        # at the end, and attached views stop repainting until the batch is
+        # done. Batches of fewer than BATCH_SIZE items are left alone, since
+        # rebuilding the index costs time in proportion to the whole scene.
+        if count is not None and count < BATCH_SIZE:
+            yield
+            return
+        index_method = self.itemIndexMethod()
+        views = [view for view in self.views() if view.updatesEnabled()]
+        self.setItemIndexMethod(QGraphicsScene.ItemIndexMethod.NoIndex)
+        for view in views:
+            view.setUpdatesEnabled(False)
+        try:
+            yield
+        finally:
+            self.setItemIndexMethod(index_method)
+            # A new BSP index leaves its tree unsplit, so that every query and
+            # every paint walks all items, until it hears of the scene rect
+            self.sceneRectChanged.emit(self.sceneRect())
+            for view in views:
+                view.setUpdatesEnabled(True)
+
+    def clear(self):
+        self.history.clear()
+        super().clear()
+        self.items_to_save.clear()
+        self.styles.reset()
+        if self.pager is not None:
+            self.removeEditListener(self.pager)
+            self.pager.close()
+            self.pager = None
+
+    def groupItems(self, items, group=None):
+        # Puts top-level items into a group, a new one unless given, and returns
+        # it. addToGroup keeps each item where it is on the canvas and grows the
+        # group's bounds by one item at a time.
+        if group is None:
+            group = QGraphicsItemGroup()
+        with self.batchUpdate(len(items)):
+            if group.scene() is not self:
+                self.addItem(group)
+            for item in items:
+                item.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsMovable, False)
+                item.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsSelectable, False)
+                self.items_to_save.discard(item)
+                group.addToGroup(item)
+                if isinstance(item, RoundedRectItem):
+                    item.isPartOfGroup = True
+            group.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsMovable)
+            group.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsSelectable)
+            self.items_to_save.add(group)
+        return group
+
+    def ungroupItems(self, groups, recursive=False):
+        # Takes groups apart, nested groups too if recursive, and returns the
+        # (group, children) steps taken in order. Children keep their place on
+        # the canvas and become top-level items. Each item is visited once.
+        steps = []
+        pending = deque(group for group in groups if isinstance(group, QGraphicsItemGroup))
+        with self.batchUpdate(sum(len(group.childItems()) for group in pending)):
+            while pending:
+                group = pending.popleft()
+                children = group.childItems()
+                for child in children:
+                    detach(child)
+                    if recursive and isinstance(child, QGraphicsItemGroup):
+                        pending.append(child)
+                        continue
+                    child.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsMovable)
+                    child.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsSelectable)
+                    self.items_to_save.add(child)
+                    if isinstance(child, RoundedRectItem):
+                        child.isPartOfGroup = False
+                self.removeItem(group)
+                self.items_to_save.discard(group)
+                steps.append((group, children))
+        return steps
+
+    def drawBackground(self, painter, rect):
+        super().drawBackground(painter, rect)
+        if self.pager is not None:
+            self.pager.paintPlaceholders(painter, rect)
+
+    def drawForeground(self, painter, rect):
+        super().drawForeground(painter, rect)
+        self.preview.paint(painter)
+
+    @profiled()
+    def drawShape(self):
+        if self.startPoint and self.endPoint:
+            shape = ShapeFactory.create_shape(self.drawingShape, self.startPoint, self.endPoint)
+            self.styles.assign(shape, self.styles.get(self.styles.current))
+            shape.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsMovable)
+            shape.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsSelectable)
+            self.history.push(AddItemsCommand(self, [shape]))
+        else:
+            pass
+
+def detach(item):
+    # Makes a child item top-level without moving it on the canvas. This is
+    # what QGraphicsItemGroup.removeFromGroup() does, less the refit of the
+    # group's bounds over all remaining children on every call.
+    parent_transform = item.parentItem().sceneTransform()
+    if parent_transform.type().value <= QTransform.TransformationType.TxTranslate.value:
+        pos = item.pos() + QPointF(parent_transform.dx(), parent_transform.dy())
+        item.setParentItem(None)
+        item.setPos(pos)
+        return
+    # The item keeps its rotation, scale and origin; whatever else the parents
+    # contributed moves into its transform.
+    scene_transform = item.sceneTransform()
+    pos = scene_transform.map(QPointF())
+    origin = item.transformOriginPoint()
+    properties = QTransform()
+    properties.translate(origin.x(), origin.y())
+    properties.rotate(item.rotation())
+    properties.scale(item.scale(), item.scale())
+    properties.translate(-origin.x(), -origin.y())
+    transform = properties.inverted()[0] * scene_transform * QTransform.fromTranslate(-pos.x(), -pos.y())
+    item.setParentItem(None)
+    item.setPos(pos)
+    item.setTransform(transform)
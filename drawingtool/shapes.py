@@ -0,0 +1,265 @@
+"""Scene items for drawing shapes, and conversion to and from the document model."""
+import math
+import weakref
+
+from PyQt6.QtCore import QPointF, QRectF, Qt
+from PyQt6.QtGui import QColor, QPainterPath, QPen, QTransform
+from PyQt6.QtWidgets import QGraphicsItem, QGraphicsItemGroup, QGraphicsLineItem, QGraphicsRectItem
+
+from .document import Drawing, LINE, RECTANGLE, GROUP, SHARP, CURVED, CORNER_RADIUS, NO_STYLE, NO_TRANSFORM
+
+MIN_VISIBLE_SIZE = 0.5  # device pixels
+MIN_CORNER_SIZE = 2.0  # device pixels
+ITEM_BATCH_SIZE = 1024  # Shapes per batch of item_batches()
+TRANSLATE = QTransform.TransformationType.TxTranslate.value
+ROTATION_TOLERANCE = 1e-9
+PEN_STYLES = (Qt.PenStyle.SolidLine, Qt.PenStyle.DashLine, Qt.PenStyle.DotLine, Qt.PenStyle.DashDotLine)
+
+
+def style_pen(style):
+    pen = QPen(QColor(style.color))
+    pen.setWidthF(style.width)
+    pen.setStyle(PEN_STYLES[style.dash])
+    return pen
+
+
+class StyleRef:
+    # What the items using a style point at, through their style_ref
+    # attribute: the style's current definition, the one pen they share and,
+    # weakly, the items themselves. Redefining the style changes this one
+    # object rather than every item.
+    __slots__ = ("style", "pen", "users", "__weakref__")
+
+    def __init__(self, style):
+        self.style = style
+        self.pen = style_pen(style)
+        self.users = weakref.WeakSet()
+
+
+def style_ref(item):
+    return getattr(item, "style_ref", None)
+
+
+class ShapeFactory:
+    @staticmethod
+    def create_shape(shape_type, startPoint = 0, endPoint = 0):
+        if shape_type == "Line":
+            return QGraphicsLineItem(startPoint.x(), startPoint.y(), endPoint.x(), endPoint.y())
+        elif shape_type == "Rectangle":
+                return QGraphicsRectItem(startPoint.x(), startPoint.y(), abs(endPoint.x() - startPoint.x()), abs(endPoint.y() - startPoint.y()))
+        else:
+            raise ValueError("Invalid shape type")
+
+class RoundedRectItem(QGraphicsRectItem):
+    # The rounded outline is built once and reused by shape() and paint() until
+    # the rect or the corner radius changes. Qt asks for shape() on every
+    # hit-test, collision check and rubber-band selection.
+    def __init__(self, rect, parent=None, radius=CORNER_RADIUS):
+        super().__init__(rect, parent)
+        self.isPartOfGroup = False
+        self._radius = radius
+        self._path = None
+
+    def setRect(self, *rect):
+        super().setRect(*rect)
+        self._path = None
+
+    def radius(self):
+        return self._radius
+
+    def setRadius(self, radius):
+        if radius != self._radius:
+            self._radius = radius
+            self._path = None
+            self.update()
+
+    def roundedPath(self):
+        if self._path is None:
+            self._path = QPainterPath()
+            self._path.addRoundedRect(self.rect(), self._radius, self._radius)
+        return self._path
+
+    def shape(self):
+        return self.roundedPath()
+
+    def paint(self, painter, option, widget=None):
+        # Level of detail: items smaller than a pixel are skipped, and corners
+        # too small to see are drawn as a plain rect.
+        lod = option.levelOfDetailFromTransform(painter.worldTransform())
+        rect = self.rect()
+        if max(rect.width(), rect.height()) * lod < MIN_VISIBLE_SIZE:
+            return
+        painter.setPen(self.pen())
+        painter.setBrush(self.brush())
+        if self._radius * lod < MIN_CORNER_SIZE:
+            painter.drawRect(rect)
+        else:
+            painter.drawPath(self.roundedPath())
+
+        if self.isSelected():
+            if not self.isPartOfGroup:
+                pen = QPen(Qt.GlobalColor.gray, 1, Qt.PenStyle.DashLine)
+                painter.setPen(pen)
+                painter.drawRect(self.boundingRect())
+
+
+def drawing_from_items(items):
+    # Builds the document model for items and everything grouped under them.
+    # Where an item's scene transform is only a shift, as for every item
+    # never rotated, it is folded into the stored coordinates; otherwise the
+    # item's own coordinates are stored with its scene transform. Colours are
+    # interned by their RGBA value, so each distinct colour is named once.
+    # Styled items take their colour and width from their style, which is
+    # looked up once, rather than from their pens.
+    drawing = Drawing()
+    color_ids = {}
+    looks = {}  # id(StyleRef) -> (colour index, width, style index)
+
+    def look(item):
+        ref = getattr(item, "style_ref", None)
+        if ref is not None:
+            if id(ref) not in looks:
+                style = ref.style
+                looks[id(ref)] = (drawing.color_id(style.color), style.width, drawing.style_id(style))
+            return looks[id(ref)]
+        pen = item.pen()
+        color = pen.color()
+        rgba = color.rgba()
+        if rgba not in color_ids:
+            color_ids[rgba] = drawing.color_id(color.name())
+        return color_ids[rgba], pen.widthF(), NO_STYLE
+
+    def add_item(item, parent):
+        scene_transform = item.sceneTransform()
+        dx, dy = scene_transform.dx(), scene_transform.dy()
+        transform = NO_TRANSFORM
+        if scene_transform.type().value > TRANSLATE:
+            transform = drawing.transform_id((scene_transform.m11(), scene_transform.m12(), scene_transform.m21(),
+                                              scene_transform.m22(), dx, dy))
+            dx = dy = 0.0
+        if isinstance(item, QGraphicsLineItem):
+            line = item.line()
+            color, width, style = look(item)
+            drawing.append_record(LINE, line.x1() + dx, line.y1() + dy, line.x2() + dx, line.y2() + dy,
+                            color, width, item.zValue(), SHARP, parent, style, transform)
+        elif isinstance(item, QGraphicsRectItem):
+            rect = item.rect()
+            color, width, style = look(item)
+            corner = CURVED if isinstance(item, RoundedRectItem) else SHARP
+            drawing.append_record(RECTANGLE, rect.left() + dx, rect.top() + dy, rect.right() + dx, rect.bottom() + dy,
+                            color, width, item.zValue(), corner, parent, style, transform)
+        elif isinstance(item, QGraphicsItemGroup):
+            group = drawing.append_record(GROUP, 0.0, 0.0, 0.0, 0.0, 0, 0.0, item.zValue(), SHARP, parent,
+                                          NO_STYLE, transform)
+            for child in item.childItems():
+                add_item(child, group)
+
+    for item in items:
+        add_item(item, -1)
+    return drawing
+
+
+def place(item, matrix):
+    # Gives a new item the scene transform matrix (see document.py). A plain
+    # rotation becomes the item's rotation, as the rotate slider sets it;
+    # anything else goes into its transform.
+    m11, m12, m21, m22, dx, dy = matrix
+    item.setPos(dx, dy)
+    if (abs(m11 - m22) < ROTATION_TOLERANCE and abs(m12 + m21) < ROTATION_TOLERANCE
+            and abs(m11 * m22 - m12 * m21 - 1) < ROTATION_TOLERANCE):
+        item.setRotation(math.degrees(math.atan2(m12, m11)))
+    else:
+        item.setTransform(QTransform(m11, m12, m21, m22, 0.0, 0.0))
+
+
+def with_corners(item, curved):
+    # A copy of rect item with curved or sharp corners, in the same place on
+    # the canvas and in the stacking order. Its pen is left to the caller.
+    copy = RoundedRectItem(item.rect()) if curved else QGraphicsRectItem(item.rect())
+    copy.setPos(item.pos())
+    copy.setZValue(item.zValue())
+    copy.setTransformOriginPoint(item.transformOriginPoint())
+    copy.setRotation(item.rotation())
+    copy.setScale(item.scale())
+    copy.setTransform(item.transform())
+    copy.setBrush(item.brush())
+    return copy
+
+
+def items_from_drawing(drawing, styles=None):
+    # Creates the scene items for a drawing and returns the top-level ones.
+    # Children are put into their groups here, so only the returned items need
+    # to be added to a scene.
+    #
+    # Pens are shared: one per style, and one per colour and width among
+    # shapes without a style. With a StyleTable given, styled shapes take on
+    # the table's definitions of their styles and become its users.
+    top_level = []
+    for batch in item_batches(drawing, styles, len(drawing)):
+        top_level.extend(batch)
+    return top_level
+
+
+def item_batches(drawing, styles=None, batch_size=ITEM_BATCH_SIZE):
+    # items_from_drawing a batch at a time: yields lists of top-level items
+    # holding about batch_size shapes between them, each group whole
+    if styles is not None:
+        refs = [styles.ref(style) for style in drawing.styles]
+    else:
+        refs = [StyleRef(style) for style in drawing.styles]
+    users = [[] for _ in refs]
+    pens = {}  # (colour index, width) -> pen
+    items = [None] * len(drawing)
+    top_level = []
+    batch_start = 0
+    for index in range(len(drawing)):
+        parent = drawing.parent[index]
+        if parent == -1 and index - batch_start >= batch_size:
+            for ref, style_users in zip(refs, users):
+                ref.users.update(style_users)
+                style_users.clear()
+            yield top_level
+            top_level = []
+            batch_start = index
+        kind = drawing.kind[index]
+        style_id = drawing.style[index] if kind != GROUP else NO_STYLE
+        if kind == LINE:
+            item = QGraphicsLineItem(drawing.x1[index], drawing.y1[index], drawing.x2[index], drawing.y2[index])
+        elif kind == RECTANGLE:
+            rect = QRectF(QPointF(drawing.x1[index], drawing.y1[index]), QPointF(drawing.x2[index], drawing.y2[index]))
+            if drawing.corner[index] == CURVED:
+                radius = refs[style_id].style.radius if style_id != NO_STYLE else CORNER_RADIUS
+                item = RoundedRectItem(rect, radius=radius)
+            else:
+                item = QGraphicsRectItem(rect)
+        else:
+            item = QGraphicsItemGroup()
+        if style_id != NO_STYLE:
+            item.setPen(refs[style_id].pen)
+            item.style_ref = refs[style_id]
+            users[style_id].append(item)
+        elif kind != GROUP:
+            key = (drawing.color[index], drawing.width[index])
+            pen = pens.get(key)
+            if pen is None:
+                pen = pens[key] = QPen(QColor(drawing.palette[key[0]]))
+                pen.setWidthF(key[1])
+            item.setPen(pen)
+        item.setZValue(drawing.z[index])
+        if drawing.transform[index] != NO_TRANSFORM:
+            place(item, drawing.matrix(index))
+        items[index] = item
+
+        if parent == -1:
+            item.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsMovable)
+            item.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsSelectable)
+            top_level.append(item)
+        else:
+            if isinstance(item, RoundedRectItem):
+                item.isPartOfGroup = True
+            # Keeps the item where it is on the canvas, whatever its group's transform
+            items[parent].addToGroup(item)
+    for ref, style_users in zip(refs, users):
+        ref.users.update(style_users)
+    if top_level:
+        yield top_level
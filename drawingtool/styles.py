@@ -0,0 +1,99 @@
+"""Named styles shared by the items of a scene.
+
+Every item that uses a style points at the style's StyleRef (see shapes.py)
+and shares its one pen. The ref knows the items using it, so redefining a
+style restyles all of them in one pass, including items only the undo
+history still holds, without touching anything but their pens.
+"""
+from .document import Style
+from .shapes import RoundedRectItem, StyleRef, style_pen, style_ref
+
+DEFAULT_STYLE = Style("Default", "#ffffff", 4.0)  # What new shapes have always been drawn with
+
+
+class StyleTable:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._refs = {}  # name -> StyleRef, in the order they were defined
+        self.current = DEFAULT_STYLE.name  # The style new shapes are drawn with
+        self.define(DEFAULT_STYLE)
+
+    def __iter__(self):
+        return iter([ref.style for ref in self._refs.values()])
+
+    def __contains__(self, name):
+        return name in self._refs
+
+    def get(self, name):
+        ref = self._refs.get(name)
+        return ref.style if ref is not None else None
+
+    def definitions(self):
+        # name -> Style, for Drawing.restyle
+        return {name: ref.style for name, ref in self._refs.items()}
+
+    def styleOf(self, item):
+        ref = style_ref(item)
+        return ref.style if ref is not None else None
+
+    def users(self, name):
+        return list(self._refs[name].users)
+
+    def ref(self, style):
+        # The ref of style's name, which is defined as style if it is new
+        ref = self._refs.get(style.name)
+        if ref is None:
+            ref = self._refs[style.name] = StyleRef(style)
+        return ref
+
+    def define(self, style):
+        # Sets the definition of style's name and gives every item using it
+        # the new look. Returns those items.
+        ref = self._refs.get(style.name)
+        if ref is None:
+            self._refs[style.name] = StyleRef(style)
+            return []
+        ref.style = style
+        ref.pen = pen = style_pen(style)
+        users = list(ref.users)
+        for item in users:
+            item.setPen(pen)
+            if isinstance(item, RoundedRectItem):
+                item.setRadius(style.radius)
+        return users
+
+    def remove(self, name):
+        # Takes away a style no item uses
+        del self._refs[name]
+        if self.current == name:
+            self.current = DEFAULT_STYLE.name
+
+    def recolored(self, style, color):
+        # style in another colour, as a style of its own named after both. A
+        # style of that name already defined is only reused if it matches.
+        base = f"{style.name} {color}"
+        name = base
+        number = 1
+        while name in self._refs and self._refs[name].style != style.replace(name=name, color=color):
+            number += 1
+            name = f"{base} ({number})"
+        return style.replace(name=name, color=color)
+
+    def assign(self, item, style, pen=None):
+        # Points item at the table's definition of style, or with style None
+        # takes its style away and gives it pen
+        old_ref = style_ref(item)
+        if old_ref is not None:
+            old_ref.users.discard(item)
+        if style is None:
+            item.style_ref = None
+            item.setPen(pen)
+        else:
+            ref = self.ref(style)
+            ref.users.add(item)
+            item.style_ref = ref
+            item.setPen(ref.pen)
+            if isinstance(item, RoundedRectItem):
+                item.setRadius(ref.style.radius)
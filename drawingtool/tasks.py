@@ -0,0 +1,193 @@
+"""Opening, saving and exporting without blocking the window.
+
+A task does its parsing, formatting and file I/O on a worker thread, which
+must not touch scene items. Work that needs the GUI thread, such as adding
+the shapes of an opened drawing to the scene, is a generator that yields
+(done, total) after every batch. A TaskRunner runs such a generator a few
+batches per event loop turn, so the window keeps painting in between.
+
+While a task runs its window takes no input except through the progress
+dialog, whose Cancel button stops the task at its next progress report.
+"""
+import threading
+import time
+
+from PyQt6.QtCore import QEvent, QObject, QTimer, Qt, pyqtSignal
+from PyQt6.QtWidgets import QApplication, QMessageBox, QProgressDialog
+
+POLL_MS = 50  # How often the dialog follows the worker thread
+STEP_SECONDS = 0.02  # GUI thread time given to a task per event loop turn
+PROGRESS_DELAY_MS = 300  # Tasks quicker than this never show their dialog
+INPUT_EVENTS = frozenset((QEvent.Type.MouseButtonPress, QEvent.Type.MouseButtonRelease,
+                          QEvent.Type.MouseButtonDblClick, QEvent.Type.Wheel, QEvent.Type.KeyPress,
+                          QEvent.Type.KeyRelease, QEvent.Type.Shortcut, QEvent.Type.ShortcutOverride))
+
+
+class TaskCancelled(Exception):
+    pass
+
+
+def run_steps(steps, progress=None):
+    # Runs a generator of (done, total) steps to the end, passing each to
+    # progress, and returns the generator's return value
+    while True:
+        try:
+            done, total = next(steps)
+        except StopIteration as stop:
+            return stop.value
+        if progress:
+            progress(done, total)
+
+
+class FileTask:
+    # work(task) runs on the worker thread and passes task.report to the
+    # reader or writer as its progress callback. finish(result), if given,
+    # returns the generator of steps to run on the GUI thread; its return
+    # value becomes the task's result. PngExport and the vector exports have
+    # the same run(), cancel(), cancelled() and progress, and run the same way.
+    def __init__(self, work, finish=None):
+        self.work = work
+        self.finish = finish
+        self.progress = 0.0
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def report(self, done, total):
+        if self._cancelled.is_set():
+            raise TaskCancelled()
+        self.progress = done / total if total else 1.0
+
+    def run(self):
+        return self.work(self)
+
+
+class InputBlocker(QObject):
+    # Swallows mouse and key input for window and its children, apart from
+    # the widgets under allowed. Unlike disabling the window it leaves the
+    # window looking as it did, so a quick task does not make it flicker.
+    def __init__(self, window, allowed):
+        super().__init__(window)
+        self.window = window
+        self.allowed = allowed
+        QApplication.instance().installEventFilter(self)
+
+    def remove(self):
+        QApplication.instance().removeEventFilter(self)
+
+    def eventFilter(self, watched, event):
+        if event.type() not in INPUT_EVENTS:
+            return False
+        while watched is not None:
+            if watched is self.allowed:
+                return False
+            if watched is self.window:
+                return True
+            watched = watched.parent()
+        return False
+
+
+class TaskRunner(QObject):
+    # Runs task.run() on a worker thread, then its finish steps, if any, on
+    # the GUI thread, behind a progress dialog on window. finished(result) is
+    # called once the task has completed; an error is shown in a message box
+    # headed failure instead. A cancelled task calls neither.
+    worked = pyqtSignal()  # Emitted from the worker thread as it ends
+
+    def __init__(self, window, task, label, failure, finished=None):
+        super().__init__(window)
+        self.window = window
+        self.task = task
+        self.failure = failure
+        self.finished = finished
+        self.result = None
+        self.error = None
+        self._done = False
+        self._steps = None
+        finish = getattr(task, "finish", None)
+        self._stages = 2 if finish is not None else 1
+        self.dialog = QProgressDialog(label, "Cancel", 0, 100 * self._stages, window)
+        self.dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        self.dialog.setMinimumDuration(PROGRESS_DELAY_MS)
+        self.dialog.setAutoReset(False)
+        self.dialog.setAutoClose(False)
+        self.dialog.canceled.connect(task.cancel)
+        self.blocker = InputBlocker(window, self.dialog)
+        self._worker = threading.Thread(target=self._work, daemon=True)
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._poll)
+        # Queued to the GUI thread, so a quick task need not wait for a poll
+        self.worked.connect(self._poll)
+
+    def start(self):
+        self._worker.start()
+        self._timer.start(POLL_MS)
+        return self
+
+    def done(self):
+        return self._done
+
+    def _work(self):
+        try:
+            self.result = self.task.run()
+        except TaskCancelled:
+            pass
+        except Exception as e:
+            self.error = e
+        self.worked.emit()
+
+    def _poll(self):
+        if self._done:
+            return
+        if self._steps is not None:
+            self._step()
+        elif self._worker.is_alive():
+            self.dialog.setValue(int(self.task.progress * 100))
+        elif self.error is not None:
+            self._end(self.error)
+        elif self.task.cancelled():
+            self._end()
+        elif self._stages == 2:
+            self.dialog.setValue(100)
+            self._steps = self.task.finish(self.result)
+            self._timer.setInterval(0)
+        else:
+            self._end(completed=True)
+
+    def _step(self):
+        # Runs finish steps for up to STEP_SECONDS, then lets the event loop in
+        if self.task.cancelled():
+            self._steps.close()
+            self._end()
+            return
+        deadline = time.perf_counter() + STEP_SECONDS
+        try:
+            while time.perf_counter() < deadline:
+                done, total = next(self._steps)
+                self.dialog.setValue(100 + (100 * done // total if total else 100))
+        except StopIteration as stop:
+            self.result = stop.value
+            self._end(completed=True)
+        except Exception as e:
+            self._end(e)
+
+    def _end(self, error=None, completed=False):
+        self._timer.stop()
+        self.blocker.remove()
+        self.blocker.deleteLater()
+        self.dialog.canceled.disconnect(self.task.cancel)
+        self.dialog.close()
+        self.dialog.deleteLater()
+        self.deleteLater()
+        try:
+            if error is not None:
+                self.error = error
+                QMessageBox.warning(self.window, self.failure, str(error))
+            elif completed and self.finished:
+                self.finished(self.result)
+        finally:
+            self._done = True
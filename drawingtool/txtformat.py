@@ -0,0 +1,123 @@
+"""Reader and writer for the .txt drawing format.
+
+One record per line::
+
+    line x1 y1 x2 y2 color
+    rect x1 y1 x2 y2 color r|s      (corners, as written by Save as .txt)
+    rect x y width height color     (older files)
+    roundedrect x y width height color
+    begin
+    end
+
+A record with a transform (see document.py) has its six numbers at the end
+of its line: "line x1 y1 x2 y2 color m11 m12 m21 m22 dx dy", likewise for
+rect, and "begin m11 m12 m21 m22 dx dy" for a group.
+
+The file is read in large chunks and parsed straight into a Drawing, so no
+Qt objects are created while reading. Writing goes the other way: records are
+formatted in batches from the Drawing's columns and written through a large
+buffer, so memory use does not depend on the size of the drawing.
+"""
+import os
+
+from .document import Drawing, LINE, RECTANGLE, SHARP, CURVED, NO_TRANSFORM
+
+CHUNK_SIZE = 1 << 20
+BATCH_SIZE = 4096
+
+
+def read_txt(file, progress=None, chunk_size=CHUNK_SIZE):
+    # progress, if given, is called as progress(bytes_read, total_bytes) after
+    # every chunk.
+    drawing = Drawing()
+    add_line = drawing.add_line
+    add_rect = drawing.add_rect
+    add_group = drawing.add_group
+    groups = []
+    parent = -1
+    for lines in _read_lines(file, progress, chunk_size):
+        for line in lines:
+            data = line.split()
+            if not data:
+                continue
+            tag = data[0]
+            if tag == "line":
+                add_line(float(data[1]), float(data[2]), float(data[3]), float(data[4]), data[5], 0.0, parent,
+                         matrix=_matrix(data, 6))
+            elif tag == "rect" and len(data) > 6:
+                add_rect(float(data[1]), float(data[2]), float(data[3]), float(data[4]), data[5],
+                         CURVED if data[6] == "r" else SHARP, 0.0, parent, matrix=_matrix(data, 7))
+            elif tag == "rect" or tag == "roundedrect":
+                x, y = float(data[1]), float(data[2])
+                add_rect(x, y, x + float(data[3]), y + float(data[4]), data[5],
+                         CURVED if tag == "roundedrect" else SHARP, 0.0, parent)
+            elif tag == "begin":
+                parent = add_group(0.0, parent, _matrix(data, 1))
+                groups.append(parent)
+            elif tag == "end":
+                groups.pop()
+                parent = groups[-1] if groups else -1
+    return drawing
+
+
+def _matrix(data, start):
+    # The transform at the end of a record's fields, or None
+    if len(data) < start + 6:
+        return None
+    return tuple(map(float, data[start:start + 6]))
+
+
+def _read_lines(file, progress, chunk_size):
+    # Yields the complete lines of each chunk; a line cut at the end of a chunk
+    # is carried over to the next one.
+    try:
+        total = os.fstat(file.fileno()).st_size
+    except (AttributeError, OSError):
+        total = 0
+    done = 0
+    tail = ""
+    while True:
+        chunk = file.read(chunk_size)
+        if not chunk:
+            break
+        done += len(chunk)
+        lines = (tail + chunk).split("\n")
+        tail = lines.pop()
+        yield lines
+        if progress:
+            progress(done, max(total, done))
+    if tail:
+        yield [tail]
+
+
+def write_txt(drawing, file, batch_size=BATCH_SIZE, progress=None):
+    # Coordinates are converted a column slice at a time, which is cheaper than
+    # formatting each float inside a per-record f-string. progress, if given,
+    # is called as progress(records_written, total_records) after every batch.
+    palette = drawing.palette
+    corners = (" s", " r")
+    open_groups = []
+    for start in range(0, len(drawing), batch_size):
+        stop = start + batch_size
+        batch = []
+        records = zip(range(start, stop), drawing.kind[start:stop],
+                      map(repr, drawing.x1[start:stop]), map(repr, drawing.y1[start:stop]),
+                      map(repr, drawing.x2[start:stop]), map(repr, drawing.y2[start:stop]),
+                      drawing.color[start:stop], drawing.corner[start:stop], drawing.parent[start:stop],
+                      drawing.transform[start:stop])
+        for index, kind, x1, y1, x2, y2, color, corner, parent, transform in records:
+            while open_groups and parent != open_groups[-1]:
+                open_groups.pop()
+                batch.append("end\n")
+            end = "\n" if transform == NO_TRANSFORM else " " + " ".join(map(repr, drawing.matrix(index))) + "\n"
+            if kind == LINE:
+                batch.append("line " + x1 + " " + y1 + " " + x2 + " " + y2 + " " + palette[color] + end)
+            elif kind == RECTANGLE:
+                batch.append("rect " + x1 + " " + y1 + " " + x2 + " " + y2 + " " + palette[color] + corners[corner] + end)
+            else:
+                batch.append("begin" + end)
+                open_groups.append(index)
+        file.write("".join(batch))
+        if progress:
+            progress(min(stop, len(drawing)), len(drawing))
+    file.write("end\n" * len(open_groups))
@@ -0,0 +1,257 @@
+"""Streaming SVG and multi-page PDF export.
+
+SvgExport walks the drawing in paint order and writes each batch of shapes as
+soon as it is formatted, so the document never exists as a whole in memory.
+Consecutive shapes with the same stroke are merged into one <path>; they are
+neighbours in paint order, so merging them does not change the picture but
+makes large files much smaller and quicker to load. A shape with a transform
+(see document.py) gets a <path> of its own with the transform attached.
+
+PdfExport paints through QPdfWriter, one page at a time. A source rect that
+does not fit on one page at the export scale is tiled over as many pages as
+it takes, and each page only paints the shapes that touch it.
+
+Like PngExport, both work from a Drawing so that run() can be called from a
+worker thread, and both write beside the target file, replacing it only once
+the export is complete.
+"""
+import math
+import os
+import threading
+from xml.sax.saxutils import quoteattr
+
+from PyQt6.QtCore import QMarginsF, QRectF, Qt
+from PyQt6.QtGui import QColor, QPageLayout, QPageSize, QPainter, QPdfWriter
+
+from .document import LINE, RECTANGLE, CURVED, NO_STYLE, NO_TRANSFORM
+from .fileformats import replacing
+from .pngexport import ExportCancelled, bucket_shapes, paint_order, paint_shapes, shape_radius
+from .profiling import profiled
+
+BATCH_SIZE = 4096
+MAX_PATH_SHAPES = 1024  # Longest run of shapes merged into one <path>
+PDF_RESOLUTION = 96  # Device units per inch, so one scene unit is one unit at scale 1
+DASH_PATTERNS = ("", "4 2", "1 2", "4 2 1 2")  # Qt's dash patterns, in pen widths
+
+
+def _stroke(color, width, dash=0):
+    # The attributes of a <path> drawn with a QPen of this colour, width and
+    # dash. Qt draws width 0 as one device pixel whatever the scale.
+    attributes = f"stroke={quoteattr(QColor(color).name())} stroke-width=\"{width or 1}\""
+    if not width:
+        attributes += ' vector-effect="non-scaling-stroke"'
+    if dash:
+        unit = width or 1
+        attributes += ' stroke-dasharray="' + " ".join(str(float(step) * unit) for step in DASH_PATTERNS[dash].split()) + '"'
+    return attributes
+
+
+def _outline(drawing, index):
+    # Path data for one shape, in its own coordinates
+    x1, y1, x2, y2 = drawing.x1[index], drawing.y1[index], drawing.x2[index], drawing.y2[index]
+    if drawing.kind[index] == LINE:
+        return f"M{x1} {y1}L{x2} {y2}"
+    if drawing.corner[index] == CURVED:
+        left, right = min(x1, x2), max(x1, x2)
+        top, bottom = min(y1, y2), max(y1, y2)
+        # Qt shrinks the radius to fit, like drawRoundedRect does
+        radius = shape_radius(drawing, index)
+        rx = min(radius, (right - left) / 2)
+        ry = min(radius, (bottom - top) / 2)
+        if rx > 0 and ry > 0:
+            arc = f"A{rx} {ry} 0 0 1 "
+            return (f"M{left + rx} {top}H{right - rx}{arc}{right} {top + ry}V{bottom - ry}{arc}{right - rx} {bottom}"
+                    f"H{left + rx}{arc}{left} {bottom - ry}V{top + ry}{arc}{left + rx} {top}Z")
+    return f"M{x1} {y1}H{x2}V{y2}H{x1}Z"
+
+
+class SvgExport:
+    # Exports source_rect (scene coordinates) of a drawing to path. run(),
+    # cancel() and progress behave as they do for PngExport.
+    def __init__(self, drawing, path, source_rect, scale=1.0, background=Qt.GlobalColor.black, batch_size=BATCH_SIZE):
+        self.drawing = drawing
+        self.path = path
+        self.source_rect = QRectF(source_rect)
+        self.scale = scale
+        self.background = QColor(background)
+        self.batch_size = batch_size
+        self.width = max(1, math.ceil(self.source_rect.width() * scale))
+        self.height = max(1, math.ceil(self.source_rect.height() * scale))
+        self.progress = 0.0
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    @profiled(items=lambda export: len(export.drawing))
+    def run(self):
+        # Returns True when the file was written and False when the export was
+        # cancelled, leaving path as it was (see PngExport.run)
+        try:
+            with replacing(self.path) as temp_path:
+                with open(temp_path, "w", encoding="utf-8") as file:
+                    self._write(file)
+                    file.flush()
+                    os.fsync(file.fileno())
+        except ExportCancelled:
+            return False
+        return True
+
+    def _write(self, file):
+        drawing = self.drawing
+        rect = self.source_rect
+        left, top, width, height = rect.left(), rect.top(), rect.width(), rect.height()
+        file.write(f'<?xml version="1.0" encoding="UTF-8"?>\n'
+                   f'<svg xmlns="http://www.w3.org/2000/svg" width="{self.width}" height="{self.height}" '
+                   f'viewBox="{left} {top} {width} {height}">\n'
+                   f'<rect x="{left}" y="{top}" width="{width}" height="{height}" fill="{self.background.name()}"/>\n'
+                   f'<g fill="none" stroke-linecap="square" stroke-linejoin="bevel">\n')
+        stroke = self._strokes()
+        order = paint_order(drawing)
+        kinds = drawing.kind
+        transform = drawing.transform
+        run_stroke = None
+        run = []
+        for start in range(0, len(order), self.batch_size):
+            if self.cancelled():
+                raise ExportCancelled()
+            batch = []
+            for index in order[start:start + self.batch_size]:
+                kind = kinds[index]
+                if kind != LINE and kind != RECTANGLE:
+                    continue
+                attributes = stroke(index)
+                if transform[index] != NO_TRANSFORM:
+                    # SVG's matrix(a b c d e f) takes QTransform's numbers in the same order
+                    if run:
+                        batch.append(f'<path {run_stroke} d="{"".join(run)}"/>\n')
+                        run = []
+                    matrix = " ".join(map(repr, drawing.matrix(index)))
+                    batch.append(f'<path {attributes} transform="matrix({matrix})" d="{_outline(drawing, index)}"/>\n')
+                    continue
+                if attributes is not run_stroke or len(run) == MAX_PATH_SHAPES:
+                    if run:
+                        batch.append(f'<path {run_stroke} d="{"".join(run)}"/>\n')
+                        run = []
+                    run_stroke = attributes
+                run.append(_outline(drawing, index))
+            file.write("".join(batch))
+            self.progress = min(len(order), start + self.batch_size) / len(order)
+        if run:
+            file.write(f'<path {run_stroke} d="{"".join(run)}"/>\n')
+        file.write("</g>\n</svg>\n")
+
+    def _strokes(self):
+        # stroke(index) gives the stroke attributes of record index. Equal
+        # strokes are the same string object, so runs are found with `is`.
+        drawing = self.drawing
+        palette, color, width, style = drawing.palette, drawing.color, drawing.width, drawing.style
+        interned = {}
+        style_strokes = [interned.setdefault(attributes, attributes)
+                         for attributes in (_stroke(entry.color, entry.width, entry.dash) for entry in drawing.styles)]
+        strokes = {}
+
+        def stroke(index):
+            style_id = style[index]
+            if style_id != NO_STYLE:
+                return style_strokes[style_id]
+            key = (color[index], width[index])
+            found = strokes.get(key)
+            if found is None:
+                found = _stroke(palette[key[0]], key[1])
+                found = strokes[key] = interned.setdefault(found, found)
+            return found
+        return stroke
+
+
+class PdfExport:
+    # Exports source_rect (scene coordinates) of a drawing to path as a PDF
+    # with pages of page_size. At scale 1 a scene unit is 1/96 inch, as on
+    # screen. The page is turned to landscape when the region is wider than
+    # it is tall.
+    def __init__(self, drawing, path, source_rect, scale=1.0, page_size=QPageSize.PageSizeId.A4,
+                 background=Qt.GlobalColor.black):
+        self.drawing = drawing
+        self.path = path
+        self.source_rect = QRectF(source_rect)
+        self.scale = scale
+        self.page_size = QPageSize(page_size)
+        self.background = QColor(background)
+        self.width = max(1, math.ceil(self.source_rect.width() * scale))
+        self.height = max(1, math.ceil(self.source_rect.height() * scale))
+        page = self.page_size.sizePixels(PDF_RESOLUTION)
+        self.page_width, self.page_height = page.width(), page.height()
+        if (self.width > self.height) != (self.page_width > self.page_height):
+            self.page_width, self.page_height = self.page_height, self.page_width
+        self.orientation = (QPageLayout.Orientation.Landscape if self.page_width > self.page_height
+                            else QPageLayout.Orientation.Portrait)
+        self.columns = math.ceil(self.width / self.page_width)
+        self.rows = math.ceil(self.height / self.page_height)
+        self.progress = 0.0
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def pages(self):
+        return self.columns * self.rows
+
+    @profiled(items=lambda export: len(export.drawing))
+    def run(self):
+        # Returns True when the file was written and False when the export was
+        # cancelled, leaving path as it was (see PngExport.run)
+        buckets = bucket_shapes(self.drawing, self.source_rect, self.scale, self.width, self.height,
+                                self.page_width, self.page_height)
+        try:
+            with replacing(self.path) as temp_path:
+                self._write(temp_path, buckets)
+        except ExportCancelled:
+            return False
+        return True
+
+    def _write(self, path, buckets):
+        writer = QPdfWriter(path)
+        writer.setResolution(PDF_RESOLUTION)
+        writer.setPageLayout(QPageLayout(self.page_size, self.orientation, QMarginsF()))
+        painter = QPainter()
+        if not painter.begin(writer):
+            raise OSError(f"Cannot write {self.path}")
+        try:
+            for row in range(self.rows):
+                for column in range(self.columns):
+                    if self.cancelled():
+                        raise ExportCancelled()
+                    if row or column:
+                        writer.newPage()
+                    self._paint_page(painter, buckets.get((row, column), ()), row, column)
+                    self.progress = (row * self.columns + column + 1) / self.pages()
+        finally:
+            painter.end()
+
+    def _paint_page(self, painter, indices, row, column):
+        x = column * self.page_width
+        y = row * self.page_height
+        area = QRectF(0, 0, min(self.page_width, self.width - x), min(self.page_height, self.height - y))
+        painter.save()
+        painter.fillRect(area, self.background)
+        if indices:
+            painter.setClipRect(area)
+            painter.translate(-x, -y)
+            painter.scale(self.scale, self.scale)
+            painter.translate(-self.source_rect.left(), -self.source_rect.top())
+            paint_shapes(painter, self.drawing, indices)
+        painter.restore()
+
+
+def export_svg(drawing, path, source_rect, **options):
+    return SvgExport(drawing, path, source_rect, **options).run()
+
+
+def export_pdf(drawing, path, source_rect, **options):
+    return PdfExport(drawing, path, source_rect, **options).run()
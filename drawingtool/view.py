@@ -0,0 +1,337 @@
+"""Zoomable, pannable view of the drawing canvas."""
+import time
+
+from PyQt6.QtCore import QPoint, QRect, QRectF, QTimer, Qt, pyqtSignal
+from PyQt6.QtGui import QColor, QPainter, QPainterPath, QPixmap, QRegion
+from PyQt6.QtWidgets import QGraphicsView
+
+from .profiling import profiler
+
+ZOOM_STEP = 1.15
+MIN_ZOOM = 0.01
+MAX_ZOOM = 100.0
+ANTIALIAS_MIN_ZOOM = 0.5  # Shapes are painted without antialiasing below this zoom
+SETTLE_MS = 150
+RENDER_SECONDS = 0.008  # Frame rendering done per event loop turn, half a 60 fps frame
+CELL_SIZE = 32  # Side of the squares frames are rendered in, in pixels
+BLOCK_CELLS = 8  # Side of the blocks stale cells are rendered by, in cells
+MAX_STALE_RECTS = 4096  # A change of more rects than this makes the whole frame stale
+OVERLAY_REFRESH_MS = 250
+OVERLAY_RECT = QRect(8, 8, 360, 40)  # viewport coordinates
+
+
+class CanvasView(QGraphicsView):
+    # Wheel zooms around the cursor and the middle button pans.
+    #
+    # The view paints the items into a frame raster kept from one paint to
+    # the next, and a paint event blits it, so a frame costs one pixmap blit
+    # however many items are visible. Only the parts of the frame that the
+    # scene reports changed are rendered again, some cells at a time and for
+    # at most RENDER_SECONDS per event loop turn; a large change, or a new
+    # zoom, refines the frame over several turns instead of stalling the
+    # window.
+    # The scene's foreground, such as the drawing preview, is painted over
+    # the frame on every paint and never cached.
+    #
+    # While the user zooms or pans the frame is moved and scaled to match and
+    # nothing is rendered. Once input settles for SETTLE_MS the frame is
+    # rendered again at the new zoom.
+    #
+    # The canvas is unbounded. The view's scene rect grows as the view moves,
+    # so a view's worth of canvas always lies beyond each edge.
+    visibleRectChanged = pyqtSignal()  # Once the view has come to rest somewhere new
+
+    def __init__(self, scene, parent=None):
+        super().__init__(scene, parent)
+        self.setRenderHint(QPainter.RenderHint.Antialiasing)
+        self.setTransformationAnchor(QGraphicsView.ViewportAnchor.AnchorUnderMouse)
+        self._pan_origin = None
+        self._interacting = False
+        self._frame = None  # The last rendered frame
+        self._frame_transform = None  # viewportTransform() the frame was rendered with
+        self._stale = set()  # (row, column) of the frame's cells still to render
+        self._pass_cells = 1  # Cells in the next rendering pass
+        self._rendering = False
+        self._settle_timer = QTimer(self)
+        self._settle_timer.setSingleShot(True)
+        self._settle_timer.setInterval(SETTLE_MS)
+        self._settle_timer.timeout.connect(self.endInteraction)
+        self._render_timer = QTimer(self)
+        self._render_timer.setInterval(0)
+        self._render_timer.timeout.connect(self.refineFrame)
+        scene.changed.connect(self.sceneChanged)
+        scene.sceneRectChanged.connect(self.ensureRoom)
+        # Performance overlay, shown while the profiler runs
+        self._overlay_timer = QTimer(self)
+        self._overlay_timer.setInterval(OVERLAY_REFRESH_MS)
+        self._overlay_timer.timeout.connect(lambda: self.viewport().update(OVERLAY_RECT))
+        self._last_frame = None  # (seconds, region rects, region size, items painted)
+        self._painted = 0  # profiler.painted at the last frame
+
+    def zoom(self):
+        return self.transform().m11()
+
+    def setZoom(self, zoom):
+        zoom = min(MAX_ZOOM, max(MIN_ZOOM, zoom))
+        if zoom != self.zoom():
+            self.beginInteraction()
+            self.scale(zoom / self.zoom(), zoom / self.zoom())
+            self.setRenderHint(QPainter.RenderHint.Antialiasing, zoom >= ANTIALIAS_MIN_ZOOM)
+            self.ensureRoom()
+
+    def wheelEvent(self, event):
+        steps = event.angleDelta().y() / 120
+        if steps:
+            self.setZoom(self.zoom() * ZOOM_STEP ** steps)
+        event.accept()
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.MouseButton.MiddleButton:
+            self.beginInteraction()
+            self._pan_origin = event.position().toPoint()
+            self.viewport().setCursor(Qt.CursorShape.ClosedHandCursor)
+            event.accept()
+        else:
+            super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        if self._pan_origin is not None:
+            position = event.position().toPoint()
+            self.panBy(position - self._pan_origin)
+            self._pan_origin = position
+            event.accept()
+        else:
+            super().mouseMoveEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        if event.button() == Qt.MouseButton.MiddleButton and self._pan_origin is not None:
+            self._pan_origin = None
+            self.viewport().unsetCursor()
+            event.accept()
+        else:
+            super().mouseReleaseEvent(event)
+
+    def panBy(self, delta):
+        self.beginInteraction()
+        self.ensureRoom()
+        self.horizontalScrollBar().setValue(self.horizontalScrollBar().value() - delta.x())
+        self.verticalScrollBar().setValue(self.verticalScrollBar().value() - delta.y())
+
+    def ensureRoom(self):
+        # Grows the view's scene rect to take in the scene's and to reach a
+        # view's size beyond every edge of the view, which stays on the same
+        # part of the canvas. The scene's own rect is left alone: Qt rebuilds
+        # its whole BSP index whenever that changes.
+        if self.scene() is None:
+            return
+        visible = self.mapToScene(self.viewport().rect()).boundingRect()
+        room = visible.adjusted(-visible.width(), -visible.height(), visible.width(), visible.height())
+        scene_rect = self.sceneRect().united(self.scene().sceneRect())
+        if not scene_rect.contains(room):
+            self.setSceneRect(scene_rect.united(room))
+            self.centerOn(visible.center())
+        elif scene_rect != self.sceneRect():
+            self.setSceneRect(scene_rect)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.ensureRoom()
+        self.visibleRectChanged.emit()
+
+    def interacting(self):
+        return self._interacting
+
+    def beginInteraction(self):
+        self._interacting = True
+        self._render_timer.stop()
+        self._settle_timer.start()
+
+    def endInteraction(self):
+        self._interacting = False
+        self.viewport().update()
+        self.visibleRectChanged.emit()
+
+    def refining(self):
+        # Whether parts of the frame are still to be rendered
+        return bool(self._stale) and not self._interacting
+
+    def sceneChanged(self, rects):
+        # Marks the cells of the frame showing rects (scene coordinates) stale.
+        # QGraphicsScene.update() with no rect reports the scene rect, though
+        # the canvas reaches beyond it.
+        if self._frame is None:
+            return
+        if len(rects) > MAX_STALE_RECTS or self.scene().sceneRect() in rects:
+            self._stale = self.frameCells()
+        else:
+            bounds = self.frameRect()
+            for rect in rects:
+                # Two pixels of slack for antialiased edges
+                stale = self._frame_transform.mapRect(rect).toAlignedRect().adjusted(-2, -2, 2, 2) & bounds
+                if not stale.isEmpty():
+                    self._stale.update((row, column)
+                                       for row in range(stale.top() // CELL_SIZE, stale.bottom() // CELL_SIZE + 1)
+                                       for column in range(stale.left() // CELL_SIZE, stale.right() // CELL_SIZE + 1))
+        if self._stale and not self._interacting:
+            self._render_timer.start()
+
+    def frameRect(self):
+        return QRect(QPoint(0, 0), self._frame.deviceIndependentSize().toSize())
+
+    def frameCells(self):
+        bounds = self.frameRect()
+        return {(row, column) for row in range(bounds.bottom() // CELL_SIZE + 1)
+                for column in range(bounds.right() // CELL_SIZE + 1)}
+
+    def startFrame(self):
+        # A new frame for the current size and zoom, starting from the last
+        # one moved and scaled to match, with everything in it stale
+        frame = QPixmap(self.viewport().size() * self.viewport().devicePixelRatio())
+        frame.setDevicePixelRatio(self.viewport().devicePixelRatio())
+        painter = QPainter(frame)
+        self.paintMovedFrame(painter)
+        painter.end()
+        self._frame = frame
+        self._frame_transform = self.viewportTransform()
+        self._stale = self.frameCells()
+
+    def renderStale(self):
+        # Renders stale cells of the frame for up to RENDER_SECONDS and returns
+        # the rects rendered. Each pass takes as many cells, a block at a time
+        # so that the pass stays compact, as the pass before says will take
+        # half that time, but at most twice as many, so that a run of empty
+        # cells does not make a pass over a crowded part overrun. A pass is
+        # QGraphicsView's own paintEvent redirected to the frame, which unlike
+        # render() skips the children of a group that lie outside the cells.
+        deadline = time.perf_counter() + RENDER_SECONDS
+        rendered = []
+        bounds = self.frameRect()
+        self._rendering = True
+        try:
+            while self._stale and time.perf_counter() < deadline:
+                cells = sorted(self._stale, key=_blockOrder)[:self._pass_cells]
+                self._stale.difference_update(cells)
+                rects = [QRect(column * CELL_SIZE, row * CELL_SIZE, CELL_SIZE, CELL_SIZE) & bounds
+                         for row, column in cells]
+                region = QRegion()
+                for rect in rects:
+                    region = region.united(rect)
+                start = time.perf_counter()
+                self.viewport().render(self._frame, region.boundingRect().topLeft(), region)
+                seconds = max(time.perf_counter() - start, 1e-6)
+                fitting = int(len(cells) * RENDER_SECONDS / 2 / seconds)
+                self._pass_cells = max(1, min(2 * len(cells), fitting))
+                rendered.extend(rects)
+        finally:
+            self._rendering = False
+        return rendered
+
+    def refineFrame(self):
+        # Renders more of the stale frame, between paints
+        if self._interacting or self._frame is None:
+            self._render_timer.stop()
+            return
+        for rect in self.renderStale():
+            self.viewport().update(rect)
+        if not self._stale:
+            self._render_timer.stop()
+
+    def showPerformanceOverlay(self, visible):
+        if visible:
+            self._overlay_timer.start()
+        else:
+            self._overlay_timer.stop()
+            self._last_frame = None
+        self.viewport().update()
+
+    def paintEvent(self, event):
+        if self._rendering:
+            # Cells of the frame, see renderStale
+            if not profiler.active:
+                super().paintEvent(event)
+                return
+            start = time.perf_counter()
+            super().paintEvent(event)
+            profiler.recordPaint(time.perf_counter() - start, self.paintedItems(event.region()))
+            return
+        if not profiler.active:
+            self.paintFrame(event)
+            return
+        start = time.perf_counter()
+        self.paintFrame(event)
+        seconds = time.perf_counter() - start
+        region = event.region()
+        if region != QRegion(OVERLAY_RECT):  # The overlay's own refresh is not a frame
+            bounds = region.boundingRect()
+            profiler.recordFrame(seconds, region.rectCount(), bounds.width() * bounds.height())
+            # Items are painted into the frame between paints, see refineFrame
+            self._last_frame = (seconds, region.rectCount(), bounds, profiler.painted - self._painted)
+            self._painted = profiler.painted
+        self.paintOverlay()
+
+    def paintedItems(self, region):
+        # The items Qt paints for region (viewport coordinates): those whose
+        # bounding rects reach into it, as QGraphicsView.paintEvent finds them
+        path = QPainterPath()
+        path.addRegion(region)
+        return [item for item in self.items(path, Qt.ItemSelectionMode.IntersectsItemBoundingRect)
+                if item.isVisible()]
+
+    def paintOverlay(self):
+        frames = profiler.frameSummary()
+        lines = [f"frame {self._last_frame[0] * 1e3:.1f} ms   p50 {frames['p50_ms']:.1f}   p99 {frames['p99_ms']:.1f}"
+                 if self._last_frame else "frame -"]
+        if self._last_frame:
+            _seconds, rects, bounds, painted = self._last_frame
+            lines.append(f"region {bounds.width()}x{bounds.height()} in {rects} rects, {painted} items painted")
+        painter = QPainter(self.viewport())
+        painter.fillRect(OVERLAY_RECT, QColor(0, 0, 0, 200))
+        painter.setPen(Qt.GlobalColor.green)
+        painter.drawText(OVERLAY_RECT.adjusted(6, 3, -6, -3), Qt.AlignmentFlag.AlignLeft, "\n".join(lines))
+        painter.end()
+
+    def paintFrame(self, event):
+        viewport = self.viewport()
+        if not self._interacting:
+            if (self._frame is None or self.frameRect() != viewport.rect()
+                    or self._frame_transform != self.viewportTransform()):
+                self.startFrame()
+            if self._stale:
+                self._render_timer.start()
+        painter = QPainter(viewport)
+        if self._interacting:
+            self.paintMovedFrame(painter)
+        else:
+            painter.drawPixmap(0, 0, self._frame)
+        painter.setTransform(self.viewportTransform())
+        self.drawForeground(painter, self.mapToScene(event.rect()).boundingRect())
+        painter.end()
+
+    def paintMovedFrame(self, painter):
+        # The last frame, moved and scaled to the view as it is now
+        painter.fillRect(self.viewport().rect(), self.scene().backgroundBrush())
+        if self._frame is None:
+            return
+        scene_rect = self._frame_transform.inverted()[0].mapRect(QRectF(self.frameRect()))
+        target = self.mapFromScene(scene_rect).boundingRect()
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform, False)
+        painter.drawPixmap(target.adjusted(0, 0, 1, 1), self._frame)
+
+    def drawForeground(self, painter, rect):
+        # Kept out of the frame, see paintFrame
+        if not self._rendering:
+            super().drawForeground(painter, rect)
+
+    def scrollContentsBy(self, dx, dy):
+        super().scrollContentsBy(dx, dy)
+        if self._interacting:
+            # The scrolled pixels came from the frame, redraw it in its new place
+            self.viewport().update()
+        else:
+            self.ensureRoom()
+            self.visibleRectChanged.emit()
+
+
+def _blockOrder(cell):
+    row, column = cell
+    return row // BLOCK_CELLS, column // BLOCK_CELLS, row, column
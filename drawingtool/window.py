@@ -0,0 +1,621 @@
+"""The main application window."""
+import os
+import time
+import uuid
+
+from PyQt6.QtCore import QLockFile, QTimer, Qt, pyqtSignal
+from PyQt6.QtGui import QIcon, QKeySequence, QShortcut
+from PyQt6.QtWidgets import (QCheckBox, QFileDialog, QGraphicsItem, QGraphicsItemGroup, QGraphicsRectItem,
+                             QHBoxLayout, QMessageBox, QPushButton, QSlider, QStatusBar, QVBoxLayout, QWidget)
+
+from .clipboard import clipboard_data, materialize, serialize, set_clipboard
+from .document import Drawing
+from .fileformats import read_drawing
+from .history import (AddItemsCommand, DefineStyleCommand, GroupCommand, MacroCommand, PropertyCommand,
+                      RemoveItemsCommand, ReplaceItemsCommand, RestyleCommand, StyleCommand)
+from .incremental import DrawingFile
+from .journal import JOURNAL_SUFFIX, Journal, orphan_journals, read_journal
+from .profiling import all_items, profiled, profiler, selected_items
+from .scene import GraphicsScene
+from .shapes import RoundedRectItem, with_corners
+from .rotation import RotationDrag
+from .tasks import FileTask, TaskRunner
+from .view import CanvasView
+
+ROTATION_FRAME_MS = 16
+STATUS_MESSAGE_MS = 5000  # How long passing news stays in the status bar
+
+
+class MainWindow(QWidget):
+    autosaveFailed = pyqtSignal(str)  # Emitted from the journal's writer thread
+
+    def __init__(self, autosave_dir=None):
+        super(MainWindow, self).__init__()
+
+
+        self.scene = GraphicsScene()
+
+        # The file being edited and the edits made since it was saved
+        self.file = DrawingFile()
+        self.scene.addEditListener(self.file.log)
+        self.task_runner = None  # The latest open, save or export
+        self.scene.edited.connect(self.updateTitle)
+        self.updateTitle()
+
+        vbox = QVBoxLayout()
+
+        open_button = QPushButton("Open", self)
+        open_button.clicked.connect(self.open_file)
+        vbox.addWidget(open_button)
+
+        save_button = QPushButton("Save", self)
+        save_button.clicked.connect(self.save)
+        vbox.addWidget(save_button)
+        QShortcut(QKeySequence.StandardKey.Save, self, self.save)
+
+        saveActionTxt = QPushButton("Save as .txt", self)
+        vbox.addWidget(saveActionTxt)
+        saveActionTxt.clicked.connect(self.save_as_txt)
+
+        saveActionPng = QPushButton("Save as .png", self)
+        vbox.addWidget(saveActionPng)
+        saveActionPng.clicked.connect(self.save_as_png)
+
+        save_action_svg = QPushButton("Save as .svg", self)
+        save_action_svg.clicked.connect(self.save_as_svg)
+        vbox.addWidget(save_action_svg)
+
+        save_action_pdf = QPushButton("Save as .pdf", self)
+        save_action_pdf.clicked.connect(self.save_as_pdf)
+        vbox.addWidget(save_action_pdf)
+
+        save_action_xml = QPushButton("Save as .xml", self)
+        save_action_xml.clicked.connect(self.save_as_xml)
+        vbox.addWidget(save_action_xml)
+
+        save_action_binary = QPushButton("Save as .drwb", self)
+        save_action_binary.clicked.connect(self.save_as_binary)
+        vbox.addWidget(save_action_binary)
+
+        line_button = QPushButton(QIcon("line_icon.png"), "Line", self)
+        line_button.clicked.connect(lambda: self.setDrawingShape("Line"))
+        vbox.addWidget(line_button)
+
+        rectangle_button = QPushButton(QIcon("rectangle_icon.png"), "Rectangle", self)
+        rectangle_button.clicked.connect(lambda: self.setDrawingShape("Rectangle"))
+        vbox.addWidget(rectangle_button)
+
+        # ellipse_button = QPushButton(QIcon("ellipse_icon.png"), "Ellipse", self)
+        # ellipse_button.clicked.connect(lambda: self.setDrawingShape("Ellipse"))
+        # vbox.addWidget(ellipse_button)
+
+        move_button = QPushButton(QIcon("move_icon.png"), "Select", self)
+        move_button.clicked.connect(lambda: self.setDrawingShape(None))
+        vbox.addWidget(move_button)
+
+        up = QPushButton("Bring To Front")
+        up.clicked.connect(self.up)
+        vbox.addWidget(up)
+
+        down = QPushButton("Send To Back")
+        down.clicked.connect(self.down)
+        vbox.addWidget(down)
+
+        group_button = QPushButton("Group")
+        group_button.clicked.connect(self.groupSelectedShapes)
+        vbox.addWidget(group_button)
+
+        ungroup_button = QPushButton("Ungroup")
+        ungroup_button.clicked.connect(self.ungroupSelectedShapes)
+        vbox.addWidget(ungroup_button)
+
+
+        ungroupall_button = QPushButton("Ungroup All")
+        ungroupall_button.clicked.connect(self.ungroupAllSelectedShapes)
+        vbox.addWidget(ungroupall_button)
+
+        self.rotate_slider = QSlider(Qt.Orientation.Horizontal)
+        self.rotate_slider.setRange(0, 360)
+        self.rotate_slider.valueChanged.connect(self.rotate)
+        self.rotate_slider.sliderPressed.connect(self.beginRotation)
+        self.rotate_slider.sliderReleased.connect(self.endRotation)
+        vbox.addWidget(self.rotate_slider)
+
+        self.rotate_centre = QCheckBox("Rotate around centre")
+        vbox.addWidget(self.rotate_centre)
+
+        # Slider values are applied at most once per frame, latest value wins
+        self.rotation = None
+        self.rotation_timer = QTimer(self)
+        self.rotation_timer.setSingleShot(True)
+        self.rotation_timer.setInterval(ROTATION_FRAME_MS)
+        self.rotation_timer.timeout.connect(self.applyRotation)
+
+        copy_button = QPushButton("Copy")
+        copy_button.clicked.connect(self.copySelectedShape)
+        vbox.addWidget(copy_button)
+        QShortcut(QKeySequence.StandardKey.Copy, self, self.copyToClipboard)
+
+        paste_button = QPushButton("Paste")
+        paste_button.clicked.connect(self.pasteShapes)
+        vbox.addWidget(paste_button)
+        QShortcut(QKeySequence.StandardKey.Paste, self, self.pasteShapes)
+
+        delete_button = QPushButton("Delete")
+        delete_button.clicked.connect(self.deleteSelectedShape)
+        vbox.addWidget(delete_button)
+
+        edit_button = QPushButton("Edit")
+        edit_button.clicked.connect(self.edit)
+        vbox.addWidget(edit_button)
+
+        styles_button = QPushButton("Styles")
+        styles_button.clicked.connect(self.editStyles)
+        vbox.addWidget(styles_button)
+
+        undo_button = QPushButton("Undo")
+        undo_button.clicked.connect(self.undo)
+        vbox.addWidget(undo_button)
+        QShortcut(QKeySequence.StandardKey.Undo, self, self.undo)
+
+        redo_button = QPushButton("Redo")
+        redo_button.clicked.connect(self.redo)
+        vbox.addWidget(redo_button)
+        QShortcut(QKeySequence.StandardKey.Redo, self, self.redo)
+
+        self.view = CanvasView(self.scene)
+        self.view.visibleRectChanged.connect(self.scene.viewChanged)
+
+        hbox = QHBoxLayout()
+        hbox.addLayout(vbox)
+        hbox.addWidget(self.view)
+
+        self.status_bar = QStatusBar(self)
+        layout = QVBoxLayout(self)
+        layout.addLayout(hbox)
+        layout.addWidget(self.status_bar)
+
+        # Profiling: F12 toggles the figures and overlay, Shift+F12 dumps them,
+        # Ctrl+F12 toggles cProfile
+        QShortcut(QKeySequence(Qt.Key.Key_F12), self, lambda: self.setProfiling(not profiler.active))
+        QShortcut(QKeySequence(Qt.Modifier.SHIFT | Qt.Key.Key_F12), self, self.dumpProfile)
+        QShortcut(QKeySequence(Qt.Modifier.CTRL | Qt.Key.Key_F12), self, self.toggleCProfile)
+
+        # Autosave journal, only when given somewhere to keep it
+        self.journal = None
+        self.journal_lock = None
+        self.recoverable = []
+        self.autosaveFailed.connect(self.showAutosaveError)
+        if autosave_dir:
+            self.startAutosave(autosave_dir)
+
+    def startAutosave(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.recoverable = orphan_journals(directory)
+        path = os.path.join(directory, f"autosave-{uuid.uuid4().hex}{JOURNAL_SUFFIX}")
+        self.journal_lock = QLockFile(path + ".lock")
+        self.journal_lock.tryLock(0)
+        self.journal = Journal(path, on_error=lambda error: self.autosaveFailed.emit(str(error)))
+        self.scene.addEditListener(self.journal)
+
+    def showAutosaveError(self, message):
+        # Stays up: edits from here on may not be recoverable
+        self.status_bar.showMessage(f"Autosave failed: {message}")
+
+    def recoverAutosave(self):
+        # Offers to bring back the newest drawing left by an editor that did
+        # not close normally. Older leftovers are kept for another time.
+        if not self.recoverable:
+            return
+        (path, lock), others = self.recoverable[0], self.recoverable[1:]
+        self.recoverable = []
+        for _path, other_lock in others:
+            other_lock.unlock()
+        reply = QMessageBox.question(self, "Recover Drawing",
+                                     "The last drawing was not saved before the editor closed. Recover it?",
+                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                                     QMessageBox.StandardButton.Yes)
+        if reply == QMessageBox.StandardButton.Yes:
+            try:
+                drawing = read_journal(path)
+                self.scene.clear()
+                self.journal.reset(drawing, self.scene.loadDrawing(drawing))
+                self.unsaved_changes = True
+            except (OSError, ValueError) as e:
+                QMessageBox.warning(self, "Error recovering drawing", str(e))
+                lock.unlock()
+                return
+        os.remove(path)
+        lock.unlock()
+
+    @profiled()
+    def open_file(self):
+        # Reads the file on a worker thread, then adds its shapes to the scene
+        # in batches. The current drawing stays until the file has been read;
+        # cancelled while the shapes are being added, the canvas is left empty.
+        file_path, _ = QFileDialog.getOpenFileName(self, "Open Drawing", "", "Drawings (*.txt *.xml *.drwb);;Text Files (*.txt);;XML Files (*.xml);;Binary Drawings (*.drwb)")
+        if file_path:
+            def build(drawing):
+                self.scene.clear()
+                try:
+                    entries = yield from self.scene.loadSteps(drawing)
+                except BaseException:
+                    self.scene.clear()
+                    self.file.forget()
+                    if self.journal is not None:
+                        self.journal.reset(Drawing(), [])
+                    self.unsaved_changes = False
+                    raise
+                self.file.opened(file_path, entries)
+                if self.journal is not None:
+                    self.journal.reset(drawing, entries)
+                self.unsaved_changes = False
+                return drawing
+
+            return self.run_task(FileTask(lambda task: read_drawing(file_path, task.report), build),
+                                 "Opening drawing...", "Error opening file")
+
+    @profiled(items=lambda result: result["shapes"], after=True)
+    def load_file(self, file_path, parse_progress=None, build_progress=None):
+        # Reads a whole .txt, .xml or .drwb drawing into the scene and returns load
+        # statistics. A drawing too large for the scene's memory budget is paged.
+        start = time.perf_counter()
+        drawing = read_drawing(file_path, parse_progress)
+        parsed = time.perf_counter()
+        self.scene.clear()
+        entries = self.scene.loadDrawing(drawing, build_progress)
+        self.file.opened(file_path, entries)
+        if self.journal is not None:
+            self.journal.reset(drawing, entries)
+        self.unsaved_changes = False
+        finished = time.perf_counter()
+        return {
+            "shapes": len(drawing),
+            "parse_seconds": parsed - start,
+            "build_seconds": finished - parsed,
+            "seconds": finished - start,
+            "shapes_per_second": len(drawing) / (finished - start) if finished > start else 0.0,
+        }
+
+    def closeEvent(self, event):
+        if self.task_runner is not None and not self.task_runner.done():
+            # Cancel it from its progress dialog first
+            event.ignore()
+            return
+        if self.unsaved_changes:
+            reply = QMessageBox.question(self, "Unsaved Changes",
+                                        "There are unsaved changes. Do you want to exit?",
+                                        QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                                        QMessageBox.StandardButton.No)
+            if reply == QMessageBox.StandardButton.Yes:
+                event.accept()
+            else:
+                event.ignore()
+        else:
+            event.accept()
+        if event.isAccepted():
+            self.stopAutosave()
+
+    def stopAutosave(self):
+        # The drawing was saved or deliberately abandoned, the journal goes
+        if self.journal is not None:
+            self.scene.removeEditListener(self.journal)
+            self.journal.close(discard=True)
+            self.journal = None
+            self.journal_lock.unlock()
+
+    def setProfiling(self, enabled):
+        if enabled:
+            profiler.start()
+        else:
+            profiler.stop()
+        self.view.showPerformanceOverlay(enabled)
+
+    def toggleCProfile(self):
+        if profiler.cProfiling():
+            profiler.stopCProfile()
+        else:
+            profiler.startCProfile()
+
+    def dumpProfile(self):
+        # Writes the figures, and the cProfile stats if it runs, next to each
+        # other in the working directory
+        base = time.strftime("drawingtool-profile-%Y%m%d-%H%M%S")
+        try:
+            profiler.dump(base + ".json")
+            if profiler.cProfiling():
+                profiler.dump(base + ".prof")
+            self.status_bar.showMessage(f"Profile written to {base}.*", STATUS_MESSAGE_MS)
+        except Exception as e:
+            QMessageBox.warning(self, "Error writing profile", str(e))
+
+    @property
+    def unsaved_changes(self):
+        return not self.scene.history.isClean()
+
+    @unsaved_changes.setter
+    def unsaved_changes(self, value):
+        self.scene.history.setClean(not value)
+        self.updateTitle()
+
+    def set_unsaved_changes(self, value=True):
+        self.unsaved_changes = value
+
+    def updateTitle(self):
+        name = os.path.basename(self.file.path) if self.file.path else "Untitled"
+        self.setWindowTitle(f"{name}[*] - Drawing App")
+        self.setWindowModified(self.unsaved_changes)
+
+    @profiled(items=all_items)
+    def save(self):
+        # Saves back to the file being edited; a .drwb file only gets the
+        # edits made since it was last saved
+        if self.file.path is None:
+            return self.save_as_binary()
+        else:
+            return self.save_file(self.file.path)
+
+    @profiled(items=all_items)
+    def save_file(self, file_path, extension=None):
+        # The drawing is taken from the scene here; formatting and writing it
+        # happen on a worker thread
+        try:
+            write = self.file.prepareSave(self.scene, file_path, extension)
+        except Exception as e:
+            QMessageBox.warning(self, "Error saving file", str(e))
+            return None
+
+        def saved(_appended):
+            self.unsaved_changes = False
+        return self.run_task(FileTask(lambda task: write(task.report)), "Saving drawing...", "Error saving file",
+                             saved)
+
+    @profiled(items=all_items)
+    def save_as_txt(self):
+        file_path, _ = QFileDialog.getSaveFileName(self, "Save Drawing", "", "Text Files (*.txt)")
+        if file_path:
+            return self.save_file(file_path, ".txt")
+
+    @profiled(items=all_items)
+    def save_as_xml(self):
+        file_path, _ = QFileDialog.getSaveFileName(self, "Save Drawing", "", "XML Files (*.xml)")
+        if file_path:
+            return self.save_file(file_path, ".xml")
+
+    @profiled(items=all_items)
+    def save_as_binary(self):
+        file_path, _ = QFileDialog.getSaveFileName(self, "Save Drawing", "", "Binary Drawings (*.drwb)")
+        if file_path:
+            return self.save_file(file_path, ".drwb")
+
+    @profiled(items=all_items)
+    def save_as_png(self):
+        file_path, _ = QFileDialog.getSaveFileName(self, "Save Drawing", "", "PNG Files (*.png)")
+        if file_path:
+            from .pngexport import PngExport
+
+            # Only shapes that reach into the exported region are converted
+            source_rect = self.scene.contentRect()
+            return self.run_task(PngExport(self.scene.drawingInRect(source_rect), file_path, source_rect),
+                                 "Exporting drawing...", "Error exporting drawing")
+
+    @profiled(items=all_items)
+    def save_as_svg(self):
+        file_path, _ = QFileDialog.getSaveFileName(self, "Save Drawing", "", "SVG Files (*.svg)")
+        if file_path:
+            from .vectorexport import SvgExport
+
+            source_rect = self.scene.contentRect()
+            return self.run_task(SvgExport(self.scene.drawingInRect(source_rect), file_path, source_rect),
+                                 "Exporting drawing...", "Error exporting drawing")
+
+    @profiled(items=all_items)
+    def save_as_pdf(self):
+        file_path, _ = QFileDialog.getSaveFileName(self, "Save Drawing", "", "PDF Files (*.pdf)")
+        if file_path:
+            from .vectorexport import PdfExport
+
+            source_rect = self.scene.contentRect()
+            return self.run_task(PdfExport(self.scene.drawingInRect(source_rect), file_path, source_rect),
+                                 "Exporting drawing...", "Error exporting drawing")
+
+    def run_task(self, task, label, failure, finished=None):
+        # Runs a FileTask or an export (see tasks.py) while a progress dialog,
+        # which can cancel it, keeps the window responsive. Returns the
+        # TaskRunner.
+        self.task_runner = TaskRunner(self, task, label, failure, finished).start()
+        return self.task_runner
+
+    @profiled(items=selected_items)
+    def up(self):
+        items = self.scene.selectedItems()
+        if items:
+            z = [item.zValue() for item in items]
+            self.scene.history.push(PropertyCommand(items, "setZValue", z, [value + 1 for value in z]))
+
+    @profiled(items=selected_items)
+    def down(self):
+        items = self.scene.selectedItems()
+        if items:
+            z = [item.zValue() for item in items]
+            self.scene.history.push(PropertyCommand(items, "setZValue", z, [value - 1 for value in z]))
+
+    @profiled(items=selected_items)
+    def rotate(self, value):
+        if not self.rotation_timer.isActive():
+            self.rotation_timer.start()
+
+    @profiled(items=selected_items)
+    def beginRotation(self):
+        items = self.scene.selectedItems()
+        if items:
+            self.rotation = RotationDrag(self.scene, items, self.rotate_slider.value(), self.rotate_centre.isChecked())
+
+    @profiled(items=selected_items)
+    def applyRotation(self):
+        if self.rotation is not None:
+            self.rotation.setValue(self.rotate_slider.value())
+        elif not self.rotate_slider.isSliderDown():
+            # Keyboard and wheel steps outside a drag, consecutive steps on the
+            # same selection merge into one undo step
+            items = self.scene.selectedItems()
+            if items:
+                value = float(self.rotate_slider.value())
+                self.scene.history.push(PropertyCommand(items, "setRotation", [item.rotation() for item in items],
+                                                        [value] * len(items), mergeable=True))
+
+    @profiled(items=selected_items)
+    def endRotation(self):
+        self.rotation_timer.stop()
+        if self.rotation is not None:
+            self.rotation.setValue(self.rotate_slider.value())
+            command = self.rotation.commit()
+            self.rotation = None
+            if command is not None:
+                self.scene.history.push(command, apply=False)
+
+    @profiled(items=selected_items)
+    def undo(self):
+        if self.scene.history.canUndo():
+            self.scene.history.undo()
+
+    @profiled(items=selected_items)
+    def redo(self):
+        if self.scene.history.canRedo():
+            self.scene.history.redo()
+
+    @profiled(items=selected_items)
+    def setDrawingShape(self, shape):
+        self.scene.drawingShape = shape
+
+
+    @profiled(items=selected_items)
+    def copySelectedShape(self):
+        # Duplicates the selection through the clipboard buffer
+        items = self.scene.selectedItems()
+        if items:
+            data = serialize(items)
+            set_clipboard(data)
+            self.pasteData(data)
+
+    @profiled(items=selected_items)
+    def copyToClipboard(self):
+        items = self.scene.selectedItems()
+        if items:
+            set_clipboard(serialize(items))
+
+    @profiled(items=selected_items)
+    def pasteShapes(self):
+        data = clipboard_data()
+        if data:
+            try:
+                self.pasteData(data)
+            except ValueError as e:
+                QMessageBox.warning(self, "Error pasting shapes", str(e))
+
+    @profiled()
+    def pasteData(self, data):
+        self.scene.history.push(AddItemsCommand(self.scene, materialize(data, styles=self.scene.styles)))
+
+    @profiled(items=selected_items)
+    def deleteSelectedShape(self):
+        items = self.scene.selectedItems()
+        if items:
+            self.scene.history.push(RemoveItemsCommand(self.scene, items))
+
+
+    @profiled(items=selected_items)
+    def groupSelectedShapes(self):
+        items = self.scene.selectedItems()
+        if len(items) > 1:
+            self.scene.history.push(GroupCommand(self.scene, items))
+
+    @profiled(items=selected_items)
+    def ungroupSelectedShapes(self):
+        groups = [item for item in self.scene.selectedItems() if isinstance(item, QGraphicsItemGroup)]
+        if groups:
+            self.scene.history.push(GroupCommand(self.scene, groups, ungroup=True))
+
+    @profiled(items=selected_items)
+    def ungroupAllSelectedShapes(self):
+        groups = [item for item in self.scene.selectedItems() if isinstance(item, QGraphicsItemGroup)]
+        if groups:
+            self.scene.history.push(GroupCommand(self.scene, groups, ungroup=True, recursive=True))
+
+    def editStyles(self):
+        from .dialogs import StyleDialog
+
+        StyleDialog(self).exec()
+
+    def defineStyle(self, style):
+        self.scene.history.push(DefineStyleCommand(self.scene.styles, style))
+
+    @profiled()
+    def restyle(self, style, mergeable=False):
+        # Redefines a style, and every shape using it, as one undo step
+        old_style = self.scene.styles.get(style.name)
+        if style != old_style:
+            self.scene.history.push(RestyleCommand(self.scene.styles, old_style, style, mergeable))
+
+    @profiled(items=selected_items)
+    def applyStyle(self, name):
+        styles = self.scene.styles
+        style = styles.get(name)
+        items = [item for item in self.scene.selectedItems() if not isinstance(item, QGraphicsItemGroup)]
+        if style is not None and items:
+            old_looks = [(styles.styleOf(item), item.pen()) for item in items]
+            self.scene.history.push(StyleCommand(styles, items, old_looks, [(style, None)] * len(items)))
+
+    @profiled(items=selected_items)
+    def edit(self):
+        items = self.scene.selectedItems()
+        if not items:
+            QMessageBox.warning(self, "No Selection", "No item selected.")
+            return
+
+        for item in items:
+            if isinstance(item, QGraphicsItemGroup):
+                QMessageBox.warning(self, "Group Object(s) Selected", "Group Object(s) Selected")
+                return
+
+        from .dialogs import EditDialog
+
+        dialog = EditDialog(self)
+        styles = self.scene.styles
+        old_looks = [(styles.styleOf(item), item.pen()) for item in items]
+        defined = {style.name for style in styles}
+        dialog.exec()
+
+        # The colour dialog has already repainted the items; the look changes
+        # and corner swaps are recorded together as one undo step.
+        look_items, new_looks, changed_looks = [], [], []
+        old_items, new_items = [], []
+        for item, old_look in zip(items, old_looks):
+            if item.isSelected():
+                style, pen = look = (styles.styleOf(item), item.pen())
+                if look != old_look:
+                    look_items.append(item)
+                    changed_looks.append(old_look)
+                    new_looks.append(look)
+
+                replacement = None
+                if isinstance(item, QGraphicsRectItem) and dialog.corner_style:
+                    if dialog.corner_style == "Curved":
+                        replacement = with_corners(item, curved=True)
+                    elif dialog.corner_style == "Sharp" and isinstance(item, RoundedRectItem):
+                        replacement = with_corners(item, curved=False)
+                if replacement is not None:
+                    replacement.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsMovable)
+                    replacement.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsSelectable)
+                    styles.assign(replacement, style, pen)
+                    old_items.append(item)
+                    new_items.append(replacement)
+
+        # Styles the dialog made for recoloured items are defined in the same step
+        commands = [DefineStyleCommand(styles, style) for style in styles if style.name not in defined]
+        if look_items:
+            commands.append(StyleCommand(styles, look_items, changed_looks, new_looks))
+        if old_items:
+            commands.append(ReplaceItemsCommand(self.scene, old_items, new_items))
+        if commands:
+            self.scene.history.push(MacroCommand(commands))
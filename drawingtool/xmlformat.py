@@ -0,0 +1,111 @@
+"""Streaming reader and writer for the .xml drawing format.
+
+    <drawing>
+      <line><begin><x/><y/></begin><end><x/><y/></end><color/></line>
+      <rectangle><upper-left><x/><y/></upper-left><lower-right><x/><y/></lower-right><color/><corner/></rectangle>
+      <group>...</group>
+    </drawing>
+
+A record with a transform (see document.py) has a <transform> holding its six
+numbers, "m11 m12 m21 m22 dx dy", as the last child of a line or rectangle
+and the first child of a group.
+
+The writer emits elements as it walks the Drawing instead of building an
+ElementTree first. The reader uses ET.iterparse and drops every element once
+it has been turned into a record, so neither side holds the document tree.
+"""
+import os
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape
+
+from .document import Drawing, LINE, RECTANGLE, SHARP, CURVED, NO_TRANSFORM
+
+BATCH_SIZE = 4096
+
+
+def write_xml(drawing, file, batch_size=BATCH_SIZE, progress=None):
+    # file must be opened in text mode with utf-8 encoding. progress, if
+    # given, is called as progress(records_written, total_records) after
+    # every batch.
+    palette = [escape(name) for name in drawing.palette]
+    corners = ("square", "rounded")
+    open_groups = []
+    file.write("<?xml version='1.0' encoding='utf-8'?>\n<drawing>")
+    for start in range(0, len(drawing), batch_size):
+        stop = start + batch_size
+        batch = []
+        records = zip(range(start, stop), drawing.kind[start:stop],
+                      map(repr, drawing.x1[start:stop]), map(repr, drawing.y1[start:stop]),
+                      map(repr, drawing.x2[start:stop]), map(repr, drawing.y2[start:stop]),
+                      drawing.color[start:stop], drawing.corner[start:stop], drawing.parent[start:stop],
+                      drawing.transform[start:stop])
+        for index, kind, x1, y1, x2, y2, color, corner, parent, transform in records:
+            while open_groups and parent != open_groups[-1]:
+                open_groups.pop()
+                batch.append("</group>")
+            matrix = ""
+            if transform != NO_TRANSFORM:
+                matrix = "<transform>" + " ".join(map(repr, drawing.matrix(index))) + "</transform>"
+            if kind == LINE:
+                batch.append(f"<line><begin><x>{x1}</x><y>{y1}</y></begin><end><x>{x2}</x><y>{y2}</y></end>"
+                             f"<color>{palette[color]}</color>{matrix}</line>")
+            elif kind == RECTANGLE:
+                batch.append(f"<rectangle><upper-left><x>{x1}</x><y>{y1}</y></upper-left>"
+                             f"<lower-right><x>{x2}</x><y>{y2}</y></lower-right>"
+                             f"<color>{palette[color]}</color><corner>{corners[corner]}</corner>{matrix}</rectangle>")
+            else:
+                batch.append("<group>" + matrix)
+                open_groups.append(index)
+        file.write("".join(batch))
+        if progress:
+            progress(min(stop, len(drawing)), len(drawing))
+    file.write("</group>" * len(open_groups))
+    file.write("</drawing>")
+
+
+def read_xml(file, progress=None):
+    # file is a binary file object. progress, if given, is called as
+    # progress(bytes_read, total_bytes) every BATCH_SIZE shapes.
+    try:
+        total = os.fstat(file.fileno()).st_size
+    except (AttributeError, OSError):
+        total = 0
+    drawing = Drawing()
+    elements = []  # open elements, the <drawing> root first
+    groups = [-1]
+    for event, element in ET.iterparse(file, events=("start", "end")):
+        tag = element.tag
+        if event == "start":
+            elements.append(element)
+            if tag == "group":
+                groups.append(drawing.add_group(parent=groups[-1]))
+            continue
+
+        elements.pop()
+        if tag == "line":
+            drawing.add_line(float(element.findtext("begin/x")), float(element.findtext("begin/y")),
+                             float(element.findtext("end/x")), float(element.findtext("end/y")),
+                             element.findtext("color"), parent=groups[-1], matrix=_matrix(element))
+        elif tag == "rectangle":
+            corner = CURVED if element.findtext("corner") == "rounded" else SHARP
+            drawing.add_rect(float(element.findtext("upper-left/x")), float(element.findtext("upper-left/y")),
+                             float(element.findtext("lower-right/x")), float(element.findtext("lower-right/y")),
+                             element.findtext("color"), corner, parent=groups[-1], matrix=_matrix(element))
+        elif tag == "group":
+            groups.pop()
+        elif tag == "transform" and elements[-1].tag == "group":
+            drawing.transform[groups[-1]] = drawing.transform_id(tuple(map(float, element.text.split())))
+        else:
+            continue
+        # The parser reads ahead, so later siblings may already be attached;
+        # remove this element itself rather than the parent's last child
+        elements[-1].remove(element)
+        if progress and len(drawing) % BATCH_SIZE == 0:
+            done = file.tell()
+            progress(done, max(total, done))
+    return drawing
+
+
+def _matrix(element):
+    text = element.findtext("transform")
+    return tuple(map(float, text.split())) if text is not None else None
@@ -0,0 +1,84 @@
+"""Grouping and ungrouping keep shapes in place, in order, and undo exactly.
+
+    python -m pytest tests
+"""
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pytest
+from PyQt6.QtCore import QLineF, QRectF
+from PyQt6.QtWidgets import QApplication, QGraphicsItemGroup, QGraphicsLineItem
+
+from drawingtool.history import GroupCommand
+from drawingtool.scene import GraphicsScene
+from drawingtool.shapes import RoundedRectItem
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication(["tests"])
+
+
+def shapes_scene(count=6):
+    scene = GraphicsScene()
+    items = []
+    for index in range(count):
+        if index % 2:
+            item = QGraphicsLineItem(QLineF(30 * index, 0, 30 * index + 20, 40))
+        else:
+            item = RoundedRectItem(QRectF(30 * index, 50, 20, 20))
+        scene.addItem(item)
+        scene.items_to_save.add(item)
+        items.append(item)
+    return scene, items
+
+
+def places(items):
+    return [item.sceneBoundingRect() for item in items]
+
+
+def test_group_and_ungroup_keep_places(app):
+    scene, items = shapes_scene()
+    expected = places(items)
+    command = GroupCommand(scene, items[1:4])
+    scene.history.push(command)
+    (group, children), = command.steps
+    assert list(scene.items_to_save) == [items[0], items[4], items[5], group]
+    assert all(item.parentItem() is group for item in children)
+    scene.history.push(GroupCommand(scene, [group], ungroup=True))
+    assert all(item.parentItem() is None for item in children)
+    assert places(items) == expected
+    assert group.scene() is None
+    assert len(scene.items_to_save) == len(items)
+
+
+def test_undo_and_redo_reuse_the_group(app):
+    scene, items = shapes_scene()
+    command = GroupCommand(scene, items[:3])
+    scene.history.push(command)
+    group = command.steps[0][0]
+    scene.history.undo()
+    assert group.scene() is None
+    assert all(item in scene.items_to_save for item in items)
+    scene.history.redo()
+    assert group.scene() is scene
+    assert [item.parentItem() for item in items[:3]] == [group] * 3
+    assert command.steps[0][0] is group
+
+
+def test_recursive_ungroup_takes_nested_groups_apart(app):
+    scene, items = shapes_scene()
+    inner = scene.groupItems(items[:2])
+    outer = scene.groupItems([inner, items[2]])
+    outer.setRotation(30)
+    expected = places(items[:3])
+    scene.history.push(GroupCommand(scene, [outer], ungroup=True, recursive=True))
+    assert not [item for item in scene.items() if isinstance(item, QGraphicsItemGroup)]
+    assert all(item in scene.items_to_save for item in items)
+    for rect, other in zip(places(items[:3]), expected):
+        assert rect.x() == pytest.approx(other.x())
+        assert rect.y() == pytest.approx(other.y())
+    scene.history.undo()
+    assert items[0].parentItem() is inner and inner.parentItem() is outer
+    assert list(scene.items_to_save) == [items[3], items[4], items[5], outer]
@@ -0,0 +1,101 @@
+"""Undo history: the memory cap and the clean mark behind the modified title.
+
+    python -m pytest tests
+"""
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pytest
+from PyQt6.QtCore import QRectF
+from PyQt6.QtWidgets import QApplication
+
+from drawingtool.history import ITEM_COST, AddItemsCommand
+from drawingtool.scene import GraphicsScene
+from drawingtool.shapes import RoundedRectItem
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication(["tests"])
+
+
+def add_shapes(scene, count):
+    for index in range(count):
+        item = RoundedRectItem(QRectF(10 * index, 0, 8, 8))
+        scene.history.push(AddItemsCommand(scene, [item]))
+
+
+def test_trimmed_history_is_never_clean_again(app):
+    scene = GraphicsScene()
+    scene.history.setMemoryLimit(3 * ITEM_COST - 1)
+    add_shapes(scene, 5)
+    while scene.history.canUndo():
+        scene.history.undo()
+    assert len(scene.items_to_save) == 3
+    assert not scene.history.isClean()
+
+
+def test_trim_keeps_a_saved_state_still_on_the_stack(app):
+    scene = GraphicsScene()
+    scene.history.setMemoryLimit(3 * ITEM_COST)
+    add_shapes(scene, 4)
+    scene.history.setClean()
+    add_shapes(scene, 1)
+    scene.history.undo()
+    assert scene.history.isClean()
+
+
+def test_undo_to_the_saved_state_is_clean(app):
+    scene = GraphicsScene()
+    add_shapes(scene, 2)
+    scene.history.setClean()
+    add_shapes(scene, 1)
+    assert not scene.history.isClean()
+    scene.history.undo()
+    assert scene.history.isClean()
+    scene.history.undo()
+    assert not scene.history.isClean()
+    scene.history.redo()
+    assert scene.history.isClean()
+
+
+def test_new_step_after_undo_leaves_the_saved_state_behind(app):
+    scene = GraphicsScene()
+    add_shapes(scene, 2)
+    scene.history.setClean()
+    scene.history.undo()
+    add_shapes(scene, 1)
+    assert not scene.history.canRedo()
+    assert not scene.history.isClean()
+
+
+def test_modified_outside_the_history_stays_modified(app):
+    scene = GraphicsScene()
+    scene.history.setClean(False)
+    add_shapes(scene, 1)
+    scene.history.undo()
+    assert not scene.history.isClean()
+
+
+def test_memory_usage_follows_the_steps_held(app):
+    scene = GraphicsScene()
+    add_shapes(scene, 3)
+    assert scene.history.memoryUsage() == 3 * ITEM_COST
+    scene.history.undo()
+    scene.history.undo()
+    add_shapes(scene, 1)
+    assert scene.history.memoryUsage() == 2 * ITEM_COST
+    scene.history.setMemoryLimit(ITEM_COST)
+    assert len(scene.history) == 1
+    assert scene.history.memoryUsage() == ITEM_COST
+
+
+def test_newest_step_is_kept_whatever_its_size(app):
+    scene = GraphicsScene()
+    scene.history.setMemoryLimit(ITEM_COST)
+    items = [RoundedRectItem(QRectF(10 * index, 0, 8, 8)) for index in range(4)]
+    scene.history.push(AddItemsCommand(scene, items))
+    assert len(scene.history) == 1
+    scene.history.undo()
+    assert len(scene.items_to_save) == 0
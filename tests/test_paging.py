@@ -0,0 +1,126 @@
+"""A drawing over the memory budget keeps its count of resident shapes right,
+and pages chunks out, with their edits, once the views leave them.
+
+    python -m pytest tests
+"""
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pytest
+from PyQt6.QtCore import QPointF, QRectF
+from PyQt6.QtWidgets import QApplication, QGraphicsItemGroup, QGraphicsView
+
+from drawingtool.document import Drawing
+from drawingtool.history import GroupCommand, PropertyCommand
+from drawingtool.paging import ITEM_BYTES
+from drawingtool.scene import GraphicsScene
+from drawingtool.shapes import RoundedRectItem
+
+GROUPS = 10
+GROUP_SHAPES = 4
+SPREAD_SHAPES = 10_000
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication(["tests"])
+
+
+def grouped_drawing():
+    scene = GraphicsScene()
+    for group in range(GROUPS):
+        items = []
+        for index in range(GROUP_SHAPES):
+            item = RoundedRectItem(QRectF(100 * index, 100 * group, 80, 80))
+            scene.addItem(item)
+            scene.items_to_save.add(item)
+            items.append(item)
+        scene.groupItems(items)
+    return scene.drawing()
+
+
+def paged_scene():
+    drawing = grouped_drawing()
+    scene = GraphicsScene(memory_budget=(len(drawing) - 1) * ITEM_BYTES)
+    scene.loadDrawing(drawing)
+    assert scene.pager is not None
+    view = QGraphicsView(scene)
+    view.resize(400, 400)
+    view.fitInView(scene.pager.contentRect())
+    scene.pager.update()
+    return scene, view
+
+
+def assert_counted(scene):
+    # Every shape in the scene, groups included, is a resident record
+    assert scene.pager.residentShapes() == len(scene.items())
+
+
+def test_ungroup_keeps_resident_count(app):
+    scene, view = paged_scene()
+    assert_counted(scene)
+    groups = [item for item in scene.items_to_save if isinstance(item, QGraphicsItemGroup)]
+    assert groups
+    scene.history.push(GroupCommand(scene, groups[:3], ungroup=True))
+    assert_counted(scene)
+    for _ in range(3):
+        scene.history.undo()
+        assert_counted(scene)
+        scene.history.redo()
+        assert_counted(scene)
+
+
+def test_group_keeps_resident_count(app):
+    scene, view = paged_scene()
+    groups = [item for item in scene.items_to_save if isinstance(item, QGraphicsItemGroup)]
+    scene.history.push(GroupCommand(scene, groups[:2]))
+    assert_counted(scene)
+    scene.history.undo()
+    assert_counted(scene)
+
+
+def spread_scene():
+    # Shapes on a grid far wider than a chunk, over budget by about half
+    drawing = Drawing()
+    for index in range(SPREAD_SHAPES):
+        x, y = 100.0 * (index % 100), 100.0 * (index // 100)
+        drawing.add_rect(x, y, x + 60.0, y + 60.0, "#ffffff")
+    scene = GraphicsScene(memory_budget=SPREAD_SHAPES // 2 * ITEM_BYTES)
+    scene.loadDrawing(drawing)
+    view = QGraphicsView(scene)
+    view.resize(200, 200)
+    view.show()
+    return scene, view
+
+
+def look_at(scene, view, x, y):
+    view.centerOn(x, y)
+    scene.pager.update()
+
+
+def test_panning_evicts_chunks_out_of_range(app):
+    scene, view = spread_scene()
+    look_at(scene, view, 0, 0)
+    near = [item for item in scene.items_to_save if item.sceneBoundingRect().left() < 500]
+    assert near
+    look_at(scene, view, 9900, 9900)
+    assert_counted(scene)
+    assert scene.pager.residentShapes() <= SPREAD_SHAPES // 2
+    assert not any(item.scene() is scene for item in near)
+    assert len(scene.drawing()) == SPREAD_SHAPES
+
+
+def test_edited_chunk_is_written_back(app):
+    scene, view = spread_scene()
+    look_at(scene, view, 0, 0)
+    item = next(item for item in scene.items_to_save if item.rect().topLeft() == QPointF(0, 0))
+    scene.history.push(PropertyCommand([item], "setPos", [item.pos()], [QPointF(0, -500)]))
+    look_at(scene, view, 9900, 9900)
+    assert item.scene() is scene  # The undo history still refers to it
+    scene.history.clear()
+    look_at(scene, view, 9900, 9900)
+    assert item.scene() is None
+    drawing = scene.drawing()
+    assert len(drawing) == SPREAD_SHAPES
+    assert -500.0 in drawing.y1
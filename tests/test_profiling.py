@@ -0,0 +1,52 @@
+"""The profiler counts every item the canvas paints, whenever it was started.
+
+    python -m pytest tests
+"""
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pytest
+from PyQt6.QtCore import QLineF, QRectF
+from PyQt6.QtWidgets import QApplication, QGraphicsLineItem, QGraphicsRectItem
+
+from drawingtool.profiling import profiler
+from drawingtool.scene import GraphicsScene
+from drawingtool.shapes import RoundedRectItem
+from drawingtool.view import CanvasView
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication(["tests"])
+
+
+def refine(app, view):
+    app.processEvents()
+    while view.refining():
+        app.processEvents()
+
+
+def test_items_painted_before_start_are_counted(app):
+    scene = GraphicsScene()
+    for item in (QGraphicsLineItem(QLineF(0, 0, 50, 40)), QGraphicsRectItem(QRectF(60, 0, 40, 30)),
+                 RoundedRectItem(QRectF(0, 60, 40, 30))):
+        scene.addItem(item)
+        scene.items_to_save.add(item)
+    view = CanvasView(scene)
+    view.resize(300, 300)
+    view.show()
+    view.centerOn(50, 50)
+    refine(app, view)
+    profiler.reset()
+    profiler.start()
+    try:
+        scene.update()
+        refine(app, view)
+        painted = dict(profiler.painted_classes)
+    finally:
+        profiler.stop()
+        profiler.reset()
+        view.close()
+    # A pass paints the items reaching into it, so one in several passes counts once for each
+    assert set(painted) == {"QGraphicsLineItem", "QGraphicsRectItem", "RoundedRectItem"}
@@ -0,0 +1,108 @@
+"""Named styles: defining one is an undo step, and recoloured shapes keep their dash.
+
+    python -m pytest tests
+"""
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pytest
+from PyQt6.QtCore import QLineF, QRectF, Qt
+from PyQt6.QtGui import QColor
+from PyQt6.QtWidgets import QApplication, QGraphicsItem, QGraphicsLineItem, QWidget
+
+from drawingtool import dialogs
+from drawingtool.document import Style
+from drawingtool.fileformats import read_drawing, write_drawing
+from drawingtool.history import DefineStyleCommand, MacroCommand, StyleCommand
+from drawingtool.journal import Journal, read_journal
+from drawingtool.scene import GraphicsScene
+from drawingtool.shapes import RoundedRectItem, items_from_drawing
+from drawingtool.vectorexport import export_svg
+
+DASHED = Style("Dashed", "#00ff00", 3.0, dash=1, radius=12.0)
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication(["tests"])
+
+
+def styled_scene():
+    scene = GraphicsScene()
+    scene.history.push(DefineStyleCommand(scene.styles, DASHED))
+    line = QGraphicsLineItem(QLineF(0, 0, 80, 40))
+    rect = RoundedRectItem(QRectF(100, 0, 60, 60))
+    for item in (line, rect):
+        scene.addItem(item)
+        scene.items_to_save.add(item)
+        scene.styles.assign(item, DASHED)
+        item.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsSelectable)
+        item.setSelected(True)
+    return scene, line, rect
+
+
+def test_defining_a_style_is_undone_and_redone(app):
+    scene = GraphicsScene()
+    scene.history.push(DefineStyleCommand(scene.styles, DASHED))
+    assert scene.styles.get("Dashed") == DASHED
+    scene.styles.current = "Dashed"
+    scene.history.undo()
+    assert "Dashed" not in scene.styles
+    assert scene.styles.current == "Default"
+    scene.history.redo()
+    assert scene.styles.get("Dashed") == DASHED
+
+
+def test_new_style_reaches_the_journal(app, tmp_path):
+    scene, line, rect = styled_scene()
+    journal = Journal(str(tmp_path / "autosave.drwj"))
+    journal.reset(scene.drawing(), scene.topLevelEntries())
+    scene.addEditListener(journal)
+    wider = DASHED.replace(name="Wider", width=9.0)
+    scene.history.push(MacroCommand([DefineStyleCommand(scene.styles, wider),
+                                     StyleCommand(scene.styles, [line], [(DASHED, None)], [(wider, None)])]))
+    journal.sync()
+    drawing = read_journal(journal.path)
+    journal.close(discard=True)
+    assert wider in drawing.styles
+
+
+def recolor(monkeypatch, scene, color):
+    monkeypatch.setattr(dialogs.QColorDialog, "getColor", staticmethod(lambda *args: QColor(color)))
+    parent = QWidget()
+    parent.scene = scene
+    dialogs.EditDialog(parent).chooseColor()
+
+
+def test_recoloured_dashed_shapes_keep_their_dash(app, monkeypatch, tmp_path):
+    # .txt and .xml files hold colours but no pen widths or styles
+    scene, line, rect = styled_scene()
+    recolor(monkeypatch, scene, "#ff0000")
+    path = str(tmp_path / "drawing.drwb")
+    write_drawing(scene.drawing(), path)
+    copy_line, copy_rect = items_from_drawing(read_drawing(path))
+    for item in (copy_line, copy_rect):
+        assert item.pen().style() == Qt.PenStyle.DashLine
+        assert item.pen().color().name() == "#ff0000"
+    assert copy_rect.radius() == pytest.approx(12.0)
+
+
+def test_recoloured_dashed_shapes_export_dashed(app, monkeypatch, tmp_path):
+    scene, line, rect = styled_scene()
+    recolor(monkeypatch, scene, "#ff0000")
+    path = str(tmp_path / "drawing.svg")
+    assert export_svg(scene.drawing(), path, QRectF(0, 0, 200, 100))
+    with open(path, encoding="utf-8") as file:
+        paths = [line for line in file if line.startswith("<path")]
+    assert paths
+    assert all('stroke="#ff0000"' in line and "stroke-dasharray" in line for line in paths)
+
+
+def test_recolouring_reuses_a_matching_style_only(app, monkeypatch):
+    scene, line, rect = styled_scene()
+    scene.styles.define(Style("Dashed #ff0000", "#ff0000"))
+    recolor(monkeypatch, scene, "#ff0000")
+    style = scene.styles.styleOf(line)
+    assert style.name == "Dashed #ff0000 (2)"
+    assert scene.styles.styleOf(rect) is style
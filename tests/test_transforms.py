@@ -0,0 +1,148 @@
+"""Rotated shapes survive saving, reopening, autosave recovery, the clipboard
+and a change of corners.
+
+    python -m pytest tests
+"""
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pytest
+from PyQt6.QtCore import QLineF, QPointF, QRectF
+from PyQt6.QtWidgets import QApplication, QGraphicsItemGroup, QGraphicsLineItem
+
+from drawingtool.clipboard import materialize, serialize
+from drawingtool.fileformats import read_drawing, write_drawing
+from drawingtool.history import PropertyCommand, ReplaceItemsCommand
+from drawingtool.incremental import DrawingFile
+from drawingtool.journal import Journal, read_journal
+from drawingtool.rotation import RotationDrag
+from drawingtool.scene import GraphicsScene
+from drawingtool.shapes import RoundedRectItem, items_from_drawing, with_corners
+
+FORMATS = (".txt", ".xml", ".drwb")
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QApplication.instance() or QApplication(["tests"])
+
+
+def outline(item):
+    # Where item's corners, and those of everything grouped under it, are on
+    # the canvas
+    if isinstance(item, QGraphicsItemGroup):
+        return [point for child in item.childItems() for point in outline(child)]
+    if isinstance(item, QGraphicsLineItem):
+        points = (item.line().p1(), item.line().p2())
+    else:
+        rect = item.rect()
+        points = (rect.topLeft(), rect.topRight(), rect.bottomRight(), rect.bottomLeft())
+    return [item.sceneTransform().map(point) for point in points]
+
+
+def assert_same_place(items, expected):
+    points = [point for item in items for point in outline(item)]
+    assert len(points) == len(expected)
+    for point, other in zip(points, expected):
+        assert point.x() == pytest.approx(other.x(), abs=1e-6)
+        assert point.y() == pytest.approx(other.y(), abs=1e-6)
+
+
+def rotated_scene():
+    scene = GraphicsScene()
+    rect = RoundedRectItem(QRectF(20, 30, 100, 60))
+    line = QGraphicsLineItem(QLineF(200, 10, 260, 90))
+    for item in (rect, line):
+        scene.addItem(item)
+        scene.items_to_save.add(item)
+    scene.history.push(PropertyCommand([rect, line], "setRotation", [0, 0], [45, -30]))
+    line.setPos(15, 5)
+    return scene, rect, line
+
+
+@pytest.mark.parametrize("extension", FORMATS)
+def test_rotated_items_round_trip(app, tmp_path, extension):
+    scene, rect, line = rotated_scene()
+    expected = outline(rect) + outline(line)
+    path = str(tmp_path / ("drawing" + extension))
+    write_drawing(scene.drawing(), path)
+    items = items_from_drawing(read_drawing(path))
+    assert_same_place(items, expected)
+    assert items[0].rotation() == pytest.approx(45)
+    assert items[1].rotation() == pytest.approx(-30)
+
+
+@pytest.mark.parametrize("extension", FORMATS)
+def test_ungrouped_rotated_group_round_trip(app, tmp_path, extension):
+    scene, rect, line = rotated_scene()
+    group = scene.groupItems([rect, line])
+    group.setTransformOriginPoint(QPointF(100, 50))
+    scene.history.push(PropertyCommand([group], "setRotation", [0], [60]))
+    scene.ungroupItems([group])
+    expected = outline(rect) + outline(line)
+    path = str(tmp_path / ("drawing" + extension))
+    write_drawing(scene.drawing(), path)
+    assert_same_place(items_from_drawing(read_drawing(path)), expected)
+
+
+@pytest.mark.parametrize("extension", FORMATS)
+def test_rotated_group_round_trip(app, tmp_path, extension):
+    scene, rect, line = rotated_scene()
+    group = scene.groupItems([rect, line])
+    group.setPos(40, -10)
+    group.setRotation(20)
+    expected = outline(group)
+    path = str(tmp_path / ("drawing" + extension))
+    write_drawing(scene.drawing(), path)
+    (copy,) = items_from_drawing(read_drawing(path))
+    assert_same_place([copy], expected)
+    assert copy.rotation() == pytest.approx(20)
+
+
+def test_pasted_rotated_items_keep_their_turn(app):
+    scene, rect, line = rotated_scene()
+    expected = [point + QPointF(20, 20) for point in outline(rect) + outline(line)]
+    assert_same_place(materialize(serialize([rect, line])), expected)
+
+
+@pytest.mark.parametrize("curved", (False, True))
+def test_corner_change_keeps_place_and_stacking(app, curved):
+    scene, rect, line = rotated_scene()
+    rect.setTransformOriginPoint(rect.rect().center())
+    rect.setZValue(3)
+    expected = outline(rect)
+    copy = with_corners(rect, curved)
+    scene.history.push(ReplaceItemsCommand(scene, [rect], [copy]))
+    assert isinstance(copy, RoundedRectItem) == curved
+    assert_same_place([copy], expected)
+    assert copy.zValue() == 3
+    assert list(scene.items_to_save) == [copy, line]
+
+
+def test_rotation_appended_to_drwb(app, tmp_path):
+    scene, rect, line = rotated_scene()
+    file = DrawingFile()
+    scene.addEditListener(file.log)
+    path = str(tmp_path / "drawing.drwb")
+    assert not file.save(scene, path)
+    scene.history.push(PropertyCommand([rect], "setRotation", [45], [90]))
+    assert file.save(scene)
+    expected = outline(rect) + outline(line)
+    assert_same_place(items_from_drawing(read_drawing(path)), expected)
+
+
+@pytest.mark.parametrize("around_centre", (False, True))
+def test_journal_recovers_rotation(app, tmp_path, around_centre):
+    scene, rect, line = rotated_scene()
+    journal = Journal(str(tmp_path / "autosave.drwj"))
+    journal.reset(scene.drawing(), scene.topLevelEntries())
+    scene.addEditListener(journal)
+    drag = RotationDrag(scene, [rect, line], 0, around_centre)
+    drag.setValue(75)
+    scene.history.push(drag.commit(), apply=False)
+    journal.sync()
+    expected = outline(rect) + outline(line)
+    assert_same_place(items_from_drawing(read_journal(journal.path)), expected)
+    journal.close(discard=True)
+    assert journal.error is None